@@ -0,0 +1,228 @@
+"""
+Agent pool for TradeArena
+Keeps live Strands agents warm between chat turns of the same session
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Pool limits (overridable through the environment)
+DEFAULT_MAX_SIZE = int(os.getenv("TRADEARENA_AGENT_POOL_SIZE", "32"))
+DEFAULT_IDLE_TTL = float(os.getenv("TRADEARENA_AGENT_POOL_TTL", "1800"))
+
+class PooledAgent:
+    """A live agent together with the cleanup hook for the resources it owns"""
+
+    def __init__(self, key: Tuple[str, str], agent: Any, session_id: str,
+                 fingerprint: str, cleanup: Optional[Callable[[], None]] = None):
+        self.key = key
+        self.agent = agent
+        self.session_id = session_id
+        self.fingerprint = fingerprint
+        self.cleanup = cleanup
+        # Serializes turns: a Strands agent cannot stream two messages at once
+        self.lock = asyncio.Lock()
+        self.in_use = 0
+        self.stale = False
+        self.last_used = time.monotonic()
+
+class AgentPool:
+    """LRU pool of live agents keyed by (agent_id, session_id) with idle-TTL eviction"""
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE, idle_ttl: float = DEFAULT_IDLE_TTL):
+        self.max_size = max_size
+        self.idle_ttl = idle_ttl
+        self._entries: "OrderedDict[Tuple[str, str], PooledAgent]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._reaper: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    @staticmethod
+    def fingerprint(*parts: Any) -> str:
+        """Hash the inputs an agent was built from so config edits are detected"""
+        payload = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def acquire(self, agent_id: str, session_id: Optional[str], fingerprint: str,
+                factory: Callable[[], Tuple[Any, str, Optional[Callable[[], None]]]]) -> PooledAgent:
+        """
+        Get a live agent for the session, building one through factory on a miss
+
+        Args:
+            agent_id: Agent configuration ID
+            session_id: Existing session ID, or None to start a new session
+            fingerprint: Hash of the agent config and settings the agent depends on
+            factory: Callable returning (agent, session_id, cleanup)
+
+        Returns:
+            The pooled entry; callers must hand it back through release()
+        """
+        self._ensure_reaper()
+        self.evict_idle()
+
+        if session_id:
+            key = (agent_id, session_id)
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry and not entry.stale and entry.fingerprint == fingerprint:
+                    self._entries.move_to_end(key)
+                    entry.in_use += 1
+                    entry.last_used = time.monotonic()
+                    logger.info(f"Agent pool hit for {agent_id} / {session_id}")
+                    return entry
+                if entry:
+                    logger.info(f"Agent pool entry for {agent_id} / {session_id} is out of date, rebuilding")
+                    self._close_later(self._pop(key))
+
+        agent, new_session_id, cleanup = factory()
+        entry = PooledAgent((agent_id, new_session_id), agent, new_session_id, fingerprint, cleanup)
+        entry.in_use = 1
+
+        with self._lock:
+            # Another request may have built the same session concurrently
+            previous = self._pop(entry.key)
+            self._entries[entry.key] = entry
+            overflow = self._shrink_to_fit()
+
+        self._close_later(previous)
+        for old_entry in overflow:
+            self._close_later(old_entry)
+
+        logger.info(f"Agent pool miss for {agent_id} / {new_session_id} ({len(self)} live agents)")
+        return entry
+
+    def release(self, entry: PooledAgent) -> None:
+        """Return an agent to the pool after a turn"""
+        with self._lock:
+            entry.in_use = max(0, entry.in_use - 1)
+            entry.last_used = time.monotonic()
+            should_close = entry.stale and entry.in_use == 0
+        if should_close:
+            self._close(entry)
+
+    def discard(self, entry: PooledAgent) -> None:
+        """Drop an agent whose state can no longer be trusted (e.g. after a failed turn)"""
+        with self._lock:
+            if self._entries.get(entry.key) is entry:
+                del self._entries[entry.key]
+            entry.stale = True
+        self.release(entry)
+
+    def invalidate(self, agent_id: str = None) -> int:
+        """Drop pooled agents for one agent config, or all of them when agent_id is None"""
+        with self._lock:
+            keys = [key for key in self._entries if agent_id is None or key[0] == agent_id]
+            entries = [self._pop(key) for key in keys]
+        for entry in entries:
+            self._close_later(entry)
+        if entries:
+            logger.info(f"Invalidated {len(entries)} pooled agent(s) for {agent_id or 'all agents'}")
+        return len(entries)
+
+    def evict_idle(self) -> int:
+        """Close agents that have not been used within the idle TTL"""
+        now = time.monotonic()
+        with self._lock:
+            keys = [
+                key for key, entry in self._entries.items()
+                if entry.in_use == 0 and now - entry.last_used > self.idle_ttl
+            ]
+            entries = [self._pop(key) for key in keys]
+        for entry in entries:
+            self._close_later(entry)
+        return len(entries)
+
+    def close_all(self) -> None:
+        """Stop the reaper and close every pooled agent"""
+        self._stop_event.set()
+        self.invalidate()
+
+    def stats(self) -> Dict[str, Any]:
+        """Describe pool contents for diagnostics"""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "idle_ttl": self.idle_ttl,
+                "agents": [
+                    {
+                        "agent_id": key[0],
+                        "session_id": key[1],
+                        "in_use": entry.in_use,
+                        "idle_seconds": round(now - entry.last_used, 1)
+                    }
+                    for key, entry in self._entries.items()
+                ]
+            }
+
+    def session_ids(self) -> Set[str]:
+        """Sessions that currently have a pooled agent"""
+        with self._lock:
+            return {key[1] for key in self._entries if key[1]}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _pop(self, key: Tuple[str, str]) -> Optional[PooledAgent]:
+        """Remove an entry from the index and mark it stale (caller holds the lock)"""
+        entry = self._entries.pop(key, None)
+        if entry:
+            entry.stale = True
+        return entry
+
+    def _shrink_to_fit(self) -> List[PooledAgent]:
+        """Pop least recently used idle entries above the size cap (caller holds the lock)"""
+        evicted = []
+        for key in list(self._entries.keys()):
+            if len(self._entries) <= self.max_size:
+                break
+            if self._entries[key].in_use == 0:
+                evicted.append(self._pop(key))
+        return evicted
+
+    def _close_later(self, entry: Optional[PooledAgent]) -> None:
+        """Close a popped entry now if idle, otherwise when its last user releases it"""
+        if entry and entry.in_use == 0:
+            self._close(entry)
+
+    def _close(self, entry: PooledAgent) -> None:
+        """Run the cleanup hook of an entry"""
+        if entry.cleanup is None:
+            return
+        cleanup, entry.cleanup = entry.cleanup, None
+        try:
+            cleanup()
+            logger.info(f"Closed pooled agent {entry.key[0]} / {entry.key[1]}")
+        except Exception as e:
+            logger.error(f"Error closing pooled agent {entry.key[0]} / {entry.key[1]}: {e}")
+
+    def _ensure_reaper(self) -> None:
+        """Start the background idle reaper on first use"""
+        with self._lock:
+            if self._reaper is not None:
+                return
+            self._reaper = threading.Thread(target=self._run_reaper, name="agent-pool-reaper", daemon=True)
+        self._reaper.start()
+
+    def _run_reaper(self) -> None:
+        """Reaper loop: evict idle agents until the pool is closed"""
+        interval = max(1.0, min(60.0, self.idle_ttl / 4))
+        while not self._stop_event.wait(interval):
+            try:
+                self.evict_idle()
+            except Exception as e:
+                logger.error(f"Agent pool reaper error: {e}")
+
+# Global agent pool instance
+agent_pool = AgentPool()
@@ -3,20 +3,50 @@ Agent configuration management for TradeArena
 """
 
 import json
+import logging
 import os
+import tempfile
+import threading
 import uuid
-from typing import Dict, List, Any
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Any, Optional
 from pathlib import Path
 
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, writes stay atomic
+    fcntl = None
+
+from .fs_watcher import fs_watcher
+
+logger = logging.getLogger(__name__)
+
 # Path to agent configurations file
 AGENTS_FILE = Path(__file__).parent.parent / "config" / "config_agents.json"
 
+# Held (flock) by whichever process is rewriting AGENTS_FILE
+AGENTS_LOCK_FILE = AGENTS_FILE.parent / ".config_agents.lock"
+
+# Fields a caller may change on an existing agent
+UPDATABLE_FIELDS = ("name", "ai_provider", "trading_chain", "config")
+
 class AgentManager:
-    """Manage agent configurations"""
+    """
+    Manage agent configurations
+    
+    Agents are kept in file order plus an ID index. Every change is a transaction:
+    take the cross-process lock, re-read the file, apply the change, then write a
+    temp file, fsync it and rename it over config_agents.json. Bulk operations
+    apply any number of changes in one such write.
+    """
     
     def __init__(self):
         self.ensure_config_dir()
-        self.agents = self.load_agents()
+        self._lock = threading.RLock()
+        self.version = 0
+        self._set_agents(self.load_agents())
+        # Pick up edits made by other processes
+        fs_watcher.subscribe(str(AGENTS_FILE.parent), self._on_config_change)
     
     def ensure_config_dir(self):
         """Ensure config directory exists"""
@@ -25,36 +55,150 @@ class AgentManager:
     
     def load_agents(self) -> List[Dict[str, Any]]:
         """Load agents from file"""
-        if not AGENTS_FILE.exists():
-            # Start with empty agents list - no auto-creation
+        try:
+            return self.read_agents_file()
+        except (json.JSONDecodeError, OSError):
             return []
-        
+    
+    def read_agents_file(self) -> List[Dict[str, Any]]:
+        """Read agents from file, raising on a corrupt file instead of treating it as empty"""
         try:
             with open(AGENTS_FILE, 'r') as f:
                 data = json.load(f)
-                return data.get("agents", [])
-        except (json.JSONDecodeError, FileNotFoundError):
+        except FileNotFoundError:
+            # Start with empty agents list - no auto-creation
             return []
+        agents = data.get("agents", []) if isinstance(data, dict) else None
+        if not isinstance(agents, list):
+            raise json.JSONDecodeError("'agents' is not a list", "", 0)
+        return agents
     
-    def save_agents(self, agents: List[Dict[str, Any]]):
-        """Save agents to file"""
-        with open(AGENTS_FILE, 'w') as f:
-            json.dump({"agents": agents}, f, indent=2)
+    def reload(self) -> bool:
+        """Re-read agents from file, keeping the current list if the file is unreadable"""
+        try:
+            agents = self.read_agents_file()
+        except (json.JSONDecodeError, OSError):
+            return False
+        with self._lock:
+            if agents != self.agents:
+                self._set_agents(agents)
+        return True
+    
+    def _on_config_change(self, changes: List[tuple]) -> None:
+        if any(path == str(AGENTS_FILE) for _, path in changes):
+            self.reload()
+    
+    def _set_agents(self, agents: List[Dict[str, Any]]) -> None:
         self.agents = agents
+        self._by_id = {agent["id"]: agent for agent in agents if "id" in agent}
+        self.version += 1
+    
+    @contextmanager
+    def _transaction(self) -> Iterator[List[Dict[str, Any]]]:
+        """Yield the on-disk agent list for changes and commit it atomically under the file lock"""
+        with self._lock, open(AGENTS_LOCK_FILE, 'a') as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                # Another process may have written since our last reload. A corrupt
+                # file raises here, so it is never overwritten with just this change.
+                agents = self.read_agents_file()
+                yield agents
+                self.save_agents(agents)
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+    
+    def save_agents(self, agents: List[Dict[str, Any]]):
+        """Save agents to file (temp file, fsync, rename)"""
+        fd, tmp_path = tempfile.mkstemp(dir=AGENTS_FILE.parent, prefix=".config_agents.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump({"agents": agents}, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, AGENTS_FILE)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        with self._lock:
+            self._set_agents(agents)
     
     def get_agents(self) -> List[Dict[str, Any]]:
         """Get all agents"""
         return self.agents
     
-    def get_agent(self, agent_id: str) -> Dict[str, Any]:
+    def get_agent(self, agent_id: str) -> Optional[Dict[str, Any]]:
         """Get specific agent by ID"""
-        for agent in self.agents:
-            if agent["id"] == agent_id:
-                return agent
-        return None
+        return self._by_id.get(agent_id)
     
     def create_agent(self, name: str = None, ai_provider: str = None, trading_chain: str = None, config: Dict[str, Any] = None) -> Dict[str, Any]:
         """Create new agent with UUID-based ID and descriptive name"""
+        return self.create_agents([{
+            "name": name,
+            "ai_provider": ai_provider,
+            "trading_chain": trading_chain,
+            "config": config
+        }])[0]
+    
+    def update_agent(self, agent_id: str, name: str = None, ai_provider: str = None, trading_chain: str = None) -> bool:
+        """Update existing agent"""
+        changes = {"name": name, "ai_provider": ai_provider, "trading_chain": trading_chain}
+        return bool(self.update_agents({agent_id: changes}))
+    
+    def delete_agent(self, agent_id: str) -> bool:
+        """Delete agent"""
+        return bool(self.delete_agents([agent_id]))
+    
+    def create_agents(self, specs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create several agents (dicts of name, ai_provider, trading_chain, config) in one write"""
+        return self.bulk(create=specs)["created"]
+    
+    def update_agents(self, updates: Dict[str, Dict[str, Any]]) -> List[str]:
+        """Apply {agent_id: {field: value}} changes in one write; returns the updated IDs"""
+        return self.bulk(update=updates)["updated"]
+    
+    def delete_agents(self, agent_ids: List[str]) -> List[str]:
+        """Delete several agents in one write; returns the IDs that existed"""
+        return self.bulk(delete=agent_ids)["deleted"]
+    
+    def bulk(self, create: List[Dict[str, Any]] = None, update: Dict[str, Dict[str, Any]] = None,
+             delete: List[str] = None) -> Dict[str, list]:
+        """Create, update and delete agents in a single atomic write; None field values are left unchanged"""
+        if not isinstance(create or [], list) or not all(isinstance(spec, dict) for spec in create or []):
+            raise TypeError("create must be a list of agent objects")
+        if not isinstance(update or {}, dict) or not all(isinstance(changes, dict) for changes in (update or {}).values()):
+            raise TypeError("update must map agent IDs to objects")
+        if not isinstance(delete or [], list):
+            raise TypeError("delete must be a list of agent IDs")
+        for spec in create or []:
+            validate_agent_fields(spec.get("ai_provider"), spec.get("trading_chain"), required=True)
+        for changes in (update or {}).values():
+            validate_agent_fields(changes.get("ai_provider"), changes.get("trading_chain"))
+        created = [self._new_agent(**{k: spec.get(k) for k in UPDATABLE_FIELDS}) for spec in create or []]
+        update = update or {}
+        targets = set(delete or [])
+        result = {"created": created, "updated": [], "deleted": []}
+        if not (created or update or targets):
+            return result
+        
+        with self._transaction() as agents:
+            for agent in agents:
+                changes = update.get(agent.get("id"))
+                if changes is None:
+                    continue
+                for field in UPDATABLE_FIELDS:
+                    if changes.get(field) is not None:
+                        agent[field] = changes[field]
+                result["updated"].append(agent["id"])
+            result["deleted"] = [agent["id"] for agent in agents if agent.get("id") in targets]
+            agents[:] = [agent for agent in agents if agent.get("id") not in targets]
+            agents.extend(created)
+        return result
+    
+    def _new_agent(self, name: str = None, ai_provider: str = None, trading_chain: str = None,
+                   config: Dict[str, Any] = None) -> Dict[str, Any]:
         # Generate UUID-based ID
         new_id = f"agent_{uuid.uuid4().hex[:8]}"
         
@@ -74,33 +218,14 @@ class AgentManager:
         # Add configuration if provided
         if config:
             new_agent["config"] = config
-        
-        self.agents.append(new_agent)
-        self.save_agents(self.agents)
         return new_agent
-    
-    def update_agent(self, agent_id: str, name: str = None, ai_provider: str = None, trading_chain: str = None) -> bool:
-        """Update existing agent"""
-        for agent in self.agents:
-            if agent["id"] == agent_id:
-                if name is not None:
-                    agent["name"] = name
-                if ai_provider is not None:
-                    agent["ai_provider"] = ai_provider
-                if trading_chain is not None:
-                    agent["trading_chain"] = trading_chain
-                self.save_agents(self.agents)
-                return True
-        return False
-    
-    def delete_agent(self, agent_id: str) -> bool:
-        """Delete agent"""
-        for i, agent in enumerate(self.agents):
-            if agent["id"] == agent_id:
-                del self.agents[i]
-                self.save_agents(self.agents)
-                return True
-        return False
+
+def validate_agent_fields(ai_provider: Optional[str], trading_chain: Optional[str], required: bool = False) -> None:
+    """Raise ValueError for an unknown provider or chain; None is allowed unless required"""
+    if (ai_provider is not None or required) and ai_provider not in PROVIDER_CONFIGS:
+        raise ValueError(f"Unknown AI provider: {ai_provider}")
+    if (trading_chain is not None or required) and trading_chain not in {c["id"] for c in TRADING_CHAINS}:
+        raise ValueError(f"Unknown trading chain: {trading_chain}")
 
 # Global agent manager instance
 agent_manager = AgentManager()
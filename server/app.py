@@ -3,7 +3,9 @@ FastAPI web server for TradeArena CLI
 Provides HTML interface and API endpoints for configuration and monitoring
 """
 
+import asyncio
 import os
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
@@ -12,12 +14,46 @@ import time
 from typing import Dict, Any
 
 from .routes import setup_routes
+from .agent_pool import agent_pool
+from .mcp_supervisor import mcp_supervisor
+from .warmup import warmup_state, WARMUP_ENABLED
+from .fs_watcher import fs_watcher, FS_WATCH_ENABLED
+from .sessions import session_manager
+from .compression import CompressionMiddleware
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start warming up MCP servers and model clients on startup, release them on shutdown"""
+    if FS_WATCH_ENABLED:
+        fs_watcher.start()
+    
+    # Warm up in the background so the app serves (and /api/ready reports 503) meanwhile
+    warmup_task = asyncio.create_task(warmup_state.run()) if WARMUP_ENABLED else None
+    if warmup_task is None:
+        warmup_state.skip()
+    
+    # Pack idle sessions into archives in the background, leaving sessions with pooled agents alone
+    session_manager.start_archiver(busy_sessions=agent_pool.session_ids)
+    
+    yield
+    
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await warmup_task
+    session_manager.stop_archiver()
+    
+    # Close pooled agents, then stop the supervised MCP server processes
+    agent_pool.close_all()
+    mcp_supervisor.shutdown()
+    fs_watcher.stop()
 
 # Initialize FastAPI app
 app = FastAPI(
     title="TradeArena CLI Web Interface",
     description="Web interface for TradeArena CLI configuration and monitoring",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -29,6 +65,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress JSON and HTML responses for clients that accept gzip/brotli
+app.add_middleware(CompressionMiddleware)
+
 # Setup all routes
 setup_routes(app)
 
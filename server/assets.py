@@ -0,0 +1,108 @@
+"""
+Static assets for TradeArena Web Terminal
+Serves the shared CSS and JavaScript under content-hashed URLs so browsers cache them for good
+"""
+
+import gzip
+import hashlib
+import logging
+from typing import Dict, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from .render_cache import etag_matches
+from .static import BASE_CSS, MENU_JS, SUBMENU_JS
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+STATIC_PREFIX = "/static/"
+
+# A hashed URL never changes content, so it can be cached for a year without revalidation
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Content codings in an Accept-Encoding header, with their q-values"""
+    encodings = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        encodings[coding.strip().lower()] = quality
+    return encodings
+
+def accepted_encodings(request: Request) -> Dict[str, float]:
+    """Content codings the client accepts, with their q-values"""
+    return parse_accept_encoding(request.headers.get("accept-encoding", ""))
+
+class StaticAsset:
+    """One asset with its hashed filename and precompressed variants"""
+
+    def __init__(self, name: str, content: str, media_type: str):
+        self.name = name
+        self.media_type = media_type
+        self.body = content.encode("utf-8")
+        digest = hashlib.sha256(self.body).hexdigest()
+        stem, extension = name.rsplit(".", 1)
+        self.filename = f"{stem}.{digest[:12]}.{extension}"
+        self.url = STATIC_PREFIX + self.filename
+        self.etag = f'"{digest[:32]}"'
+        # Compressed once at startup; mtime=0 keeps the gzip bytes reproducible
+        self.variants = {"gzip": gzip.compress(self.body, compresslevel=9, mtime=0)}
+        if BROTLI_AVAILABLE:
+            self.variants["br"] = brotli.compress(self.body, quality=11)
+
+    def select(self, request: Request) -> Tuple[bytes, Optional[str]]:
+        """(body, content coding) of the smallest variant the client accepts"""
+        accepted = accepted_encodings(request)
+        best, best_coding = self.body, None
+        for coding, body in self.variants.items():
+            if accepted.get(coding, accepted.get("*", 0)) > 0 and len(body) < len(best):
+                best, best_coding = body, coding
+        return best, best_coding
+
+class StaticAssets:
+    """Registry of assets by hashed filename"""
+
+    def __init__(self):
+        self._assets: Dict[str, StaticAsset] = {}
+
+    def add(self, name: str, content: str, media_type: str) -> StaticAsset:
+        asset = StaticAsset(name, content, media_type)
+        self._assets[asset.filename] = asset
+        return asset
+
+    def response(self, request: Request, filename: str) -> Response:
+        """Serve an asset by hashed filename (404 for unknown or outdated names)"""
+        asset = self._assets.get(filename)
+        if asset is None:
+            return Response("Not found", status_code=404, media_type="text/plain")
+
+        headers = {"ETag": asset.etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL, "Vary": "Accept-Encoding"}
+        if etag_matches(request, asset.etag):
+            return Response(status_code=304, headers=headers)
+
+        body, coding = asset.select(request)
+        if coding:
+            headers["Content-Encoding"] = coding
+        return Response(body, media_type=asset.media_type, headers=headers)
+
+# Global static asset registry
+static_assets = StaticAssets()
+
+# URLs the templates reference
+BASE_CSS_URL = static_assets.add("base.css", BASE_CSS, "text/css; charset=utf-8").url
+MENU_JS_URL = static_assets.add("menu.js", MENU_JS, "text/javascript; charset=utf-8").url
+SUBMENU_JS_URL = static_assets.add("submenu.js", SUBMENU_JS, "text/javascript; charset=utf-8").url
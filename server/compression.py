@@ -0,0 +1,125 @@
+"""
+Response compression for TradeArena
+ASGI middleware that gzip/brotli-encodes complete text responses the client accepts
+"""
+
+import asyncio
+import gzip
+import os
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .assets import BROTLI_AVAILABLE, parse_accept_encoding
+
+if BROTLI_AVAILABLE:
+    import brotli
+
+# Bodies smaller than this are sent as is; compression would not pay for its overhead
+COMPRESS_MIN_SIZE = int(os.getenv("TRADEARENA_COMPRESS_MIN_SIZE", "1024"))
+
+# Bodies at least this large are compressed on a worker thread to keep the event loop free
+COMPRESS_THREAD_MIN_SIZE = int(os.getenv("TRADEARENA_COMPRESS_THREAD_MIN_SIZE", "65536"))
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/x-ndjson",
+    "application/xml",
+    "image/svg+xml"
+)
+
+class CompressionMiddleware:
+    """
+    Compress complete responses with brotli (when available) or gzip
+
+    Streaming responses (SSE chat, NDJSON export) pass through untouched so
+    events are never held back, as do bodies that are already encoded, small
+    or not text. Strong ETags become weak, since the bytes sent differ from
+    the representation the tag was computed on. Every complete text response
+    carries Vary: Accept-Encoding, compressed or not, so shared caches keep
+    the encodings apart.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESS_MIN_SIZE, gzip_level: int = 6,
+                 brotli_quality: int = 5, thread_min_size: int = COMPRESS_THREAD_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.thread_min_size = thread_min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        coding = self._choose_coding(Headers(scope=scope).get("accept-encoding", ""))
+        start_message: Optional[Message] = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            headers = MutableHeaders(scope=start_message)
+            more_body = message.get("more_body", False)
+            vary = [v.strip().lower() for v in headers.get("vary", "").split(",")]
+            if not more_body and self._is_compressible(headers) and "accept-encoding" not in vary:
+                # The representation depends on Accept-Encoding even when this one is identity
+                headers.add_vary_header("Accept-Encoding")
+            if coding is None or more_body or not self._should_compress(start_message, headers, body):
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            if len(body) >= self.thread_min_size:
+                body = await asyncio.to_thread(self._compress, body, coding)
+            else:
+                body = self._compress(body, coding)
+            headers["Content-Encoding"] = coding
+            headers["Content-Length"] = str(len(body))
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = "W/" + etag
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
+
+    def _choose_coding(self, accept_encoding: str) -> Optional[str]:
+        accepted = parse_accept_encoding(accept_encoding)
+        wildcard = accepted.get("*", 0)
+        if BROTLI_AVAILABLE and accepted.get("br", wildcard) > 0:
+            return "br"
+        if accepted.get("gzip", wildcard) > 0:
+            return "gzip"
+        return None
+
+    def _should_compress(self, start_message: Message, headers: MutableHeaders, body: bytes) -> bool:
+        if start_message["status"] < 200 or start_message["status"] in (204, 304):
+            return False
+        return len(body) >= self.minimum_size and self._is_compressible(headers)
+
+    @staticmethod
+    def _is_compressible(headers: MutableHeaders) -> bool:
+        if "content-encoding" in headers:
+            return False
+        return headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+
+    def _compress(self, body: bytes, coding: str) -> bytes:
+        if coding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
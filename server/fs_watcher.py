@@ -0,0 +1,173 @@
+"""
+Filesystem watcher for TradeArena
+Publishes changes under config/, sessions/ and views/ so managers can keep in-memory state coherent
+"""
+
+import logging
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    from watchfiles import Change, watch
+    WATCHFILES_AVAILABLE = True
+except ImportError:
+    WATCHFILES_AVAILABLE = False
+
+# Watcher controls (overridable through the environment)
+FS_WATCH_ENABLED = os.getenv("TRADEARENA_FS_WATCH", "1") not in ("0", "false", "False")
+FS_POLL_INTERVAL = float(os.getenv("TRADEARENA_FS_POLL_INTERVAL", "1.0"))
+
+# Files that change constantly or only transiently and never matter to subscribers
+IGNORED_SUFFIXES = (".db", ".db-wal", ".db-shm", ".db-journal", ".tmp", ".swp", "~")
+
+# A change is (kind, absolute path) with kind one of "added", "modified", "deleted"
+FileChange = Tuple[str, str]
+ChangeCallback = Callable[[List[FileChange]], None]
+
+class FileWatcher:
+    """Watches subscribed paths with inotify (via watchfiles) or by polling, and fans out change batches"""
+
+    def __init__(self, poll_interval: float = FS_POLL_INTERVAL):
+        self.poll_interval = poll_interval
+        self.backend = None
+        self._subscribers: List[Tuple[str, ChangeCallback, Optional[int]]] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        """True while change events are being delivered"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def subscribe(self, path: str, callback: ChangeCallback, poll_depth: Optional[int] = None) -> None:
+        """
+        Call callback with every batch of changes below the directory path
+
+        poll_depth limits how many levels below path the polling fallback stats
+        (1 = direct entries only); None polls the whole tree. inotify always sees everything.
+        """
+        with self._lock:
+            self._subscribers.append((os.path.abspath(path), callback, poll_depth))
+
+    def start(self) -> bool:
+        """Start the background watcher thread over every subscribed root"""
+        with self._lock:
+            if self.running or not self._subscribers:
+                return self.running
+            self._stop.clear()
+            self.backend = "inotify" if WATCHFILES_AVAILABLE else "polling"
+            self._thread = threading.Thread(target=self._run, name="fs-watcher", daemon=True)
+            self._thread.start()
+        logger.info(f"Watching {', '.join(self._roots())} for changes ({self.backend})")
+        return True
+
+    def stop(self) -> None:
+        """Stop the watcher thread"""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout=5)
+        self._thread = None
+
+    def publish(self, changes: List[FileChange]) -> None:
+        """Deliver a batch of changes to the subscribers whose path it touches"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for path, callback, _ in subscribers:
+            relevant = [(kind, p) for kind, p in changes if p == path or p.startswith(path + os.sep)]
+            if not relevant:
+                continue
+            try:
+                callback(relevant)
+            except Exception as e:
+                logger.error(f"File change subscriber for {path} failed: {e}")
+
+    def _roots(self) -> List[str]:
+        """Subscribed directories, without those nested in another one"""
+        roots = []
+        for root, _, _ in self._subscribers:
+            os.makedirs(root, exist_ok=True)
+            if not any(root == r or root.startswith(r + os.sep) for r in roots):
+                roots = [r for r in roots if not r.startswith(root + os.sep)] + [root]
+        return roots
+
+    @staticmethod
+    def _is_relevant(path: str) -> bool:
+        name = os.path.basename(path)
+        return not name.startswith(".") and not name.endswith(IGNORED_SUFFIXES)
+
+    def _run(self) -> None:
+        roots = self._roots()
+        if WATCHFILES_AVAILABLE:
+            try:
+                self._run_watchfiles(roots)
+                return
+            except Exception as e:
+                logger.warning(f"inotify watcher failed, falling back to polling: {e}")
+                self.backend = "polling"
+        self._run_polling(roots)
+
+    def _run_watchfiles(self, roots: List[str]) -> None:
+        kinds = {Change.added: "added", Change.modified: "modified", Change.deleted: "deleted"}
+        for batch in watch(*roots, watch_filter=lambda change, path: self._is_relevant(path),
+                           debounce=200, step=20, stop_event=self._stop, raise_interrupt=False):
+            self.publish(sorted((kinds[change], path) for change, path in batch))
+
+    def _run_polling(self, roots: List[str]) -> None:
+        snapshot = self._snapshot(roots)
+        while not self._stop.wait(self.poll_interval):
+            current = self._snapshot(roots)
+            changes = [("deleted", p) for p in snapshot if p not in current]
+            for path, signature in current.items():
+                previous = snapshot.get(path)
+                if previous is None:
+                    changes.append(("added", path))
+                elif previous != signature:
+                    changes.append(("modified", path))
+            snapshot = current
+            if changes:
+                self.publish(sorted(changes))
+
+    def _poll_depth(self, root: str) -> Optional[int]:
+        """Levels below root the polling fallback must stat for its subscribers (None = all)"""
+        depths = []
+        for path, _, depth in self._subscribers:
+            if path == root or path.startswith(root + os.sep):
+                if depth is None:
+                    return None
+                depths.append(depth + self._level(root, path))
+        return max(depths, default=None)
+
+    @staticmethod
+    def _level(root: str, path: str) -> int:
+        """How many directories path is below root"""
+        return 0 if path == root else os.path.relpath(path, root).count(os.sep) + 1
+
+    def _snapshot(self, roots: List[str]) -> Dict[str, Tuple[int, int]]:
+        """(mtime_ns, size) of every relevant file and directory under roots, down to each root's poll depth"""
+        snapshot = {}
+        for root in roots:
+            max_depth = self._poll_depth(root)
+            for dirpath, dirnames, filenames in os.walk(root):
+                dirnames[:] = [d for d in dirnames if self._is_relevant(d)]
+                names = dirnames + filenames
+                # Entries of dirpath are one level below it; do not descend past the poll depth
+                if max_depth is not None and self._level(root, dirpath) + 1 >= max_depth:
+                    dirnames[:] = []
+                for name in names:
+                    if not self._is_relevant(name):
+                        continue
+                    path = os.path.join(dirpath, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+# Global file watcher instance
+fs_watcher = FileWatcher()
@@ -7,13 +7,21 @@ import json
 import os
 import logging
 import re
-from typing import Dict, List, Any, Optional, Tuple
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, List, Any, Optional, Tuple
 from contextlib import contextmanager
 from strands.tools.mcp import MCPClient
 from mcp import stdio_client, StdioServerParameters
 
+from .mcp_supervisor import mcp_supervisor, MCPLease
+from .tool_cache import tool_schema_cache
+
 logger = logging.getLogger(__name__)
 
+# Per-server startup budget in seconds when mcp_config.json does not set "startup_timeout"
+DEFAULT_STARTUP_TIMEOUT = 30
+
 class MCPManager:
     """Manages multiple MCP clients for different chains"""
     
@@ -23,7 +31,7 @@ class MCPManager:
         
         self.config_path = config_path
         self.config = self._load_config()
-        self.active_clients: Dict[str, Tuple[MCPClient, Any]] = {}  # (client, session)
+        self.active_clients: Dict[str, Tuple[MCPClient, MCPLease]] = {}  # (client, lease)
         self._load_credentials()
     
     def _load_credentials(self) -> None:
@@ -91,6 +99,11 @@ class MCPManager:
         chain_mappings = self.config.get("chain_mappings", {})
         return chain_mappings.get(trading_chain, ["core-mcp"])
     
+    def get_startup_timeout(self, mcp_name: str) -> float:
+        """Get the handshake + tool listing budget for a server"""
+        server_config = self.config.get("mcp_servers", {}).get(mcp_name, {})
+        return float(server_config.get("startup_timeout", DEFAULT_STARTUP_TIMEOUT))
+    
     def create_mcp_client(self, mcp_name: str) -> Optional[MCPClient]:
         """Create an MCP client for the specified server"""
         mcp_servers = self.config.get("mcp_servers", {})
@@ -113,88 +126,165 @@ class MCPManager:
                 processed_args.append(self._substitute_env_vars(arg))
             
             # Create MCP client with environment variables
-            client = MCPClient(lambda: stdio_client(
-                StdioServerParameters(
-                    command=server_config["command"],
-                    args=processed_args,
-                    env=env_vars if env_vars else None
-                )
-            ))
+            client = MCPClient(
+                lambda: stdio_client(
+                    StdioServerParameters(
+                        command=server_config["command"],
+                        args=processed_args,
+                        env=env_vars if env_vars else None
+                    )
+                ),
+                startup_timeout=int(self.get_startup_timeout(mcp_name))
+            )
             logger.info(f"Created MCP client for {mcp_name}")
             return client
         except Exception as e:
             logger.error(f"Failed to create MCP client for {mcp_name}: {e}")
             return None
     
-    def initialize_mcp_clients(self, trading_chain: str) -> Dict[str, Tuple[MCPClient, Any]]:
-        """Initialize and maintain persistent MCP clients for a trading chain"""
+    def _lease_client(self, mcp_name: str) -> Optional[MCPLease]:
+        """Lease a running client for one server (runs on a worker thread)"""
+        # The supervisor keeps the server process alive across requests
+        return mcp_supervisor.acquire(mcp_name, self.create_mcp_client)
+    
+    def list_server_tools(self, mcp_name: str, client: MCPClient) -> List[Any]:
+        """List tools for a server, served from the tool schema cache when the bundle is unchanged"""
+        server_config = self.config.get("mcp_servers", {}).get(mcp_name, {})
+        tools = tool_schema_cache.get_tools(mcp_name, server_config, client)
+        if tools is None:
+            tools = client.list_tools_sync()
+            tool_schema_cache.store(mcp_name, server_config, tools)
+        return tools
+    
+    def _load_server_tools(self, mcp_name: str) -> Tuple[Optional[MCPLease], List[Any]]:
+        """Lease a client for one server and list its tools (runs on a worker thread)"""
+        lease = self._lease_client(mcp_name)
+        if not lease:
+            return None, []
+        try:
+            return lease, self.list_server_tools(mcp_name, lease.client)
+        except Exception:
+            lease.release()
+            raise
+    
+    def _run_per_server(self, mcp_names: List[str], task: Callable[[str], Any]) -> Dict[str, Any]:
+        """
+        Run task for every server concurrently, each bounded by its own startup timeout
+        
+        Servers that fail or time out are left out of the result. A late result from a
+        timed-out server has its lease released as soon as it arrives.
+        """
+        if not mcp_names:
+            return {}
+        
+        executor = ThreadPoolExecutor(max_workers=len(mcp_names), thread_name_prefix="mcp-init")
+        started = time.monotonic()
+        futures = {mcp_name: executor.submit(task, mcp_name) for mcp_name in mcp_names}
+        results = {}
+        
+        for mcp_name, future in futures.items():
+            remaining = self.get_startup_timeout(mcp_name) - (time.monotonic() - started)
+            try:
+                results[mcp_name] = future.result(timeout=max(0.0, remaining))
+            except FutureTimeoutError:
+                logger.error(f"MCP server {mcp_name} did not become ready within {self.get_startup_timeout(mcp_name):.0f}s, skipping")
+                future.add_done_callback(_release_abandoned_lease)
+            except Exception as e:
+                logger.error(f"Failed to initialize MCP client {mcp_name}: {e}")
+        
+        # Do not wait for timed-out servers; their threads finish in the background
+        executor.shutdown(wait=False)
+        logger.info(f"Initialized {len(results)}/{len(mcp_names)} MCP servers in {time.monotonic() - started:.2f}s")
+        return results
+    
+    def initialize_mcp_clients(self, trading_chain: str) -> Dict[str, Tuple[MCPClient, MCPLease]]:
+        """Lease running MCP clients for a trading chain, starting servers concurrently"""
         required_mcps = self.get_required_mcps_for_chain(trading_chain)
         persistent_clients = {}
         
+        # Reuse the leases this manager already holds
         for mcp_name in required_mcps:
             if mcp_name in self.active_clients:
-                # Reuse existing client
                 persistent_clients[mcp_name] = self.active_clients[mcp_name]
                 logger.info(f"Reusing existing MCP client for {mcp_name}")
-            else:
-                # Create new persistent client
-                client = self.create_mcp_client(mcp_name)
-                if not client:
-                    logger.warning(f"Failed to create MCP client: {mcp_name}")
-                    continue
-                
-                try:
-                    # Start the client and keep the session alive
-                    session = client.__enter__()
-                    persistent_clients[mcp_name] = (client, session)
-                    self.active_clients[mcp_name] = (client, session)
-                    logger.info(f"Initialized persistent MCP client for {mcp_name}")
-                except Exception as e:
-                    logger.error(f"Failed to initialize MCP client {mcp_name}: {e}")
+        
+        missing = [mcp_name for mcp_name in required_mcps if mcp_name not in persistent_clients]
+        for mcp_name, lease in self._run_per_server(missing, self._lease_client).items():
+            if not lease:
+                logger.warning(f"Failed to initialize MCP client: {mcp_name}")
+                continue
+            persistent_clients[mcp_name] = (lease.client, lease)
+            self.active_clients[mcp_name] = (lease.client, lease)
+            logger.info(f"Leased persistent MCP client for {mcp_name}")
         
         return persistent_clients
     
-    def get_mcp_tools(self, trading_chain: str) -> Tuple[List[Any], Dict[str, Tuple[MCPClient, Any]]]:
+    def get_mcp_tools(self, trading_chain: str) -> Tuple[List[Any], Dict[str, Tuple[MCPClient, MCPLease]]]:
         """Get all tools for a specific trading chain and return persistent clients"""
-        # Initialize persistent clients
-        persistent_clients = self.initialize_mcp_clients(trading_chain)
-        all_tools = []
+        required_mcps = self.get_required_mcps_for_chain(trading_chain)
         
-        for mcp_name, (client, session) in persistent_clients.items():
-            try:
-                # Extract tools from the persistent session
-                tools = client.list_tools_sync()
-                all_tools.extend(tools)
-                logger.info(f"Successfully collected {len(tools)} tools from {mcp_name}")
-            except Exception as e:
-                logger.error(f"Failed to get tools from {mcp_name}: {e}")
+        def load(mcp_name: str) -> Tuple[Optional[MCPLease], List[Any]]:
+            # Only a lease acquired here is returned, so an abandoned load never releases a held one
+            if mcp_name in self.active_clients:
+                client, _ = self.active_clients[mcp_name]
+                return None, self.list_server_tools(mcp_name, client)
+            return self._load_server_tools(mcp_name)
+        
+        # Handshakes and tool listings run concurrently, so setup costs the slowest server
+        results = self._run_per_server(required_mcps, load)
+        
+        all_tools = []
+        persistent_clients = {}
+        for mcp_name in required_mcps:
+            if mcp_name not in results:
+                continue
+            lease, tools = results[mcp_name]
+            if not lease and mcp_name in self.active_clients:
+                # Listed through the lease this manager already holds
+                lease = self.active_clients[mcp_name][1]
+            if not lease:
+                logger.warning(f"Failed to initialize MCP client: {mcp_name}")
+                continue
+            persistent_clients[mcp_name] = (lease.client, lease)
+            self.active_clients[mcp_name] = (lease.client, lease)
+            all_tools.extend(tools)
+            logger.info(f"Successfully collected {len(tools)} tools from {mcp_name}")
         
         return all_tools, persistent_clients
     
+    def warm_server(self, mcp_name: str) -> int:
+        """Start a server and prime its tool schema cache, returning the tool count"""
+        lease, tools = self._load_server_tools(mcp_name)
+        if not lease:
+            raise RuntimeError(f"MCP server {mcp_name} could not be started")
+        # Releasing leaves the process running until the supervisor's idle timeout
+        lease.release()
+        return len(tools)
+    
     def close_clients(self, trading_chain: str = None):
-        """Close MCP clients for a specific chain or all clients"""
+        """Release MCP client leases for a specific chain or all leases held by this manager"""
         if trading_chain:
-            # Close specific chain clients
-            required_mcps = self.get_required_mcps_for_chain(trading_chain)
-            for mcp_name in required_mcps:
-                if mcp_name in self.active_clients:
-                    client, session = self.active_clients[mcp_name]
-                    try:
-                        client.__exit__(None, None, None)
-                        logger.info(f"Closed MCP client for {mcp_name}")
-                    except Exception as e:
-                        logger.error(f"Error closing MCP client {mcp_name}: {e}")
-                    finally:
-                        del self.active_clients[mcp_name]
+            mcp_names = [name for name in self.get_required_mcps_for_chain(trading_chain) if name in self.active_clients]
         else:
-            # Close all clients
-            for mcp_name, (client, session) in self.active_clients.items():
-                try:
-                    client.__exit__(None, None, None)
-                    logger.info(f"Closed MCP client for {mcp_name}")
-                except Exception as e:
-                    logger.error(f"Error closing MCP client {mcp_name}: {e}")
-            self.active_clients.clear()
+            mcp_names = list(self.active_clients.keys())
+        
+        for mcp_name in mcp_names:
+            client, lease = self.active_clients.pop(mcp_name)
+            try:
+                # The server process stays up; the supervisor stops it once idle
+                lease.release()
+                logger.info(f"Released MCP client for {mcp_name}")
+            except Exception as e:
+                logger.error(f"Error releasing MCP client {mcp_name}: {e}")
+
+def _release_abandoned_lease(future) -> None:
+    """Done-callback for timed-out server loads: give back the lease that load acquired, if any"""
+    if future.cancelled() or future.exception() is not None:
+        return
+    result = future.result()
+    lease = result[0] if isinstance(result, tuple) else result
+    if lease:
+        lease.release()
 
 # Global MCP manager instance
 # mcp_manager = MCPManager()  # Commented out to prevent initialization at import time
@@ -0,0 +1,215 @@
+"""
+MCP Supervisor for TradeArena
+Owns long-lived MCP server subprocesses and hands out refcounted leases
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from strands.tools.mcp import MCPClient
+
+logger = logging.getLogger(__name__)
+
+# Supervisor timings in seconds (overridable through the environment)
+DEFAULT_IDLE_TIMEOUT = float(os.getenv("TRADEARENA_MCP_IDLE_TIMEOUT", "900"))
+DEFAULT_HEALTH_INTERVAL = float(os.getenv("TRADEARENA_MCP_HEALTH_INTERVAL", "15"))
+DEFAULT_PROBE_TIMEOUT = float(os.getenv("TRADEARENA_MCP_PROBE_TIMEOUT", "5"))
+
+class ManagedServer:
+    """One supervised MCP server process and its lease bookkeeping"""
+
+    def __init__(self, name: str, client: MCPClient):
+        self.name = name
+        self.client = client
+        self.refcount = 0
+        self.running = False
+        self.started_at: Optional[float] = None
+        self.last_released = time.monotonic()
+        self.restarts = 0
+        self.lock = threading.Lock()
+
+class MCPLease:
+    """A reference to a running MCP server; release it when the agent is done"""
+
+    def __init__(self, supervisor: "MCPSupervisor", name: str, client: MCPClient):
+        self.supervisor = supervisor
+        self.name = name
+        self.client = client
+        self.released = False
+
+    def release(self) -> None:
+        """Give the lease back to the supervisor (idempotent)"""
+        if not self.released:
+            self.released = True
+            self.supervisor.release(self)
+
+class MCPSupervisor:
+    """Process-wide owner of MCP server subprocesses shared across agents"""
+
+    def __init__(self, idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+                 health_interval: float = DEFAULT_HEALTH_INTERVAL, probe_timeout: float = DEFAULT_PROBE_TIMEOUT):
+        self.idle_timeout = idle_timeout
+        self.health_interval = health_interval
+        self.probe_timeout = probe_timeout
+        self._servers: Dict[str, ManagedServer] = {}
+        self._lock = threading.Lock()
+        self._monitor: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    def acquire(self, mcp_name: str, client_factory: Callable[[str], Optional[MCPClient]]) -> Optional[MCPLease]:
+        """
+        Lease a running MCP server, starting it on first use
+
+        Args:
+            mcp_name: Server name from mcp_config.json
+            client_factory: Creates an MCPClient for the server name (used only once per process)
+
+        Returns:
+            A lease on the running server, or None if it could not be started
+        """
+        self._ensure_monitor()
+
+        with self._lock:
+            server = self._servers.get(mcp_name)
+            if server is None:
+                client = client_factory(mcp_name)
+                if client is None:
+                    return None
+                server = ManagedServer(mcp_name, client)
+                self._servers[mcp_name] = server
+
+        with server.lock:
+            if server.running and not self._is_alive(server.client):
+                logger.warning(f"MCP server {mcp_name} is not responding, restarting")
+                self._stop(server)
+                server.restarts += 1
+            if not server.running:
+                try:
+                    self._start(server)
+                except Exception as e:
+                    logger.error(f"Failed to start MCP server {mcp_name}: {e}")
+                    return None
+            server.refcount += 1
+
+        return MCPLease(self, mcp_name, server.client)
+
+    def release(self, lease: MCPLease) -> None:
+        """Drop a lease; the server keeps running until it idles out"""
+        with self._lock:
+            server = self._servers.get(lease.name)
+        if server is None:
+            return
+        with server.lock:
+            server.refcount = max(0, server.refcount - 1)
+            server.last_released = time.monotonic()
+
+    def check_health(self) -> None:
+        """Restart crashed servers that are still leased and stop idle ones"""
+        with self._lock:
+            servers = list(self._servers.values())
+
+        now = time.monotonic()
+        for server in servers:
+            with server.lock:
+                if not server.running:
+                    continue
+                if server.refcount == 0 and self.idle_timeout > 0 and now - server.last_released > self.idle_timeout:
+                    logger.info(f"Stopping idle MCP server {server.name}")
+                    self._stop(server)
+                    continue
+                if not self._is_alive(server.client):
+                    logger.warning(f"MCP server {server.name} exited or stopped responding, restarting")
+                    self._stop(server)
+                    server.restarts += 1
+                    if server.refcount > 0:
+                        try:
+                            self._start(server)
+                        except Exception as e:
+                            logger.error(f"Failed to restart MCP server {server.name}: {e}")
+
+    def status(self) -> Dict[str, Any]:
+        """Describe supervised servers for diagnostics"""
+        with self._lock:
+            servers = list(self._servers.values())
+        now = time.monotonic()
+        return {
+            server.name: {
+                "running": server.running,
+                "leases": server.refcount,
+                "restarts": server.restarts,
+                "uptime_seconds": round(now - server.started_at, 1) if server.running and server.started_at else 0
+            }
+            for server in servers
+        }
+
+    def shutdown(self) -> None:
+        """Stop every server; called at application shutdown"""
+        self._stop_event.set()
+        with self._lock:
+            servers = list(self._servers.values())
+        for server in servers:
+            with server.lock:
+                self._stop(server)
+        logger.info("MCP supervisor shut down")
+
+    def _start(self, server: ManagedServer) -> None:
+        """Start the server process (caller holds server.lock)"""
+        server.client.__enter__()
+        server.running = True
+        server.started_at = time.monotonic()
+        logger.info(f"Started MCP server {server.name}")
+
+    def _stop(self, server: ManagedServer) -> None:
+        """Stop the server process (caller holds server.lock)"""
+        if not server.running:
+            return
+        try:
+            server.client.__exit__(None, None, None)
+            logger.info(f"Stopped MCP server {server.name}")
+        except Exception as e:
+            logger.error(f"Error stopping MCP server {server.name}: {e}")
+        finally:
+            server.running = False
+
+    def _is_alive(self, client: MCPClient) -> bool:
+        """A client is alive while its session is open and the server answers a ping in time"""
+        # The session thread waits on a close future, so it outlives a crashed or hung server
+        thread = getattr(client, "_background_thread", None)
+        if thread is None or not thread.is_alive():
+            return False
+        close_future = getattr(client, "_close_future", None)
+        session = getattr(client, "_background_thread_session", None)
+        if session is None or (close_future is not None and close_future.done()):
+            return False
+        future = None
+        try:
+            future = client._invoke_on_background_thread(session.send_ping())
+            future.result(timeout=self.probe_timeout)
+            return True
+        except Exception as e:
+            if future is not None:
+                future.cancel()
+            logger.warning(f"MCP server ping failed: {str(e) or type(e).__name__}")
+            return False
+
+    def _ensure_monitor(self) -> None:
+        """Start the health/idle monitor thread on first use"""
+        with self._lock:
+            if self._monitor is not None:
+                return
+            self._monitor = threading.Thread(target=self._run_monitor, name="mcp-supervisor", daemon=True)
+        self._monitor.start()
+
+    def _run_monitor(self) -> None:
+        """Monitor loop: periodic health and idle checks until shutdown"""
+        while not self._stop_event.wait(self.health_interval):
+            try:
+                self.check_health()
+            except Exception as e:
+                logger.error(f"MCP supervisor monitor error: {e}")
+
+# Global MCP supervisor instance
+mcp_supervisor = MCPSupervisor()
@@ -0,0 +1,264 @@
+"""
+Append-only message log for TradeArena sessions
+Stores an agent's messages as one JSONL file plus a fixed-width offset index
+"""
+
+import glob
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from contextlib import ExitStack, contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+LOG_FILE = "messages.jsonl"
+INDEX_FILE = "messages.idx"
+
+# Index record for message k lives at byte k * ENTRY_SIZE: (offset, length) of its line
+ENTRY = struct.Struct("<QQ")
+ENTRY_SIZE = ENTRY.size
+
+# Compact once superseded versions take up this share of the log (and at least MIN bytes)
+COMPACT_GARBAGE_RATIO = 0.5
+COMPACT_MIN_GARBAGE = 64 * 1024
+
+# One lock per log file shared by every MessageLog instance in the process
+_locks: Dict[str, threading.RLock] = {}
+_locks_guard = threading.Lock()
+
+def _lock_for(path: str) -> threading.RLock:
+    with _locks_guard:
+        return _locks.setdefault(path, threading.RLock())
+
+def _encode(record: Dict[str, Any]) -> bytes:
+    return (json.dumps(record, separators=(",", ":"), default=str) + "\n").encode("utf-8")
+
+class MessageLog:
+    """
+    Messages of one agent as an append-only JSONL log with a sidecar offset index
+
+    Updating a message appends its new version and repoints the index entry; the
+    superseded line stays in the log until compaction rewrites it. The index is
+    derived data: it is rebuilt from the log whenever it looks inconsistent.
+    """
+
+    def __init__(self, agent_dir: str):
+        self.agent_dir = agent_dir
+        self.log_path = os.path.join(agent_dir, LOG_FILE)
+        self.index_path = os.path.join(agent_dir, INDEX_FILE)
+        self._lock = _lock_for(os.path.abspath(self.log_path))
+
+    def exists(self) -> bool:
+        """Check whether this agent stores its messages in a log"""
+        return os.path.exists(self.log_path)
+
+    def append(self, record: Dict[str, Any], sync: bool = True) -> int:
+        """
+        Write a message (new or updated version) and point the index at it; returns its size in bytes
+
+        The line is fsync'd before the index entry is written, so a crash never leaves
+        the index pointing past the durable end of the log. Callers writing many records
+        in a batch may pass sync=False and fsync the log once at the end.
+        """
+        message_id = int(record["message_id"])
+        line = _encode(record)
+        with self._lock:
+            os.makedirs(self.agent_dir, exist_ok=True)
+            if self.exists() and not self._index_is_valid():
+                self.rebuild_index()
+            with open(self.log_path, "ab") as log:
+                offset = log.tell()
+                log.write(line)
+                if sync:
+                    log.flush()
+                    os.fsync(log.fileno())
+            self._write_entry(message_id, offset, len(line))
+        return len(line)
+
+    def entries(self) -> List[Tuple[int, int]]:
+        """(offset, length) per message_id; length 0 marks an absent message"""
+        with self._lock:
+            if not self.exists():
+                return []
+            if not self._index_is_valid():
+                self.rebuild_index()
+            with open(self.index_path, "rb") as index:
+                data = index.read()
+        return [ENTRY.unpack_from(data, i) for i in range(0, len(data) - len(data) % ENTRY_SIZE, ENTRY_SIZE)]
+
+    def message_ids(self) -> List[int]:
+        """IDs of stored messages in order"""
+        return [i for i, (_, length) in enumerate(self.entries()) if length]
+
+    def count(self) -> int:
+        """Number of stored messages"""
+        return len(self.message_ids())
+
+    @contextmanager
+    def reader(self) -> Iterator[Callable[[int, int], Optional[Dict[str, Any]]]]:
+        """Map the log once and yield read(offset, length) -> record"""
+        with open(self.log_path, "rb") as log:
+            size = os.fstat(log.fileno()).st_size
+            mapped = mmap.mmap(log.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+            try:
+                def read(offset: int, length: int) -> Optional[Dict[str, Any]]:
+                    if mapped is None or not length or offset + length > size:
+                        return None
+                    return json.loads(mapped[offset:offset + length])
+                yield read
+            finally:
+                if mapped is not None:
+                    mapped.close()
+
+    @contextmanager
+    def snapshot(self) -> Iterator[Tuple[List[Tuple[int, int]], Callable[[int, int], Optional[Dict[str, Any]]]]]:
+        """Yield (entries, read) taken from the same version of the log"""
+        # Index read and log mapped under the lock so compaction cannot replace the log
+        # in between; the mapping keeps the old file readable after a later compaction
+        with ExitStack() as stack:
+            with self._lock:
+                entries = self.entries()
+                read = stack.enter_context(self.reader()) if entries else (lambda offset, length: None)
+            yield entries, read
+
+    def read(self, message_id: int) -> Optional[Dict[str, Any]]:
+        """Read one message: an index lookup and a seek"""
+        with self._lock:
+            entries = self.entries()
+            if message_id < 0 or message_id >= len(entries) or not entries[message_id][1]:
+                return None
+            offset, length = entries[message_id]
+            log = open(self.log_path, "rb")
+        with log:
+            log.seek(offset)
+            return json.loads(log.read(length))
+
+    def read_range(self, offset: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Read stored messages in ID order, skipping the first offset of them"""
+        with self.snapshot() as (entries, read):
+            entries = [entry for entry in entries if entry[1]]
+            entries = entries[offset:offset + limit] if limit is not None else entries[offset:]
+            return [record for record in (read(o, n) for o, n in entries) if record is not None]
+
+    def garbage_bytes(self) -> int:
+        """Bytes held by superseded message versions"""
+        live = sum(length for _, length in self.entries())
+        return max(0, os.path.getsize(self.log_path) - live) if self.exists() else 0
+
+    def maybe_compact(self) -> int:
+        """Compact when superseded versions dominate the log"""
+        if not self.exists():
+            return 0
+        garbage = self.garbage_bytes()
+        if garbage >= COMPACT_MIN_GARBAGE and garbage >= os.path.getsize(self.log_path) * COMPACT_GARBAGE_RATIO:
+            return self.compact()
+        return 0
+
+    def compact(self) -> int:
+        """Rewrite the log with only the current version of each message; returns bytes reclaimed"""
+        with self._lock:
+            if not self.exists():
+                return 0
+            before = os.path.getsize(self.log_path)
+            entries = self.entries()
+
+            fd, tmp_log = tempfile.mkstemp(dir=self.agent_dir, prefix=".messages.", suffix=".jsonl")
+            new_entries = []
+            with os.fdopen(fd, "wb") as out, open(self.log_path, "rb") as log:
+                position = 0
+                for offset, length in entries:
+                    if not length:
+                        new_entries.append((0, 0))
+                        continue
+                    log.seek(offset)
+                    out.write(log.read(length))
+                    new_entries.append((position, length))
+                    position += length
+                out.flush()
+                os.fsync(out.fileno())
+
+            # A crash between the two replaces leaves a stale index, which is detected and rebuilt
+            os.replace(tmp_log, self.log_path)
+            self._write_index(new_entries)
+
+        reclaimed = before - os.path.getsize(self.log_path)
+        logger.info(f"Compacted {self.log_path}: reclaimed {reclaimed} bytes")
+        return reclaimed
+
+    def rebuild_index(self) -> int:
+        """Recreate the index by scanning the log; the last version of each message wins"""
+        with self._lock:
+            latest: Dict[int, Tuple[int, int]] = {}
+            with open(self.log_path, "rb") as log:
+                offset = 0
+                for line in log:
+                    if line.endswith(b"\n"):
+                        try:
+                            latest[int(json.loads(line)["message_id"])] = (offset, len(line))
+                        except Exception:
+                            logger.warning(f"Skipping unreadable line at byte {offset} of {self.log_path}")
+                    offset += len(line)
+            size = max(latest) + 1 if latest else 0
+            self._write_index([latest.get(i, (0, 0)) for i in range(size)])
+        logger.info(f"Rebuilt message index {self.index_path} ({len(latest)} messages)")
+        return len(latest)
+
+    def migrate_from_files(self) -> int:
+        """Move per-file messages (messages/message_<n>.json) into the log; returns messages moved"""
+        messages_dir = os.path.join(self.agent_dir, "messages")
+        message_files = glob.glob(os.path.join(messages_dir, "message_*.json"))
+        if not message_files:
+            return 0
+
+        def message_number(path: str) -> int:
+            return int(os.path.basename(path)[len("message_"):-len(".json")])
+
+        with self._lock:
+            message_files.sort(key=message_number)
+            for message_file in message_files:
+                with open(message_file, "r") as f:
+                    record = json.load(f)
+                record.setdefault("message_id", message_number(message_file))
+                self.append(record, sync=False)
+            with open(self.log_path, "rb") as log:
+                os.fsync(log.fileno())
+            for message_file in message_files:
+                os.remove(message_file)
+
+        logger.info(f"Migrated {len(message_files)} messages into {self.log_path}")
+        return len(message_files)
+
+    def _index_is_valid(self) -> bool:
+        if not os.path.exists(self.index_path):
+            return False
+        index_size = os.path.getsize(self.index_path)
+        if index_size % ENTRY_SIZE:
+            return False
+        if not index_size:
+            return os.path.getsize(self.log_path) == 0
+        # The last entry must end exactly at or before the end of the log
+        with open(self.index_path, "rb") as index:
+            index.seek(index_size - ENTRY_SIZE)
+            offset, length = ENTRY.unpack(index.read(ENTRY_SIZE))
+        return offset + length <= os.path.getsize(self.log_path)
+
+    def _write_entry(self, message_id: int, offset: int, length: int) -> None:
+        mode = "r+b" if os.path.exists(self.index_path) else "w+b"
+        with open(self.index_path, mode) as index:
+            index.seek(0, os.SEEK_END)
+            end = index.tell()
+            if end < message_id * ENTRY_SIZE:
+                index.write(b"\0" * (message_id * ENTRY_SIZE - end))
+            index.seek(message_id * ENTRY_SIZE)
+            index.write(ENTRY.pack(offset, length))
+
+    def _write_index(self, entries: List[Tuple[int, int]]) -> None:
+        fd, tmp_index = tempfile.mkstemp(dir=self.agent_dir, prefix=".messages.", suffix=".idx")
+        with os.fdopen(fd, "wb") as out:
+            out.write(b"".join(ENTRY.pack(offset, length) for offset, length in entries))
+        os.replace(tmp_index, self.index_path)
@@ -0,0 +1,416 @@
+"""
+Model client construction for TradeArena agents
+Builds the Strands model for each AI provider and shares live clients across agents
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+import boto3
+import openai
+from google import genai
+from typing import Any, AsyncGenerator, Callable, Dict, Optional, Tuple
+from strands.models import BedrockModel
+from strands.models.anthropic import AnthropicModel
+from strands.models.gemini import GeminiModel
+from strands.models.openai import OpenAIModel
+from strands.types.exceptions import ContextWindowOverflowException, ModelThrottledException
+
+logger = logging.getLogger(__name__)
+
+# Idle time in seconds after which a shared model client is dropped
+DEFAULT_MODEL_IDLE_TTL = float(os.getenv("TRADEARENA_MODEL_IDLE_TTL", "3600"))
+
+# Config fields that are credentials rather than model settings
+CREDENTIAL_FIELDS = ['api_key']
+
+# Environment variables boto3 reads credentials from
+AWS_CREDENTIAL_ENV_VARS = ['AWS_ACCESS_KEY_ID', 'AWS_SECRET_ACCESS_KEY', 'AWS_SESSION_TOKEN', 'AWS_PROFILE']
+
+# Anthropic cache breakpoint marker
+EPHEMERAL_CACHE = {"type": "ephemeral"}
+
+class LoopClients:
+    """
+    One long-lived SDK client per event loop
+
+    httpx connection pools cannot be shared across event loops, which is why the
+    Strands OpenAI and Gemini models open a client per request. Keeping one per
+    loop gives each loop a warm connection pool instead.
+    """
+
+    def __init__(self, factory: Callable[[], Any]):
+        self._factory = factory
+        self._clients = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def get(self) -> Any:
+        """The client for the running event loop, created on first use"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._clients.get(loop)
+            if client is None:
+                client = self._clients[loop] = self._factory()
+            return client
+
+class SharedClientOpenAIModel(OpenAIModel):
+    """OpenAIModel that streams through a long-lived AsyncOpenAI client instead of one per request"""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._clients = LoopClients(lambda: openai.AsyncOpenAI(**self.client_args))
+
+    async def stream(self, messages: Any, tool_specs: Any = None, system_prompt: Optional[str] = None, *,
+                     tool_choice: Any = None, **kwargs: Any) -> AsyncGenerator[Any, None]:
+        # Same as OpenAIModel.stream (strands 1.18) apart from where the client comes from
+        request = self.format_request(messages, tool_specs, system_prompt, tool_choice)
+        client = self._clients.get()
+        try:
+            response = await client.chat.completions.create(**request)
+        except openai.BadRequestError as e:
+            if getattr(e, "code", None) == "context_length_exceeded":
+                raise ContextWindowOverflowException(str(e)) from e
+            raise
+        except openai.RateLimitError as e:
+            raise ModelThrottledException(str(e)) from e
+
+        yield self.format_chunk({"chunk_type": "message_start"})
+        tool_calls: Dict[int, list] = {}
+        data_type = None
+        finish_reason = None
+        event = None
+
+        async for event in response:
+            if not getattr(event, "choices", None):
+                continue
+            choice = event.choices[0]
+
+            if getattr(choice.delta, "reasoning_content", None):
+                chunks, data_type = self._stream_switch_content("reasoning_content", data_type)
+                for chunk in chunks:
+                    yield chunk
+                yield self.format_chunk({"chunk_type": "content_delta", "data_type": data_type,
+                                         "data": choice.delta.reasoning_content})
+
+            if choice.delta.content:
+                chunks, data_type = self._stream_switch_content("text", data_type)
+                for chunk in chunks:
+                    yield chunk
+                yield self.format_chunk({"chunk_type": "content_delta", "data_type": data_type,
+                                         "data": choice.delta.content})
+
+            for tool_call in choice.delta.tool_calls or []:
+                tool_calls.setdefault(tool_call.index, []).append(tool_call)
+
+            if choice.finish_reason:
+                finish_reason = choice.finish_reason
+                if data_type:
+                    yield self.format_chunk({"chunk_type": "content_stop", "data_type": data_type})
+                break
+
+        for tool_deltas in tool_calls.values():
+            yield self.format_chunk({"chunk_type": "content_start", "data_type": "tool", "data": tool_deltas[0]})
+            for tool_delta in tool_deltas:
+                yield self.format_chunk({"chunk_type": "content_delta", "data_type": "tool", "data": tool_delta})
+            yield self.format_chunk({"chunk_type": "content_stop", "data_type": "tool"})
+
+        yield self.format_chunk({"chunk_type": "message_stop", "data": finish_reason or "end_turn"})
+
+        # Only the final usage payload is left in the stream
+        async for event in response:
+            pass
+        if event and getattr(event, "usage", None):
+            yield self.format_chunk({"chunk_type": "metadata", "data": event.usage})
+
+class SharedClientGeminiModel(GeminiModel):
+    """GeminiModel that streams through a long-lived genai client instead of one per request"""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._clients = LoopClients(lambda: genai.Client(**self.client_args).aio)
+
+    async def stream(self, messages: Any, tool_specs: Any = None, system_prompt: Optional[str] = None,
+                     tool_choice: Any = None, **kwargs: Any) -> AsyncGenerator[Any, None]:
+        # Same as GeminiModel.stream (strands 1.18) apart from where the client comes from
+        request = self._format_request(messages, tool_specs, system_prompt, self.config.get("params"))
+        client = self._clients.get()
+        try:
+            response = await client.models.generate_content_stream(**request)
+
+            yield self._format_chunk({"chunk_type": "message_start"})
+            yield self._format_chunk({"chunk_type": "content_start", "data_type": "text"})
+
+            tool_used = False
+            candidate = None
+            event = None
+            async for event in response:
+                candidate = event.candidates[0] if event.candidates else None
+                content = candidate.content if candidate else None
+                for part in (content.parts if content and content.parts else []):
+                    if part.function_call:
+                        for chunk_type in ("content_start", "content_delta", "content_stop"):
+                            yield self._format_chunk({"chunk_type": chunk_type, "data_type": "tool", "data": part})
+                        tool_used = True
+                    if part.text:
+                        yield self._format_chunk({"chunk_type": "content_delta",
+                                                  "data_type": "reasoning_content" if part.thought else "text",
+                                                  "data": part})
+
+            yield self._format_chunk({"chunk_type": "content_stop", "data_type": "text"})
+            yield self._format_chunk({
+                "chunk_type": "message_stop",
+                "data": "TOOL_USE" if tool_used else (candidate.finish_reason if candidate else "STOP")
+            })
+            yield self._format_chunk({"chunk_type": "metadata", "data": event.usage_metadata})
+
+        except genai.errors.ClientError as error:
+            try:
+                message = json.loads(error.message) if error.message else None
+            except json.JSONDecodeError:
+                message = None
+            if not message:
+                raise
+            status = message["error"]["status"]
+            if status in ("RESOURCE_EXHAUSTED", "UNAVAILABLE"):
+                raise ModelThrottledException(error.message) from error
+            if status == "INVALID_ARGUMENT" and "exceeds the maximum number of tokens" in message["error"]["message"]:
+                raise ContextWindowOverflowException(error.message) from error
+            raise
+
+class CachingAnthropicModel(AnthropicModel):
+    """AnthropicModel with cache breakpoints after the system prompt and the tool block"""
+
+    def format_request(self, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        request = super().format_request(*args, **kwargs)
+        if isinstance(request.get("system"), str):
+            request["system"] = [{"type": "text", "text": request["system"], "cache_control": EPHEMERAL_CACHE}]
+        if request.get("tools"):
+            request["tools"][-1] = {**request["tools"][-1], "cache_control": EPHEMERAL_CACHE}
+        return request
+
+    def format_chunk(self, event: Dict[str, Any]) -> Any:
+        chunk = super().format_chunk(event)
+        if event.get("type") == "metadata":
+            # Report cache reads and writes the way Bedrock does
+            usage = event["usage"]
+            chunk["metadata"]["usage"]["cacheReadInputTokens"] = usage.get("cache_read_input_tokens") or 0
+            chunk["metadata"]["usage"]["cacheWriteInputTokens"] = usage.get("cache_creation_input_tokens") or 0
+        return chunk
+
+class CachingOpenAIModel(SharedClientOpenAIModel):
+    """OpenAIModel that reports the prompt tokens served from the provider's automatic prefix cache"""
+
+    def format_chunk(self, event: Dict[str, Any], **kwargs: Any) -> Any:
+        chunk = super().format_chunk(event, **kwargs)
+        if event.get("chunk_type") == "metadata":
+            details = getattr(event["data"], "prompt_tokens_details", None)
+            chunk["metadata"]["usage"]["cacheReadInputTokens"] = getattr(details, "cached_tokens", None) or 0
+        return chunk
+
+def create_model(ai_provider: str, config: Dict[str, Any], boto_session: boto3.Session = None,
+                 prompt_caching: bool = False) -> Any:
+    """
+    Create the Strands model for an AI provider from agent configuration
+
+    With prompt_caching, Bedrock caches the tool block (the system prompt cache point
+    is passed with the prompt itself) and Anthropic gets cache breakpoints after the
+    system prompt and the tools. OpenAI-compatible servers cache prompt prefixes on
+    their own; only the cached token count is surfaced.
+    """
+    if ai_provider == "amazon-bedrock":
+        model_id = config.get('model_id', 'us.anthropic.claude-sonnet-4-5-20250929-v1:0')
+        region_name = config.get('region_name', 'us-east-1')
+
+        if boto_session is None:
+            boto_session = boto3.Session(region_name=region_name)
+        cache_config = {"cache_tools": "default"} if prompt_caching else {}
+        model = BedrockModel(model_id=model_id, boto_session=boto_session, **cache_config)
+
+        logger.info(f"Created Amazon Bedrock model: {model_id} in {region_name}")
+        return model
+
+    elif ai_provider == "anthropic":
+        api_key = config.get('api_key')
+        if not api_key:
+            raise ValueError("API key is required for Anthropic provider")
+
+        model_id = config.get('model_id', 'claude-sonnet-4-5-20250929')
+        max_tokens = config.get('max_tokens', 4096)
+
+        model_class = CachingAnthropicModel if prompt_caching else AnthropicModel
+        model = model_class(
+            client_args={"api_key": api_key},
+            model_id=model_id,
+            max_tokens=max_tokens
+        )
+
+        logger.info(f"Created Anthropic model: {model_id}")
+        return model
+
+    elif ai_provider == "gemini":
+        api_key = config.get('api_key')
+        if not api_key:
+            raise ValueError("API key is required for Gemini provider")
+
+        model_id = config.get('model_id', 'gemini-2.5-flash')
+        max_output_tokens = config.get('max_output_tokens', 2048)
+        temperature = config.get('temperature', 0.7)
+        top_p = config.get('top_p', 0.9)
+        top_k = config.get('top_k', 40)
+
+        model = SharedClientGeminiModel(
+            client_args={"api_key": api_key},
+            model_id=model_id,
+            params={
+                "temperature": temperature,
+                "max_output_tokens": max_output_tokens,
+                "top_p": top_p,
+                "top_k": top_k
+            }
+        )
+
+        logger.info(f"Created Gemini model: {model_id}")
+        return model
+
+    elif ai_provider == "openai-compatible":
+        api_key = config.get('api_key')
+        if not api_key:
+            raise ValueError("API key is required for OpenAI Compatible provider")
+
+        model_id = config.get('model_id', 'gpt-4o')
+        base_url = config.get('base_url')
+        max_tokens = config.get('max_tokens', 4000)
+        temperature = config.get('temperature', 0.7)
+
+        client_args = {"api_key": api_key}
+        if base_url:
+            client_args["base_url"] = base_url
+
+        model_class = CachingOpenAIModel if prompt_caching else SharedClientOpenAIModel
+        model = model_class(
+            client_args=client_args,
+            model_id=model_id,
+            params={
+                "max_tokens": max_tokens,
+                "temperature": temperature
+            }
+        )
+
+        logger.info(f"Created OpenAI Compatible model: {model_id} (base_url: {base_url or 'default'})")
+        return model
+
+    else:
+        raise ValueError(f"Unsupported AI provider: {ai_provider}")
+
+class ModelEntry:
+    """A shared model client and when it was last handed out"""
+
+    def __init__(self, key: str, model: Any):
+        self.key = key
+        self.model = model
+        self.last_used = time.monotonic()
+
+class ModelRegistry:
+    """
+    Shares model clients (and their connection pools) across agents and sessions
+
+    Entries are keyed by provider + credentials hash + endpoint (region/base_url) +
+    model settings, so agents on different accounts get their own clients. When an
+    agent's own credentials change, the client it used before is dropped unless
+    another agent still uses it; anything else left behind expires with the idle TTL.
+    """
+
+    def __init__(self, idle_ttl: float = DEFAULT_MODEL_IDLE_TTL):
+        self.idle_ttl = idle_ttl
+        self._models: Dict[str, ModelEntry] = {}
+        self._agent_keys: Dict[str, str] = {}
+        self._boto_sessions: Dict[Tuple[str, str], boto3.Session] = {}
+        self._lock = threading.Lock()
+
+    def registry_key(self, ai_provider: str, config: Dict[str, Any], prompt_caching: bool = False) -> str:
+        """Key of the endpoint, settings and credentials a client is built from"""
+        settings = {k: v for k, v in config.items() if k not in CREDENTIAL_FIELDS}
+        return self._hash([ai_provider, settings, prompt_caching, self._credentials_hash(ai_provider, config)])
+
+    def get_model(self, ai_provider: str, config: Dict[str, Any], prompt_caching: bool = False,
+                  agent_id: str = None) -> Any:
+        """Get a shared model for the provider config, creating it on first use"""
+        self.evict_idle()
+        key = self.registry_key(ai_provider, config, prompt_caching)
+
+        with self._lock:
+            self._track_agent(ai_provider, agent_id, key)
+            entry = self._models.get(key)
+            if entry:
+                entry.last_used = time.monotonic()
+                return entry.model
+
+        boto_session = None
+        if ai_provider == "amazon-bedrock":
+            boto_session = self._get_boto_session(config.get('region_name', 'us-east-1'))
+        model = create_model(ai_provider, config, boto_session=boto_session, prompt_caching=prompt_caching)
+
+        with self._lock:
+            entry = self._models.setdefault(key, ModelEntry(key, model))
+        return entry.model
+
+    def _track_agent(self, ai_provider: str, agent_id: Optional[str], key: str) -> None:
+        """Remember the agent's client; drop its previous one if no other agent shares it (call under lock)"""
+        if not agent_id:
+            return
+        previous = self._agent_keys.get(agent_id)
+        self._agent_keys[agent_id] = key
+        if previous and previous != key and previous not in self._agent_keys.values():
+            if self._models.pop(previous, None):
+                logger.info(f"Replaced {ai_provider} model client of agent {agent_id} after a config change")
+
+    def evict_idle(self) -> int:
+        """Drop model clients unused for longer than the idle TTL"""
+        now = time.monotonic()
+        with self._lock:
+            expired = [k for k, e in self._models.items() if now - e.last_used > self.idle_ttl]
+            for key in expired:
+                del self._models[key]
+            self._agent_keys = {a: k for a, k in self._agent_keys.items() if k in self._models}
+        if expired:
+            logger.info(f"Evicted {len(expired)} idle model client(s)")
+        return len(expired)
+
+    def invalidate(self) -> None:
+        """Drop every shared client, e.g. after credentials were reloaded"""
+        with self._lock:
+            self._models.clear()
+            self._agent_keys.clear()
+            self._boto_sessions.clear()
+
+    def _get_boto_session(self, region_name: str) -> boto3.Session:
+        """One boto3 session per region and AWS credentials, so botocore data loads once"""
+        session_key = (region_name, self._credentials_hash("amazon-bedrock", {}))
+        with self._lock:
+            session = self._boto_sessions.get(session_key)
+            if session is None:
+                # Forget sessions for this region that hold outdated credentials
+                for stale_key in [k for k in self._boto_sessions if k[0] == region_name]:
+                    del self._boto_sessions[stale_key]
+                session = boto3.Session(region_name=region_name)
+                self._boto_sessions[session_key] = session
+            return session
+
+    def _credentials_hash(self, ai_provider: str, config: Dict[str, Any]) -> str:
+        if ai_provider == "amazon-bedrock":
+            credentials = [os.environ.get(name, "") for name in AWS_CREDENTIAL_ENV_VARS]
+        else:
+            credentials = [config.get(field, "") for field in CREDENTIAL_FIELDS]
+        return self._hash(credentials)
+
+    @staticmethod
+    def _hash(value: Any) -> str:
+        return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+# Global model registry instance
+model_registry = ModelRegistry()
@@ -0,0 +1,131 @@
+"""
+Render cache for TradeArena pages
+Keeps rendered template HTML keyed on the template inputs and answers revalidations with 304
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Callable, Iterable, Optional, Tuple
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import HTMLResponse, Response
+
+logger = logging.getLogger(__name__)
+
+# Number of rendered pages kept in memory
+RENDER_CACHE_SIZE = int(os.getenv("TRADEARENA_RENDER_CACHE_SIZE", "256"))
+
+# Browsers keep the page but must revalidate it (a cheap 304) before every use
+PAGE_CACHE_CONTROL = "no-cache"
+
+def etag_for(body: bytes) -> str:
+    """Strong ETag of a response body"""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+def _opaque_tag(etag: str) -> str:
+    return etag[2:] if etag.startswith("W/") else etag
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check a request's If-None-Match header against an ETag (weak comparison)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [_opaque_tag(candidate.strip()) for candidate in header.split(",")]
+    return "*" in candidates or _opaque_tag(etag) in candidates
+
+def http_date(timestamp: float) -> str:
+    """Format a Unix timestamp as an HTTP date (for Last-Modified)"""
+    return formatdate(timestamp, usegmt=True)
+
+def latest_timestamp(values: Iterable[Optional[str]]) -> Optional[float]:
+    """Newest of a set of ISO-8601 timestamps as a Unix timestamp, or None if none parse"""
+    latest = None
+    for value in values:
+        try:
+            parsed = datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            continue
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        latest = max(latest or parsed.timestamp(), parsed.timestamp())
+    return latest
+
+def not_modified(request: Request, etag: str, last_modified: Optional[float] = None) -> bool:
+    """Whether the client's copy is current; If-None-Match takes precedence over If-Modified-Since"""
+    if request.headers.get("if-none-match"):
+        return etag_matches(request, etag)
+    since = request.headers.get("if-modified-since")
+    if not since or last_modified is None:
+        return False
+    try:
+        return int(last_modified) <= parsedate_to_datetime(since).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+def conditional_response(request: Request, body: bytes, media_type: str,
+                         last_modified: Optional[float] = None) -> Response:
+    """Response with ETag (and Last-Modified when known), or 304 Not Modified when the client already has it"""
+    etag = etag_for(body)
+    headers = {"ETag": etag, "Cache-Control": PAGE_CACHE_CONTROL}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    if not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type=media_type, headers=headers)
+
+def conditional_json(request: Request, content: Any, last_modified: Optional[float] = None) -> Response:
+    """JSON version of conditional_response, serialized the way FastAPI would"""
+    body = json.dumps(jsonable_encoder(content), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return conditional_response(request, body, "application/json", last_modified)
+
+class RenderCache:
+    """LRU of rendered pages; the key must include every input the template reads"""
+
+    def __init__(self, max_size: int = RENDER_CACHE_SIZE):
+        self.max_size = max_size
+        self._pages: "OrderedDict[tuple, Tuple[bytes, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, key: Tuple[Any, ...], build: Callable[[], str]) -> Tuple[bytes, str]:
+        """(body, etag) of the page for key, building it on a miss"""
+        with self._lock:
+            page = self._pages.get(key)
+            if page is not None:
+                self._pages.move_to_end(key)
+                self.hits += 1
+                return page
+            self.misses += 1
+
+        body = build().encode("utf-8")
+        page = (body, etag_for(body))
+        with self._lock:
+            self._pages[key] = page
+            self._pages.move_to_end(key)
+            while len(self._pages) > self.max_size:
+                self._pages.popitem(last=False)
+        return page
+
+    def response(self, request: Request, key: Tuple[Any, ...], build: Callable[[], str]) -> Response:
+        """HTML response for the page, or 304 Not Modified when the client already has it"""
+        body, etag = self.render(key, build)
+        headers = {"ETag": etag, "Cache-Control": PAGE_CACHE_CONTROL}
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers=headers)
+        return HTMLResponse(body, headers=headers)
+
+    def clear(self) -> None:
+        """Drop every rendered page"""
+        with self._lock:
+            self._pages.clear()
+
+# Global render cache instance
+render_cache = RenderCache()
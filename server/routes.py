@@ -4,20 +4,16 @@ All API and page routes
 """
 
 from fastapi import Request, Query
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 import asyncio
+import json
 import uuid
 import os
 import logging
-import boto3
 from strands import Agent
 from strands.agent.conversation_manager import SlidingWindowConversationManager
-from strands.models import BedrockModel
-from strands.models.anthropic import AnthropicModel
-from strands.models.gemini import GeminiModel
-from strands.models.openai import OpenAIModel
-from strands.session.file_session_manager import FileSessionManager
 from .templates import (
     main_page_template,
     interactive_mode_template,
@@ -34,14 +30,30 @@ from .templates import (
     settings_template
 )
 from .settings import settings_manager
-from .agents import agent_manager, AI_PROVIDERS, TRADING_CHAINS
+from .agents import agent_manager, AI_PROVIDERS, TRADING_CHAINS, PROVIDER_CONFIGS
 from .sessions import session_manager
+from .session_store import create_session_manager
 from .tools import ( 
     create_custom_view,
     list_available_views
 )
 from .views_manager import views_manager
 from .mcp_manager import MCPManager
+from .agent_pool import agent_pool
+from .mcp_supervisor import mcp_supervisor
+from .warmup import warmup_state
+from .models import model_registry
+from .render_cache import render_cache, conditional_json, latest_timestamp
+from .view_cache import view_cache
+from .assets import static_assets
+
+logger = logging.getLogger(__name__)
+
+# Messages embedded when a chat page opens; older ones are fetched with "load earlier"
+REPLAY_MESSAGE_LIMIT = 50
+
+# Provider and chain lists rendered into the agent pages; fixed for the life of the process
+PAGE_CATALOG_VERSION = agent_pool.fingerprint(AI_PROVIDERS, TRADING_CHAINS, PROVIDER_CONFIGS)[:16]
 
 def create_conversation_manager() -> SlidingWindowConversationManager:
     """Create conversation manager with fixed settings for all agents"""
@@ -50,8 +62,19 @@ def create_conversation_manager() -> SlidingWindowConversationManager:
         should_truncate_results=True  # Fixed truncation setting
     )
 
+# (settings version, prompt) of the last system prompt built
+_system_prompt_cache = (None, None)
+
 def get_tradearena_system_prompt() -> str:
-    """Get the TradeArena System Prompt with conditional Walrus persistence and Web Search"""
+    """Get the TradeArena System Prompt, rebuilt only when the settings version changes"""
+    global _system_prompt_cache
+    version = settings_manager.current_version()
+    if _system_prompt_cache[0] != version:
+        _system_prompt_cache = (version, build_tradearena_system_prompt())
+    return _system_prompt_cache[1]
+
+def build_tradearena_system_prompt() -> str:
+    """Build the TradeArena System Prompt with conditional Walrus persistence and Web Search"""
     
     # Check if Walrus and Web Search are enabled
     walrus_enabled = settings_manager.is_walrus_enabled()
@@ -104,7 +127,7 @@ Use web search when you need current information that may not be available throu
 
     return system_prompt
 
-def initialize_strands_agent(agent_data: dict, agent_id: str, session_id: str = None) -> tuple[Agent, str]:
+def initialize_strands_agent(agent_data: dict, agent_id: str, session_id: str = None, mcp_manager: MCPManager = None) -> tuple[Agent, str]:
     """Initialize a Strands agent with the given configuration"""
 
     # Extract configuration from agent data
@@ -113,6 +136,10 @@ def initialize_strands_agent(agent_data: dict, agent_id: str, session_id: str =
     
     # Get the conditional TradeArena System Prompt
     system_prompt = get_tradearena_system_prompt()
+    prompt_caching = settings_manager.is_prompt_caching_enabled()
+    if prompt_caching and ai_provider == "amazon-bedrock":
+        # Cache point right after the system prompt (the tool block gets one from the model config)
+        system_prompt = [{"text": system_prompt}, {"cachePoint": {"type": "default"}}]
     
     # Setup logging for this specific agent
     logger = logging.getLogger(f"strands.{agent_id}")
@@ -132,9 +159,11 @@ def initialize_strands_agent(agent_data: dict, agent_id: str, session_id: str =
     sessions_dir = os.path.join(os.getcwd(), "sessions")
     os.makedirs(sessions_dir, exist_ok=True)
     
-    session_manager = FileSessionManager(
+    # Session writes also keep the session catalog current
+    agent_session_manager = create_session_manager(
         session_id=session_id,
-        storage_dir=sessions_dir
+        storage_dir=sessions_dir,
+        catalog=session_manager.catalog
     )
     
     # Create conversation manager with fixed settings
@@ -173,176 +202,45 @@ def initialize_strands_agent(agent_data: dict, agent_id: str, session_id: str =
         except ImportError:
             logger.warning("strands_tools not available - web search disabled")
     
-    # Create MCP manager instance on-demand
-    mcp_manager = MCPManager()
+    # Create MCP manager instance on-demand unless the caller owns one
+    if mcp_manager is None:
+        mcp_manager = MCPManager()
     
-    # Initialize agent based on provider
-    if ai_provider == "amazon-bedrock":
-        model_id = config.get('model_id', 'us.anthropic.claude-sonnet-4-5-20250929-v1:0')
-        region_name = config.get('region_name', 'us-east-1')
-        
-        boto_session = boto3.Session(region_name=region_name)
-        model = BedrockModel(model_id=model_id, boto_session=boto_session)
-        
-        # Get MCP tools for this trading chain with persistent clients
-        mcp_tools, persistent_clients = mcp_manager.get_mcp_tools(trading_chain)
-        all_tools = mcp_tools + additional_tools
-        
-        # Store persistent clients separately (not in agent state to avoid JSON serialization issues)
-        # We'll manage them through the MCP manager instead
-        
-        trading_agent = Agent(
-            name=f"trading_agent_{agent_id}",
-            agent_id=f"trading_agent_{agent_id}",
-            tools=all_tools,
-            model=model,
-            session_manager=session_manager,
-            conversation_manager=conversation_manager,
-            callback_handler=None,
-            state=agent_state,
-            system_prompt=system_prompt
-        )
-        
-        logger.info(f"Initialized Amazon Bedrock agent: {model_id} in {region_name}")
-        return trading_agent, session_id
+    # Reuse the shared model client for this provider configuration
+    model = model_registry.get_model(ai_provider, config, prompt_caching=prompt_caching, agent_id=agent_id)
     
-    elif ai_provider == "anthropic":
-        api_key = config.get('api_key')
-        if not api_key:
-            raise ValueError("API key is required for Anthropic provider")
-        
-        model_id = config.get('model_id', 'claude-sonnet-4-5-20250929')
-        max_tokens = config.get('max_tokens', 4096)
-        
-        model = AnthropicModel(
-            client_args={"api_key": api_key},
-            model_id=model_id,
-            max_tokens=max_tokens
-        )
-        
-        # Get MCP tools for this trading chain with persistent clients
-        mcp_tools, persistent_clients = mcp_manager.get_mcp_tools(trading_chain)
-        all_tools = mcp_tools + additional_tools
-        
-        # Store persistent clients separately (not in agent state to avoid JSON serialization issues)
-        # We'll manage them through the MCP manager instead
-        
-        trading_agent = Agent(
-            name=f"trading_agent_{agent_id}",
-            agent_id=f"trading_agent_{agent_id}",
-            tools=all_tools,
-            model=model,
-            session_manager=session_manager,
-            conversation_manager=conversation_manager,
-            callback_handler=None,
-            state=agent_state,
-            system_prompt=system_prompt
-        )
-        
-        logger.info(f"Initialized Anthropic agent: {model_id}")
-        return trading_agent, session_id
+    # Get MCP tools for this trading chain with persistent clients
+    mcp_tools, persistent_clients = mcp_manager.get_mcp_tools(trading_chain)
+    all_tools = mcp_tools + additional_tools
     
-    elif ai_provider == "gemini":
-        api_key = config.get('api_key')
-        if not api_key:
-            raise ValueError("API key is required for Gemini provider")
-        
-        model_id = config.get('model_id', 'gemini-2.5-flash')
-        max_output_tokens = config.get('max_output_tokens', 2048)
-        temperature = config.get('temperature', 0.7)
-        top_p = config.get('top_p', 0.9)
-        top_k = config.get('top_k', 40)
-        
-        model = GeminiModel(
-            client_args={"api_key": api_key},
-            model_id=model_id,
-            params={
-                "temperature": temperature,
-                "max_output_tokens": max_output_tokens,
-                "top_p": top_p,
-                "top_k": top_k
-            }
-        )
-        
-        # Get MCP tools for this trading chain with persistent clients
-        mcp_tools, persistent_clients = mcp_manager.get_mcp_tools(trading_chain)
-        all_tools = mcp_tools + additional_tools
-        
-        # Store persistent clients separately (not in agent state to avoid JSON serialization issues)
-        # We'll manage them through the MCP manager instead
-        
-        trading_agent = Agent(
-            name=f"trading_agent_{agent_id}",
-            agent_id=f"trading_agent_{agent_id}",
-            tools=all_tools,
-            model=model,
-            session_manager=session_manager,
-            conversation_manager=conversation_manager,
-            callback_handler=None,
-            state=agent_state,
-            system_prompt=system_prompt
-        )
-        
-        logger.info(f"Initialized Gemini agent: {model_id}")
-        return trading_agent, session_id
+    # Store persistent clients separately (not in agent state to avoid JSON serialization issues)
+    # We'll manage them through the MCP manager instead
     
-    elif ai_provider == "openai-compatible":
-        api_key = config.get('api_key')
-        if not api_key:
-            raise ValueError("API key is required for OpenAI Compatible provider")
-        
-        model_id = config.get('model_id', 'gpt-4o')
-        base_url = config.get('base_url')
-        max_tokens = config.get('max_tokens', 4000)
-        temperature = config.get('temperature', 0.7)
-        
-        client_args = {"api_key": api_key}
-        if base_url:
-            client_args["base_url"] = base_url
-        
-        model = OpenAIModel(
-            client_args=client_args,
-            model_id=model_id,
-            params={
-                "max_tokens": max_tokens,
-                "temperature": temperature
-            }
-        )
-        
-        # Get MCP tools for this trading chain with persistent clients
-        mcp_tools, persistent_clients = mcp_manager.get_mcp_tools(trading_chain)
-        all_tools = mcp_tools + additional_tools
-        
-        # Store persistent clients separately (not in agent state to avoid JSON serialization issues)
-        # We'll manage them through the MCP manager instead
-        
-        trading_agent = Agent(
-            name=f"trading_agent_{agent_id}",
-            agent_id=f"trading_agent_{agent_id}",
-            tools=all_tools,
-            model=model,
-            session_manager=session_manager,
-            conversation_manager=conversation_manager,
-            callback_handler=None,
-            state=agent_state,
-            system_prompt=system_prompt
-        )
-        
-        logger.info(f"Initialized OpenAI Compatible agent: {model_id} (base_url: {base_url or 'default'})")
-        return trading_agent, session_id
+    trading_agent = Agent(
+        name=f"trading_agent_{agent_id}",
+        agent_id=f"trading_agent_{agent_id}",
+        tools=all_tools,
+        model=model,
+        session_manager=agent_session_manager,
+        conversation_manager=conversation_manager,
+        callback_handler=None,
+        state=agent_state,
+        system_prompt=system_prompt
+    )
     
-    else:
-        raise ValueError(f"Unsupported AI provider: {ai_provider}")
+    logger.info(f"Initialized {ai_provider} agent with {len(all_tools)} tools")
+    return trading_agent, session_id
 
-def cleanup_agent_resources(agent_instance: Agent):
+def cleanup_agent_resources(agent_instance: Agent, mcp_manager: MCPManager = None):
     """Clean up resources associated with an agent"""
     try:
         # Get trading chain from agent state to clean up MCP clients
         agent_state = getattr(agent_instance, 'state', {})
         trading_chain = agent_state.get("agent_config", {}).get("trading_chain", "unknown")
         
-        # Create MCP manager instance on-demand for cleanup
-        mcp_manager = MCPManager()
+        # Fall back to an on-demand MCP manager when the owning one is not known
+        if mcp_manager is None:
+            mcp_manager = MCPManager()
         
         # Clean up MCP clients through the MCP manager
         if trading_chain and trading_chain != "unknown":
@@ -352,6 +250,30 @@ def cleanup_agent_resources(agent_instance: Agent):
     except Exception as e:
         logger.error(f"Error during agent cleanup: {e}")
 
+def build_pooled_agent(agent_data: dict, agent_id: str, session_id: str = None) -> tuple:
+    """Agent pool factory: build an agent and the hook that releases its MCP clients"""
+    mcp_manager = MCPManager()
+    agent_instance, agent_session_id = initialize_strands_agent(agent_data, agent_id, session_id, mcp_manager=mcp_manager)
+    return agent_instance, agent_session_id, lambda: cleanup_agent_resources(agent_instance, mcp_manager)
+
+def get_agent_fingerprint(agent_data: dict) -> str:
+    """Fingerprint of everything a pooled agent was built from"""
+    return agent_pool.fingerprint(agent_data, settings_manager.current_version())
+
+# Token counters reported after every chat turn
+USAGE_FIELDS = ["inputTokens", "outputTokens", "cacheReadInputTokens", "cacheWriteInputTokens"]
+
+def get_turn_usage(agent_instance: Agent, usage_before: dict) -> dict:
+    """Token usage of the last turn: the agent's accumulated usage minus a snapshot taken before it"""
+    usage_after = agent_instance.event_loop_metrics.accumulated_usage
+    return {field: usage_after.get(field, 0) - usage_before.get(field, 0) for field in USAGE_FIELDS}
+
+def on_settings_change(version: int, settings: dict) -> None:
+    """Pooled agents were built with the old prompt and tool list"""
+    agent_pool.invalidate()
+
+settings_manager.subscribe(on_settings_change)
+
 def get_agent_data_for_session(agent_id: str, session_id: str = None) -> dict:
     """
     Get agent data for a session, combining session state with agent manager data
@@ -405,14 +327,23 @@ def setup_routes(app):
     """Setup all routes for the FastAPI app"""
     
     @app.get("/")
-    async def root():
+    async def root(request: Request):
         """Main terminal interface"""
-        return HTMLResponse(main_page_template(agent_manager.get_agents()))
+        version, agents = agent_manager.version, agent_manager.get_agents()
+        return render_cache.response(request, ("main", version),
+                                     lambda: main_page_template(agents))
+    
+    @app.get("/static/{filename}")
+    async def static_asset(request: Request, filename: str):
+        """Shared CSS/JS under content-hashed names, cached by browsers indefinitely"""
+        return static_assets.response(request, filename)
     
     @app.get("/select-agent-for-session")
-    async def select_agent_for_session():
+    async def select_agent_for_session(request: Request):
         """Select agent for session page"""
-        return HTMLResponse(select_agent_for_session_template(agent_manager.get_agents()))
+        version, agents = agent_manager.version, agent_manager.get_agents()
+        return render_cache.response(request, ("select-agent", version),
+                                     lambda: select_agent_for_session_template(agents))
     
     @app.get("/chat-session/{agent_id}")
     async def chat_session(agent_id: str, session_id: str = Query(None)):
@@ -423,7 +354,7 @@ def setup_routes(app):
             messages = []
             if session_id:
                 try:
-                    messages = session_manager.get_session_messages(session_id)
+                    messages = session_manager.get_session_messages(session_id, limit=REPLAY_MESSAGE_LIMIT)
                 except Exception as e:
                     print(f"[DEBUG] Error loading session messages: {e}")
                     messages = []
@@ -458,14 +389,36 @@ def setup_routes(app):
         
         print(f"[DEBUG] Agent data retrieved successfully: {agent_data.get('name', 'Unknown')}")
         
-        agent_instance = None
+        pooled = None
+        handed_back = False
+        
+        def hand_back(completed: bool) -> None:
+            """Return the pooled agent exactly once: kept warm after a full turn, dropped otherwise"""
+            nonlocal handed_back
+            if pooled is None or handed_back:
+                return
+            handed_back = True
+            if completed:
+                agent_pool.release(pooled)
+            else:
+                agent_pool.discard(pooled)
+        
         try:
-            # Initialize agent with configuration
-            print(f"[DEBUG] Initializing Strands agent...")
-            agent_instance, agent_session_id = initialize_strands_agent(agent_data, agent_id, session_id)
-            print(f"[DEBUG] Agent initialized successfully with session ID: {agent_session_id}")
+            # Reuse a warm agent for this session or build one; a build starts MCP servers, so keep it off the event loop
+            print(f"[DEBUG] Acquiring Strands agent from pool...")
+            pooled = await asyncio.to_thread(
+                agent_pool.acquire,
+                agent_id,
+                session_id,
+                get_agent_fingerprint(agent_data),
+                lambda: build_pooled_agent(agent_data, agent_id, session_id)
+            )
+            agent_instance = pooled.agent
+            agent_session_id = pooled.session_id
+            print(f"[DEBUG] Agent ready with session ID: {agent_session_id}")
             
             async def generate_response():
+                completed = False
                 try:
                     print(f"[DEBUG] Starting stream for message: {message}")
                     
@@ -476,39 +429,51 @@ def setup_routes(app):
                     
                     text_sent = False
                     
-                    # Stream response from agent
-                    agent_stream = agent_instance.stream_async(message)
-                    async for event in agent_stream:
-                        print(f"[DEBUG] Stream event type: {type(event)}, content: {event}")
+                    # Only one turn per pooled agent at a time
+                    async with pooled.lock:
+                        usage_before = dict(agent_instance.event_loop_metrics.accumulated_usage)
                         
-                        # Extract text content with priority order
-                        text_content = ""
-                        if isinstance(event, dict):
-                            if 'data' in event and isinstance(event['data'], str) and event['data'].strip():
-                                text_content = event['data']
-                                print(f"[DEBUG] Processing data field: '{text_content}'")
-                                text_sent = True
-                            elif 'message' in event and not text_sent:
-                                message_data = event['message']
-                                if isinstance(message_data, dict) and 'content' in message_data:
-                                    content_list = message_data['content']
-                                    if content_list and len(content_list) > 0:
-                                        first_content = content_list[0]
-                                        if isinstance(first_content, dict) and 'text' in first_content:
-                                            text_content = first_content['text']
-                                            print(f"[DEBUG] Processing message field: '{text_content}'")
-                            elif 'event' in event:
-                                event_data = event['event']
-                                if isinstance(event_data, dict) and 'contentBlockDelta' in event_data:
-                                    print(f"[DEBUG] Skipping contentBlockDelta to prevent duplication")
-                                    continue
-                        elif isinstance(event, str):
-                            text_content = event
+                        # Stream response from agent
+                        agent_stream = agent_instance.stream_async(message)
+                        async for event in agent_stream:
+                            print(f"[DEBUG] Stream event type: {type(event)}, content: {event}")
+                            
+                            # Extract text content with priority order
+                            text_content = ""
+                            if isinstance(event, dict):
+                                if 'data' in event and isinstance(event['data'], str) and event['data'].strip():
+                                    text_content = event['data']
+                                    print(f"[DEBUG] Processing data field: '{text_content}'")
+                                    text_sent = True
+                                elif 'message' in event and not text_sent:
+                                    message_data = event['message']
+                                    if isinstance(message_data, dict) and 'content' in message_data:
+                                        content_list = message_data['content']
+                                        if content_list and len(content_list) > 0:
+                                            first_content = content_list[0]
+                                            if isinstance(first_content, dict) and 'text' in first_content:
+                                                text_content = first_content['text']
+                                                print(f"[DEBUG] Processing message field: '{text_content}'")
+                                elif 'event' in event:
+                                    event_data = event['event']
+                                    if isinstance(event_data, dict) and 'contentBlockDelta' in event_data:
+                                        print(f"[DEBUG] Skipping contentBlockDelta to prevent duplication")
+                                        continue
+                            elif isinstance(event, str):
+                                text_content = event
+                            
+                            # Send non-empty text content
+                            if text_content and text_content.strip():
+                                yield f"data: {text_content}\n\n"
                         
-                        # Send non-empty text content
-                        if text_content and text_content.strip():
-                            yield f"data: {text_content}\n\n"
+                        usage = get_turn_usage(agent_instance, usage_before)
                     
+                    logger.info(
+                        f"Turn usage for {agent_id}: {usage['inputTokens']} input, {usage['outputTokens']} output, "
+                        f"{usage['cacheReadInputTokens']} cache read, {usage['cacheWriteInputTokens']} cache write tokens"
+                    )
+                    yield f"event: usage\ndata: {json.dumps(usage)}\n\n"
+                    completed = True
                     yield "data: [DONE]\n\n"
                 except Exception as e:
                     print(f"[DEBUG] Stream error: {str(e)}")
@@ -516,23 +481,23 @@ def setup_routes(app):
                     print(f"[DEBUG] Traceback: {traceback.format_exc()}")
                     yield f"data: [ERROR] {str(e)}\n\n"
                 finally:
-                    # Clean up agent resources when stream ends
-                    if agent_instance:
-                        cleanup_agent_resources(agent_instance)
+                    # Keep the agent warm for the next turn unless the turn was cut short
+                    hand_back(completed)
             
+            # Runs after the response even if the client left before the stream started
             return StreamingResponse(
                 generate_response(),
                 media_type="text/event-stream",
-                headers={"Cache-Control": "no-cache", "Connection": "keep-alive"}
+                headers={"Cache-Control": "no-cache", "Connection": "keep-alive"},
+                background=BackgroundTask(hand_back, False)
             )
         except Exception as e:
             print(f"[DEBUG] Agent initialization error: {str(e)}")
             import traceback
             print(f"[DEBUG] Traceback: {traceback.format_exc()}")
             
-            # Clean up on error
-            if agent_instance:
-                cleanup_agent_resources(agent_instance)
+            # Drop the pooled agent on error
+            hand_back(False)
                 
             return {"error": str(e)}
     
@@ -542,34 +507,29 @@ def setup_routes(app):
         try:
             print(f"[DEBUG] Resuming session: {session_id}")
             
-            # Get session messages
-            messages = session_manager.get_session_messages(session_id)
-            if not messages:
+            # Get session info (single catalog lookup)
+            session_info = session_manager.get_session_info(session_id)
+            
+            if not session_info:
                 return HTMLResponse("""
 <!DOCTYPE html>
 <html>
 <head><title>Session Not Found</title></head>
 <body>
-<script>alert('Session not found or has no messages'); window.location.href='/select-agent-for-session';</script>
+<script>alert('Session not found'); window.location.href='/select-agent-for-session';</script>
 </body>
 </html>
                 """)
             
-            # Get session info
-            session_list = session_manager.list_sessions()
-            session_info = None
-            for s in session_list:
-                if s.get("session_id") == session_id:
-                    session_info = s
-                    break
-            
-            if not session_info:
+            # Get the most recent session messages; earlier ones load on demand
+            messages = session_manager.get_session_messages(session_id, limit=REPLAY_MESSAGE_LIMIT)
+            if not messages:
                 return HTMLResponse("""
 <!DOCTYPE html>
 <html>
 <head><title>Session Not Found</title></head>
 <body>
-<script>alert('Session not found'); window.location.href='/select-agent-for-session';</script>
+<script>alert('Session not found or has no messages'); window.location.href='/select-agent-for-session';</script>
 </body>
 </html>
                 """)
@@ -662,42 +622,41 @@ def setup_routes(app):
     
     # Include all other routes from the original file (keeping them unchanged)
     @app.get("/interactive")
-    async def interactive():
+    async def interactive(request: Request):
         """Interactive mode page"""
-        return HTMLResponse(interactive_mode_template())
+        return render_cache.response(request, ("interactive",), interactive_mode_template)
     
     @app.get("/views")
-    async def views():
+    async def views(request: Request):
         """Manage views page"""
-        return HTMLResponse(views_page_template())
+        return render_cache.response(request, ("views",), views_page_template)
     
     @app.get("/views/{filename}")
-    async def serve_view(filename: str):
+    async def serve_view(request: Request, filename: str):
         """Serve individual view HTML file"""
         try:
             # Security check - only allow .html files
             if not filename.endswith('.html'):
                 return HTMLResponse("Access denied", status_code=403)
             
-            # Get view content
-            content = views_manager.get_view_content(filename)
-            if content is None:
-                return HTMLResponse("View not found", status_code=404)
-            
-            return HTMLResponse(content)
+            return await view_cache.response(request, filename)
         except Exception as e:
             print(f"[DEBUG] Error serving view {filename}: {e}")
             return HTMLResponse("Error loading view", status_code=500)
     
     @app.get("/api/views")
-    async def get_views():
-        """Get all views API endpoint"""
+    async def get_views(request: Request, limit: int = Query(50, ge=1, le=200), cursor: str = Query(None),
+                        q: str = Query(None), agent_id: str = Query(None)):
+        """Get one page of views, newest first, optionally searched by title/description or filtered by agent"""
         try:
-            views = views_manager.get_all_views()
-            return {"views": views}
+            last_modified = views_manager.last_modified()
+            page = views_manager.list_views(limit=limit, cursor=cursor, query=q, agent_id=agent_id)
+            return conditional_json(request, page, last_modified)
+        except ValueError as e:
+            return JSONResponse({"views": [], "next_cursor": None, "error": str(e)}, status_code=400)
         except Exception as e:
             print(f"[DEBUG] Error getting views: {e}")
-            return {"views": [], "error": str(e)}
+            return {"views": [], "next_cursor": None, "error": str(e)}
     
     @app.delete("/api/views/{filename}")
     async def delete_view_api(filename: str):
@@ -717,16 +676,19 @@ def setup_routes(app):
             return {"error": str(e)}
     
     @app.get("/manage-agents")
-    async def manage_agents():
+    async def manage_agents(request: Request):
         """Manage agents page"""
-        return HTMLResponse(manage_agents_template(agent_manager.get_agents()))
+        version, agents = agent_manager.version, agent_manager.get_agents()
+        return render_cache.response(request, ("manage-agents", version),
+                                     lambda: manage_agents_template(agents))
     
     @app.get("/manage-agent/{agent_id}")
-    async def manage_agent(agent_id: str):
+    async def manage_agent(request: Request, agent_id: str):
         """Manage individual agent page"""
-        agent_data = agent_manager.get_agent(agent_id)
+        version, agent_data = agent_manager.version, agent_manager.get_agent(agent_id)
         if agent_data:
-            return HTMLResponse(manage_agent_template(agent_id, agent_data))
+            return render_cache.response(request, ("manage-agent", agent_id, version, PAGE_CATALOG_VERSION),
+                                         lambda: manage_agent_template(agent_id, agent_data))
         else:
             return HTMLResponse("""
 <!DOCTYPE html>
@@ -739,14 +701,18 @@ def setup_routes(app):
             """)
     
     @app.get("/create-agent")
-    async def create_agent():
+    async def create_agent(request: Request):
         """Create new agent page"""
-        return HTMLResponse(create_agent_template())
+        return render_cache.response(request, ("create-agent", PAGE_CATALOG_VERSION), create_agent_template)
     
     @app.get("/create-agent/config")
-    async def create_agent_config(provider: str = Query(...)):
+    async def create_agent_config(request: Request, provider: str = Query(...)):
         """Create agent configuration step - provider-specific configuration"""
-        return HTMLResponse(create_agent_config_template(provider))
+        # Only known providers are cached so arbitrary query values cannot churn the cache
+        if provider not in PROVIDER_CONFIGS:
+            return HTMLResponse(create_agent_config_template(provider))
+        return render_cache.response(request, ("create-agent-config", provider, PAGE_CATALOG_VERSION),
+                                     lambda: create_agent_config_template(provider))
     
     @app.get("/create-agent/step2")
     async def create_agent_step2(request: Request, provider: str = Query(...)):
@@ -804,6 +770,7 @@ def setup_routes(app):
         try:
             success = agent_manager.delete_agent(agent_id)
             if success:
+                agent_pool.invalidate(agent_id)
                 return HTMLResponse("""
 <!DOCTYPE html>
 <html>
@@ -848,11 +815,13 @@ def setup_routes(app):
         """)
     
     @app.get("/settings")
-    async def settings():
+    async def settings(request: Request):
         """Settings page with Walrus configuration"""
         try:
-            config = settings_manager.load_settings()
-            return HTMLResponse(settings_template(config))
+            # Key on the version read before the settings so a racing change is never cached as current
+            version = settings_manager.current_version()
+            return render_cache.response(request, ("settings", version),
+                                         lambda: settings_template(settings_manager.load_settings()))
         except Exception as e:
             print(f"[DEBUG] Error loading settings: {e}")
             # Return settings page with default config on error
@@ -877,6 +846,35 @@ def setup_routes(app):
         """Get agents list"""
         return {"agents": agent_manager.get_agents()}
     
+    @app.post("/api/agents/bulk")
+    async def bulk_agents(request: Request):
+        """Create, update and delete many agents at once: {"create": [...], "update": {id: {...}}, "delete": [ids]}"""
+        try:
+            payload = await request.json()
+        except ValueError as e:
+            return JSONResponse({"success": False, "error": f"Invalid JSON body: {e}"}, status_code=400)
+        if not isinstance(payload, dict):
+            return JSONResponse({"success": False, "error": "Request body must be a JSON object"}, status_code=400)
+        
+        try:
+            # Holds the agents file lock and fsyncs, so keep it off the event loop
+            result = await asyncio.to_thread(agent_manager.bulk, create=payload.get("create"),
+                                             update=payload.get("update"), delete=payload.get("delete"))
+        except json.JSONDecodeError as e:
+            # A corrupt agents file is a server fault, not a bad request
+            print(f"[DEBUG] Error reading agents file in bulk agent operation: {e}")
+            return JSONResponse({"success": False, "error": str(e)}, status_code=500)
+        except (ValueError, TypeError) as e:
+            return JSONResponse({"success": False, "error": str(e)}, status_code=400)
+        except Exception as e:
+            print(f"[DEBUG] Error in bulk agent operation: {e}")
+            return JSONResponse({"success": False, "error": str(e)}, status_code=500)
+        
+        # Pooled agents were built from the old configuration
+        for agent_id in result["updated"] + result["deleted"]:
+            agent_pool.invalidate(agent_id)
+        return {"success": True, **result}
+    
     @app.get("/api/ai-providers")
     async def get_ai_providers():
         """Get available AI providers"""
@@ -887,22 +885,85 @@ def setup_routes(app):
         """Get available trading chains"""
         return {"chains": TRADING_CHAINS}
     
+    @app.get("/api/ready")
+    async def readiness():
+        """Readiness probe: reports warm components, 503 until warm-up is done and the MCP servers agents need are up"""
+        status = warmup_state.status()
+        status["mcp_servers"] = mcp_supervisor.status()
+        status["pooled_agents"] = len(agent_pool)
+        return JSONResponse(status, status_code=200 if status["ready"] else 503)
+    
     @app.get("/api/sessions")
-    async def get_sessions():
-        """Get all available sessions"""
+    async def get_sessions(request: Request, limit: int = Query(50, ge=1, le=200), cursor: str = Query(None),
+                           agent_id: str = Query(None), trading_chain: str = Query(None),
+                           provider: str = Query(None)):
+        """Get one page of sessions, most recent first, optionally filtered"""
         try:
-            sessions = session_manager.list_sessions()
-            return {"sessions": sessions}
+            # ETag only: a deleted session changes the page without making anything newer
+            page = session_manager.list_sessions_page(limit=limit, cursor=cursor, agent_id=agent_id,
+                                                      trading_chain=trading_chain, provider=provider)
+            return conditional_json(request, page)
+        except ValueError as e:
+            return JSONResponse({"sessions": [], "next_cursor": None, "error": str(e)}, status_code=400)
         except Exception as e:
             print(f"[DEBUG] Error getting sessions: {e}")
-            return {"sessions": [], "error": str(e)}
+            return {"sessions": [], "next_cursor": None, "error": str(e)}
+    
+    @app.get("/api/sessions/export")
+    async def export_sessions(agent_id: str = Query(None), trading_chain: str = Query(None),
+                              provider: str = Query(None)):
+        """Stream all matching sessions as NDJSON (one session per line)"""
+        def generate():
+            for session in session_manager.iter_sessions(agent_id=agent_id, trading_chain=trading_chain,
+                                                         provider=provider):
+                yield json.dumps(session) + "\n"
+        
+        return StreamingResponse(
+            generate(),
+            media_type="application/x-ndjson",
+            headers={"Content-Disposition": "attachment; filename=sessions.ndjson"}
+        )
+    
+    @app.get("/api/sessions/search")
+    async def search_sessions(q: str = Query(..., min_length=1), limit: int = Query(20, ge=1, le=100),
+                              offset: int = Query(0, ge=0), agent_id: str = Query(None),
+                              trading_chain: str = Query(None), role: str = Query(None)):
+        """Full-text search across all session messages, best match first, with highlighted snippets"""
+        try:
+            return await asyncio.to_thread(session_manager.search_messages, q, limit=limit, offset=offset,
+                                           agent_id=agent_id, trading_chain=trading_chain, role=role)
+        except Exception as e:
+            print(f"[DEBUG] Error searching sessions: {e}")
+            return {"query": q, "results": [], "next_offset": None, "error": str(e)}
+    
+    @app.get("/api/sessions/storage")
+    async def get_session_storage():
+        """Get total disk usage of stored sessions"""
+        try:
+            return session_manager.get_storage_stats()
+        except Exception as e:
+            print(f"[DEBUG] Error getting session storage: {e}")
+            return {"error": str(e)}
+    
+    @app.post("/api/sessions/reindex")
+    async def reindex_sessions():
+        """Rebuild the session catalog from the session directories"""
+        try:
+            count = await asyncio.to_thread(session_manager.reindex)
+            indexed = await asyncio.to_thread(session_manager.reindex_search)
+            return {"success": True, "sessions": count, "messages_indexed": indexed}
+        except Exception as e:
+            print(f"[DEBUG] Error reindexing sessions: {e}")
+            return {"success": False, "error": str(e)}
     
     @app.get("/api/sessions/{session_id}/messages")
-    async def get_session_messages(session_id: str):
-        """Get messages from a specific session"""
+    async def get_session_messages(request: Request, session_id: str, limit: int = Query(None, ge=1, le=500),
+                                   before: int = Query(None), after: int = Query(None)):
+        """Get messages from a specific session: the last `limit`, or a window before/after a message_id"""
         try:
-            messages = session_manager.get_session_messages(session_id)
-            return {"messages": messages}
+            messages = session_manager.get_session_messages(session_id, limit=limit, before=before, after=after)
+            last_modified = latest_timestamp(message.get("updated_at") for message in messages)
+            return conditional_json(request, {"messages": messages}, last_modified)
         except Exception as e:
             print(f"[DEBUG] Error getting session messages: {e}")
             return {"messages": [], "error": str(e)}
@@ -967,6 +1028,7 @@ def setup_routes(app):
             success = settings_manager.save_settings(settings_data)
             
             if success:
+                # Pooled agents are dropped by on_settings_change when the content changed
                 return {"success": True, "message": "Settings saved successfully"}
             else:
                 return {"success": False, "error": "Failed to save settings"}
@@ -0,0 +1,136 @@
+"""
+Session archives for TradeArena
+Packs idle session directories into one compressed zip each and reads them back in place
+"""
+
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import zipfile
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_DIR = "archive"
+
+# Per-file messages are packed into one JSONL member per agent so they compress as a whole
+PACKED_MESSAGES = "messages.packed.jsonl"
+
+# Only one thread packs or unpacks a given session at a time
+_locks: Dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+def _lock_for(archive_path: str) -> threading.Lock:
+    with _locks_guard:
+        return _locks.setdefault(os.path.abspath(archive_path), threading.Lock())
+
+def archive_path_for(sessions_dir: str, session_id: str) -> str:
+    """Where the archive of a session lives: sessions/archive/session_<id>.zip"""
+    return os.path.join(sessions_dir, ARCHIVE_DIR, f"session_{session_id}.zip")
+
+class SessionArchive:
+    """
+    A session directory packed into a deflate-compressed zip
+
+    Members keep their paths relative to the session directory, so the zip's
+    central directory doubles as the index: any file can be read on its own.
+    An agent's messages/message_<n>.json files become a single
+    agents/agent_x/messages.packed.jsonl member and are split out again on unpack.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def open(self) -> zipfile.ZipFile:
+        """Open the archive for several reads"""
+        return zipfile.ZipFile(self.path)
+
+    def size(self) -> int:
+        return os.path.getsize(self.path) if self.exists() else 0
+
+    def pack(self, session_dir: str) -> int:
+        """Compress session_dir into this archive and remove the directory; returns the archive size"""
+        with _lock_for(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), prefix=".session_", suffix=".zip")
+            os.close(fd)
+            try:
+                with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=6) as archive:
+                    for root, _, files in os.walk(session_dir):
+                        relative_root = os.path.relpath(root, session_dir)
+                        if os.path.basename(root) == "messages" and os.path.dirname(relative_root).startswith("agents"):
+                            self._pack_messages(archive, root, os.path.dirname(relative_root), files)
+                            continue
+                        for name in sorted(files):
+                            file_path = os.path.join(root, name)
+                            archive.write(file_path, os.path.relpath(file_path, session_dir))
+                os.replace(tmp_path, self.path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            shutil.rmtree(session_dir)
+        return self.size()
+
+    def unpack(self, session_dir: str) -> int:
+        """Restore the session directory and remove the archive; returns the restored JSON bytes"""
+        restored = 0
+        with _lock_for(self.path):
+            if not self.exists():
+                return 0
+            with zipfile.ZipFile(self.path) as archive:
+                for member in archive.infolist():
+                    if os.path.basename(member.filename) == PACKED_MESSAGES:
+                        agent_dir = os.path.join(session_dir, os.path.dirname(member.filename))
+                        restored += self._unpack_messages(archive.read(member), os.path.join(agent_dir, "messages"))
+                        continue
+                    # Files written since archiving (already on disk) win over archived copies
+                    target = os.path.join(session_dir, member.filename)
+                    if not os.path.exists(target):
+                        archive.extract(member, session_dir)
+                    if member.filename.endswith((".json", ".jsonl")):
+                        restored += member.file_size
+            os.remove(self.path)
+        return restored
+
+    @staticmethod
+    def _pack_messages(archive: zipfile.ZipFile, messages_dir: str, agent_member: str, files: list) -> None:
+        records = []
+        for name in files:
+            if name.startswith("message_") and name.endswith(".json"):
+                with open(os.path.join(messages_dir, name), "r", encoding="utf-8") as f:
+                    records.append((int(name[len("message_"):-len(".json")]), f.read()))
+        records.sort()
+        lines = "".join(json.dumps(json.loads(data), separators=(",", ":")) + "\n" for _, data in records)
+        archive.writestr(f"{agent_member}/{PACKED_MESSAGES}".replace(os.sep, "/"), lines)
+
+    @staticmethod
+    def _unpack_messages(data: bytes, messages_dir: str) -> int:
+        """Write packed messages back as message_<n>.json files (in FileSessionManager's format)"""
+        os.makedirs(messages_dir, exist_ok=True)
+        restored = 0
+        for line in data.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            target = os.path.join(messages_dir, f"message_{record['message_id']}.json")
+            if not os.path.exists(target):
+                with open(target, "w", encoding="utf-8") as f:
+                    json.dump(record, f, indent=2, ensure_ascii=False)
+            restored += os.path.getsize(target)
+        return restored
+
+def rehydrate(sessions_dir: str, session_id: str) -> Optional[int]:
+    """Unpack an archived session before it is written to; returns its restored size, or None if not archived"""
+    archive = SessionArchive(archive_path_for(sessions_dir, session_id))
+    if not archive.exists():
+        return None
+    restored = archive.unpack(os.path.join(sessions_dir, f"session_{session_id}"))
+    logger.info(f"Rehydrated archived session {session_id}")
+    return restored
@@ -0,0 +1,476 @@
+"""
+Session catalog for TradeArena
+SQLite index of session metadata so listings are queries instead of directory scans
+"""
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Columns stored per session, in table order
+SESSION_COLUMNS = [
+    "session_id",
+    "session_type",
+    "agent_id",
+    "config_agent_id",
+    "agent_name",
+    "provider",
+    "chain",
+    "created_at",
+    "updated_at",
+    "message_count",
+    "byte_size",
+    "archived"
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    session_type TEXT,
+    agent_id TEXT,
+    config_agent_id TEXT,
+    agent_name TEXT,
+    provider TEXT,
+    chain TEXT,
+    created_at TEXT,
+    updated_at TEXT,
+    message_count INTEGER NOT NULL DEFAULT 0,
+    byte_size INTEGER NOT NULL DEFAULT 0,
+    archived INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_updated ON sessions (updated_at DESC, session_id DESC);
+CREATE INDEX IF NOT EXISTS idx_sessions_agent ON sessions (agent_id, updated_at DESC);
+CREATE INDEX IF NOT EXISTS idx_sessions_config_agent ON sessions (config_agent_id, updated_at DESC);
+CREATE TABLE IF NOT EXISTS agent_configs (
+    agent_id TEXT PRIMARY KEY,
+    agent_config TEXT NOT NULL,
+    updated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS message_text (
+    id INTEGER PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    message_id INTEGER NOT NULL,
+    role TEXT,
+    text TEXT NOT NULL,
+    agent_name TEXT,
+    chain TEXT,
+    created_at TEXT,
+    UNIQUE (session_id, message_id)
+);
+CREATE TABLE IF NOT EXISTS catalog_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Inverted index over message_text, kept in step by triggers (external content FTS5 table)
+SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS message_search USING fts5(
+    text, role, agent_name, chain,
+    content='message_text', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS message_text_ai AFTER INSERT ON message_text BEGIN
+    INSERT INTO message_search (rowid, text, role, agent_name, chain)
+    VALUES (new.id, new.text, new.role, new.agent_name, new.chain);
+END;
+CREATE TRIGGER IF NOT EXISTS message_text_ad AFTER DELETE ON message_text BEGIN
+    INSERT INTO message_search (message_search, rowid, text, role, agent_name, chain)
+    VALUES ('delete', old.id, old.text, old.role, old.agent_name, old.chain);
+END;
+CREATE TRIGGER IF NOT EXISTS message_text_au AFTER UPDATE ON message_text BEGIN
+    INSERT INTO message_search (message_search, rowid, text, role, agent_name, chain)
+    VALUES ('delete', old.id, old.text, old.role, old.agent_name, old.chain);
+    INSERT INTO message_search (rowid, text, role, agent_name, chain)
+    VALUES (new.id, new.text, new.role, new.agent_name, new.chain);
+END;
+"""
+
+# Highlight markers around matched terms in search snippets
+SNIPPET_START = "**"
+SNIPPET_END = "**"
+SNIPPET_TOKENS = 16
+
+def _row_values(row: Dict[str, Any]) -> List[Any]:
+    """Order a session dict as SESSION_COLUMNS values, defaulting counters to zero"""
+    return [
+        (row.get(column) or 0) if column in ("message_count", "byte_size", "archived") else row.get(column)
+        for column in SESSION_COLUMNS
+    ]
+
+def message_text(message_data: Dict[str, Any]) -> str:
+    """Searchable text of a stored Strands message: its text blocks, without reasoning or tool payloads"""
+    content = (message_data.get("message") or {}).get("content") or []
+    texts = [item["text"] for item in content
+             if isinstance(item, dict) and isinstance(item.get("text"), str) and item["text"].strip()]
+    return "\n".join(texts)
+
+def _fts_query(query: str) -> str:
+    """Quote each term so user input is never parsed as FTS5 syntax; the last term matches as a prefix"""
+    terms = ['"' + term.replace('"', '""') + '"' for term in query.split()]
+    if terms:
+        terms[-1] += "*"
+    return " ".join(terms)
+
+def _like_snippet(text: str, terms: List[str], width: int = 120) -> str:
+    """Snippet around the first matched term for the LIKE fallback"""
+    lowered = text.lower()
+    positions = [lowered.find(term.lower()) for term in terms if lowered.find(term.lower()) >= 0]
+    start = max(0, min(positions) - width // 3) if positions else 0
+    snippet = text[start:start + width]
+    for term in terms:
+        snippet = re.sub(re.escape(term), lambda m: f"{SNIPPET_START}{m.group(0)}{SNIPPET_END}", snippet,
+                         flags=re.IGNORECASE)
+    return ("…" if start else "") + snippet + ("…" if start + width < len(text) else "")
+
+class SessionCatalog:
+    """Persistent, incrementally maintained index of sessions"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+            # Catalogs created before sessions could be archived
+            columns = [row[1] for row in self._conn.execute("PRAGMA table_info(sessions)").fetchall()]
+            if "archived" not in columns:
+                self._conn.execute("ALTER TABLE sessions ADD COLUMN archived INTEGER NOT NULL DEFAULT 0")
+            # Full-text search needs SQLite built with FTS5; without it searches fall back to LIKE scans
+            try:
+                self._conn.executescript(SEARCH_SCHEMA)
+                self.fts_enabled = True
+            except sqlite3.OperationalError as e:
+                logger.warning(f"SQLite FTS5 unavailable, message search falls back to LIKE: {e}")
+                self.fts_enabled = False
+
+    def is_empty(self) -> bool:
+        """Check whether the catalog has no sessions yet"""
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM sessions LIMIT 1").fetchone() is None
+
+    def has_agent_configs(self) -> bool:
+        """Check whether the agent_id -> agent_config map has been built"""
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM agent_configs LIMIT 1").fetchone() is not None
+
+    def upsert_session(self, row: Dict[str, Any]) -> None:
+        """Insert or fully replace a session row"""
+        placeholders = ", ".join("?" for _ in SESSION_COLUMNS)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO sessions ({', '.join(SESSION_COLUMNS)}) VALUES ({placeholders})",
+                _row_values(row)
+            )
+
+    def record_session(self, session_id: str, session_type: str, created_at: str, updated_at: str) -> None:
+        """Register a newly created session"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO sessions (session_id, session_type, created_at, updated_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(session_id) DO UPDATE SET
+                    session_type = excluded.session_type,
+                    created_at = COALESCE(sessions.created_at, excluded.created_at)
+                """,
+                (session_id, session_type, created_at, updated_at)
+            )
+
+    def record_agent(self, session_id: str, agent_id: str, agent_config: Dict[str, Any], updated_at: str) -> None:
+        """Attach agent details to a session (first agent wins, as in the directory layout)"""
+        agent_config = agent_config or {}
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO sessions (session_id, agent_id, config_agent_id, agent_name, provider, chain, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(session_id) DO UPDATE SET
+                    agent_id = COALESCE(sessions.agent_id, excluded.agent_id),
+                    config_agent_id = COALESCE(excluded.config_agent_id, sessions.config_agent_id),
+                    agent_name = COALESCE(excluded.agent_name, sessions.agent_name),
+                    provider = COALESCE(excluded.provider, sessions.provider),
+                    chain = COALESCE(excluded.chain, sessions.chain),
+                    updated_at = MAX(COALESCE(sessions.updated_at, ''), excluded.updated_at)
+                """,
+                (
+                    session_id,
+                    agent_id,
+                    agent_config.get("id"),
+                    agent_config.get("name"),
+                    agent_config.get("ai_provider"),
+                    agent_config.get("trading_chain"),
+                    updated_at,
+                    updated_at
+                )
+            )
+            if agent_config:
+                self._upsert_agent_config(agent_id, agent_config, updated_at)
+
+    def get_agent_config(self, agent_id: str) -> Optional[Dict[str, Any]]:
+        """Get the latest agent config saved in state for a Strands agent ID"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT agent_config FROM agent_configs WHERE agent_id = ?", (agent_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def record_agent_config(self, agent_id: str, agent_config: Dict[str, Any], updated_at: str) -> None:
+        """Store an agent config read from a session written outside the session writers"""
+        with self._lock, self._conn:
+            self._upsert_agent_config(agent_id, agent_config, updated_at)
+
+    def replace_agent_configs(self, agent_configs: Dict[str, Dict[str, Any]]) -> None:
+        """Atomically replace the agent_id -> agent_config map (used by reindex)"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM agent_configs")
+            for agent_id, (agent_config, updated_at) in agent_configs.items():
+                self._upsert_agent_config(agent_id, agent_config, updated_at)
+
+    def record_message(self, session_id: str, updated_at: str, byte_delta: int = 0, count_delta: int = 1) -> None:
+        """Account for a message written to a session"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO sessions (session_id, created_at, updated_at, message_count, byte_size)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(session_id) DO UPDATE SET
+                    message_count = sessions.message_count + excluded.message_count,
+                    byte_size = sessions.byte_size + excluded.byte_size,
+                    updated_at = MAX(COALESCE(sessions.updated_at, ''), excluded.updated_at)
+                """,
+                (session_id, updated_at, updated_at, count_delta, byte_delta)
+            )
+
+    def add_bytes(self, session_id: str, byte_delta: int) -> None:
+        """Adjust a session's stored size after a file was written or rewritten"""
+        if not byte_delta:
+            return
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE sessions SET byte_size = MAX(0, byte_size + ?) WHERE session_id = ?",
+                (byte_delta, session_id)
+            )
+
+    def set_archived(self, session_id: str, archived: bool, byte_size: int) -> None:
+        """Mark a session as packed into (or restored from) its archive, with its size on disk"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE sessions SET archived = ?, byte_size = ? WHERE session_id = ?",
+                (1 if archived else 0, byte_size, session_id)
+            )
+
+    def archive_candidates(self, updated_before: str, limit: int = 100) -> List[str]:
+        """IDs of unarchived sessions last updated before a timestamp, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT session_id FROM sessions WHERE archived = 0 AND updated_at < ? ORDER BY updated_at LIMIT ?",
+                (updated_before, limit)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def updated_sessions(self, updated_since: str, limit: int = 1000) -> List[str]:
+        """IDs of unarchived sessions updated at or after a timestamp, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT session_id FROM sessions WHERE archived = 0 AND updated_at >= ? ORDER BY updated_at LIMIT ?",
+                (updated_since, limit)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def storage_totals(self) -> Dict[str, int]:
+        """Session, message and byte totals across the whole catalog"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(message_count), 0), COALESCE(SUM(byte_size), 0) FROM sessions"
+            ).fetchone()
+        return {"sessions": row[0], "messages": row[1], "bytes": row[2]}
+
+    def delete_session(self, session_id: str) -> None:
+        """Remove a session from the catalog"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            self._conn.execute("DELETE FROM message_text WHERE session_id = ?", (session_id,))
+
+    def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Get one session row by ID"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return dict(row) if row else None
+
+    def list_sessions(self) -> List[Dict[str, Any]]:
+        """Get all session rows, most recently updated first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM sessions ORDER BY updated_at DESC, session_id DESC"
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def query_sessions(self, limit: int, after: Optional[Tuple[str, str]] = None, agent_id: str = None,
+                       chain: str = None, provider: str = None) -> List[Dict[str, Any]]:
+        """
+        Get one page of session rows, most recently updated first
+
+        after is the (updated_at, session_id) of the last row of the previous page;
+        agent_id matches either the Strands agent ID or the short config agent ID.
+        """
+        clauses, params = [], []
+        if after:
+            clauses.append("(updated_at < ? OR (updated_at = ? AND session_id < ?))")
+            params.extend([after[0], after[0], after[1]])
+        if agent_id:
+            clauses.append("(agent_id = ? OR config_agent_id = ?)")
+            params.extend([agent_id, agent_id])
+        if chain:
+            clauses.append("chain = ?")
+            params.append(chain)
+        if provider:
+            # Provider IDs are stored hyphenated (amazon-bedrock) but listed with underscores
+            clauses.append("provider IN (?, ?)")
+            params.extend([provider.replace("_", "-"), provider.replace("-", "_")])
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM sessions {where} ORDER BY updated_at DESC, session_id DESC LIMIT ?",
+                params + [limit]
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def session_ids(self) -> List[str]:
+        """Get the IDs of all catalogued sessions"""
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT session_id FROM sessions").fetchall()]
+
+    def replace_all(self, rows: List[Dict[str, Any]]) -> None:
+        """Atomically replace the whole catalog (used by reindex)"""
+        placeholders = ", ".join("?" for _ in SESSION_COLUMNS)
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM sessions")
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO sessions ({', '.join(SESSION_COLUMNS)}) VALUES ({placeholders})",
+                [_row_values(row) for row in rows]
+            )
+
+    def index_message(self, session_id: str, message_id: int, role: str, text: str, created_at: str) -> None:
+        """Add or replace one message in the search index (blank messages are dropped from it)"""
+        with self._lock, self._conn:
+            self._index_message(session_id, message_id, role, text, created_at)
+
+    def replace_session_messages(self, session_id: str, messages: List[Tuple[int, str, str, str]]) -> None:
+        """Atomically replace a session's indexed messages with (message_id, role, text, created_at) tuples"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM message_text WHERE session_id = ?", (session_id,))
+            for message_id, role, text, created_at in messages:
+                self._index_message(session_id, message_id, role, text, created_at)
+
+    def search_indexed(self) -> bool:
+        """Check whether existing sessions have been backfilled into the search index"""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM catalog_meta WHERE key = 'search_indexed'").fetchone()
+        return row is not None
+
+    def mark_search_indexed(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO catalog_meta (key, value) VALUES ('search_indexed', '1')")
+
+    def search_messages(self, query: str, limit: int = 20, offset: int = 0, agent_id: str = None,
+                        chain: str = None, role: str = None) -> List[Dict[str, Any]]:
+        """
+        Find messages matching every term of query, best match first
+
+        Ranked by BM25 over the FTS5 index; without FTS5, substring matches newest first.
+        Each hit carries the session and message IDs, role, agent, chain, timestamp and a snippet.
+        """
+        if not query.split():
+            return []
+        clauses, params = [], []
+        if agent_id:
+            clauses.append("m.session_id IN (SELECT session_id FROM sessions WHERE agent_id = ? OR config_agent_id = ?)")
+            params.extend([agent_id, agent_id])
+        if chain:
+            clauses.append("m.chain = ?")
+            params.append(chain)
+        if role:
+            clauses.append("m.role = ?")
+            params.append(role)
+        filters = "".join(f" AND {clause}" for clause in clauses)
+
+        with self._lock:
+            if self.fts_enabled:
+                rows = self._conn.execute(
+                    f"""
+                    SELECT m.session_id, m.message_id, m.role, m.agent_name, m.chain, m.created_at,
+                           snippet(message_search, 0, ?, ?, '…', ?) AS snippet,
+                           bm25(message_search) AS score
+                    FROM message_search JOIN message_text m ON m.id = message_search.rowid
+                    WHERE message_search MATCH ?{filters}
+                    ORDER BY score LIMIT ? OFFSET ?
+                    """,
+                    [SNIPPET_START, SNIPPET_END, SNIPPET_TOKENS, _fts_query(query)] + params + [limit, offset]
+                ).fetchall()
+                return [dict(row) for row in rows]
+
+            terms = query.split()
+            like = "".join(" AND m.text LIKE ? ESCAPE '\\'" for _ in terms)
+            escaped = ["%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%" for term in terms]
+            rows = self._conn.execute(
+                f"""
+                SELECT m.session_id, m.message_id, m.role, m.agent_name, m.chain, m.created_at, m.text
+                FROM message_text m WHERE 1 = 1{like}{filters}
+                ORDER BY m.created_at DESC LIMIT ? OFFSET ?
+                """,
+                escaped + params + [limit, offset]
+            ).fetchall()
+        hits = []
+        for row in rows:
+            hit = dict(row)
+            hit["snippet"] = _like_snippet(hit.pop("text"), terms)
+            hit["score"] = None
+            hits.append(hit)
+        return hits
+
+    def _index_message(self, session_id: str, message_id: int, role: str, text: str, created_at: str) -> None:
+        # Caller holds the lock and the transaction; agent name and chain are copied from the session row
+        if not text or not text.strip():
+            self._conn.execute("DELETE FROM message_text WHERE session_id = ? AND message_id = ?",
+                               (session_id, message_id))
+            return
+        self._conn.execute(
+            """
+            INSERT INTO message_text (session_id, message_id, role, text, agent_name, chain, created_at)
+            SELECT ?, ?, ?, ?, s.agent_name, s.chain, ?
+            FROM (SELECT 1) LEFT JOIN sessions s ON s.session_id = ?
+            WHERE true
+            ON CONFLICT(session_id, message_id) DO UPDATE SET
+                role = excluded.role,
+                text = excluded.text,
+                agent_name = excluded.agent_name,
+                chain = excluded.chain,
+                created_at = excluded.created_at
+            """,
+            (session_id, message_id, role, text, created_at, session_id)
+        )
+
+    def _upsert_agent_config(self, agent_id: str, agent_config: Dict[str, Any], updated_at: str) -> None:
+        # Caller holds the lock and the transaction; the newest write wins
+        self._conn.execute(
+            """
+            INSERT INTO agent_configs (agent_id, agent_config, updated_at)
+            VALUES (?, ?, ?)
+            ON CONFLICT(agent_id) DO UPDATE SET
+                agent_config = excluded.agent_config,
+                updated_at = excluded.updated_at
+            WHERE COALESCE(excluded.updated_at, '') >= COALESCE(agent_configs.updated_at, '')
+            """,
+            (agent_id, json.dumps(agent_config, sort_keys=True), updated_at)
+        )
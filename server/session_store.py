@@ -0,0 +1,178 @@
+"""
+Session storage for TradeArena agents
+Strands session managers that keep the session catalog current as they write
+"""
+
+import glob
+import logging
+import os
+from typing import Any, List, Optional
+
+from strands.session.file_session_manager import FileSessionManager
+from strands.types.exceptions import SessionException
+from strands.types.session import Session, SessionAgent, SessionMessage
+
+from .message_log import LOG_FILE, MessageLog
+from .session_archive import rehydrate
+from .session_catalog import SessionCatalog, message_text
+
+logger = logging.getLogger(__name__)
+
+# Message storage for new writes: "files" (one JSON file per message) or "jsonl" (append-only log).
+# Sessions that already have a log keep using it whatever this is set to.
+SESSION_FORMAT = os.getenv("TRADEARENA_SESSION_FORMAT", "files")
+
+class CatalogFileSessionManager(FileSessionManager):
+    """FileSessionManager that records every session, agent and message write in the catalog"""
+
+    def __init__(self, session_id: str, storage_dir: str = None, catalog: SessionCatalog = None, **kwargs: Any):
+        self.catalog = catalog
+        if storage_dir:
+            # Archived sessions become regular directories again before anything is written
+            restored = rehydrate(storage_dir, session_id)
+            if restored is not None and catalog:
+                self._safely(catalog.set_archived, session_id, False, restored)
+        super().__init__(session_id=session_id, storage_dir=storage_dir, **kwargs)
+
+    def create_session(self, session: Session, **kwargs: Any) -> Session:
+        created = super().create_session(session, **kwargs)
+        if self.catalog:
+            session_type = getattr(session.session_type, "value", session.session_type)
+            self._safely(self.catalog.record_session, session.session_id, str(session_type),
+                         session.created_at, session.updated_at)
+            session_file = os.path.join(self._get_session_path(session.session_id), "session.json")
+            self._record_bytes(session.session_id, self._file_size(session_file))
+        return created
+
+    def create_agent(self, session_id: str, session_agent: SessionAgent, **kwargs: Any) -> None:
+        super().create_agent(session_id, session_agent, **kwargs)
+        self._record_agent(session_id, session_agent)
+        self._record_bytes(session_id, self._file_size(self._agent_file(session_id, session_agent.agent_id)))
+
+    def update_agent(self, session_id: str, session_agent: SessionAgent, **kwargs: Any) -> None:
+        agent_file = self._agent_file(session_id, session_agent.agent_id)
+        size_before = self._file_size(agent_file)
+        super().update_agent(session_id, session_agent, **kwargs)
+        self._record_agent(session_id, session_agent)
+        self._record_bytes(session_id, self._file_size(agent_file) - size_before)
+
+    def create_message(self, session_id: str, agent_id: str, session_message: SessionMessage, **kwargs: Any) -> None:
+        super().create_message(session_id, agent_id, session_message, **kwargs)
+        message_path = self._get_message_path(session_id, agent_id, session_message.message_id)
+        self._record_message(session_id, session_message,
+                             os.path.getsize(message_path) if os.path.exists(message_path) else 0)
+
+    def update_message(self, session_id: str, agent_id: str, session_message: SessionMessage, **kwargs: Any) -> None:
+        message_path = self._get_message_path(session_id, agent_id, session_message.message_id)
+        size_before = self._file_size(message_path)
+        super().update_message(session_id, agent_id, session_message, **kwargs)
+        self._record_bytes(session_id, self._file_size(message_path) - size_before)
+        self._index_message(session_id, session_message)
+
+    def delete_session(self, session_id: str, **kwargs: Any) -> None:
+        super().delete_session(session_id, **kwargs)
+        if self.catalog:
+            self._safely(self.catalog.delete_session, session_id)
+
+    def _record_message(self, session_id: str, session_message: SessionMessage, size: int) -> None:
+        if self.catalog:
+            self._safely(self.catalog.record_message, session_id,
+                         session_message.updated_at or session_message.created_at, size)
+        self._index_message(session_id, session_message)
+
+    def _index_message(self, session_id: str, session_message: SessionMessage) -> None:
+        if self.catalog:
+            message = session_message.to_dict()
+            self._safely(self.catalog.index_message, session_id, session_message.message_id,
+                         (message.get("message") or {}).get("role"), message_text(message),
+                         session_message.created_at)
+
+    def _record_bytes(self, session_id: str, byte_delta: int) -> None:
+        if self.catalog and byte_delta:
+            self._safely(self.catalog.add_bytes, session_id, byte_delta)
+
+    def _agent_file(self, session_id: str, agent_id: str) -> str:
+        return os.path.join(self._get_agent_path(session_id, agent_id), "agent.json")
+
+    @staticmethod
+    def _file_size(path: str) -> int:
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+    def _record_agent(self, session_id: str, session_agent: SessionAgent) -> None:
+        if self.catalog:
+            agent_config = (session_agent.state or {}).get("agent_config", {})
+            self._safely(self.catalog.record_agent, session_id, session_agent.agent_id,
+                         agent_config, session_agent.updated_at)
+
+    @staticmethod
+    def _safely(record, *args: Any) -> None:
+        """Catalog bookkeeping must never fail a chat turn; reindex repairs any gap"""
+        try:
+            record(*args)
+        except Exception as e:
+            logger.error(f"Failed to update session catalog: {e}")
+
+class JsonlFileSessionManager(CatalogFileSessionManager):
+    """
+    Session manager that keeps each agent's messages in an append-only JSONL log
+
+    Sessions, agents and the directory layout stay as in FileSessionManager; only
+    messages/message_<n>.json files are replaced by messages.jsonl + messages.idx
+    in the agent directory. Agents still stored per file are migrated on first use.
+    """
+
+    def create_message(self, session_id: str, agent_id: str, session_message: SessionMessage, **kwargs: Any) -> None:
+        size = self._log(session_id, agent_id).append(session_message.to_dict())
+        self._record_message(session_id, session_message, size)
+
+    def read_message(self, session_id: str, agent_id: str, message_id: int, **kwargs: Any) -> Optional[SessionMessage]:
+        log = self._log(session_id, agent_id)
+        record = log.read(message_id)
+        if record is not None and record.get("message_id") != message_id:
+            # Index out of step with the log (e.g. interrupted compaction)
+            log.rebuild_index()
+            record = log.read(message_id)
+        return SessionMessage.from_dict(record) if record is not None else None
+
+    def update_message(self, session_id: str, agent_id: str, session_message: SessionMessage, **kwargs: Any) -> None:
+        previous = self.read_message(session_id, agent_id, session_message.message_id)
+        if previous is None:
+            raise SessionException(f"Message {session_message.message_id} does not exist")
+        session_message.created_at = previous.created_at
+
+        log = self._log(session_id, agent_id)
+        size = log.append(session_message.to_dict())
+        self._record_bytes(session_id, size - log.maybe_compact())
+        self._index_message(session_id, session_message)
+
+    def list_messages(self, session_id: str, agent_id: str, limit: Optional[int] = None, offset: int = 0,
+                      **kwargs: Any) -> List[SessionMessage]:
+        agent_path = self._get_agent_path(session_id, agent_id)
+        if not os.path.exists(agent_path):
+            raise SessionException(f"Messages directory missing from agent: {agent_id} in session {session_id}")
+        return [SessionMessage.from_dict(record) for record in self._log(session_id, agent_id).read_range(offset, limit)]
+
+    def _log(self, session_id: str, agent_id: str) -> MessageLog:
+        log = MessageLog(self._get_agent_path(session_id, agent_id))
+        if not log.exists():
+            log.migrate_from_files()
+        return log
+
+def _has_message_log(storage_dir: str, session_id: str) -> bool:
+    """Whether any agent of the session keeps its messages in a JSONL log"""
+    if not storage_dir:
+        return False
+    pattern = os.path.join(storage_dir, f"session_{session_id}", "agents", "agent_*", LOG_FILE)
+    return bool(glob.glob(pattern))
+
+def create_session_manager(session_id: str, storage_dir: str, catalog: SessionCatalog = None) -> CatalogFileSessionManager:
+    """Create the session manager for the configured message storage format"""
+    manager_class = JsonlFileSessionManager if SESSION_FORMAT == "jsonl" else CatalogFileSessionManager
+    if manager_class is not JsonlFileSessionManager and _has_message_log(storage_dir, session_id):
+        # No downgrade: message files written next to a log would never be read
+        logger.warning(f"Session {session_id} already stores messages in {LOG_FILE}; keeping the jsonl format")
+        manager_class = JsonlFileSessionManager
+    return manager_class(session_id=session_id, storage_dir=storage_dir, catalog=catalog)
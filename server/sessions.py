@@ -6,128 +6,667 @@ Handles agent session persistence and retrieval
 import os
 import json
 import glob
+import base64
 import logging
 import shutil
-from typing import Dict, List, Optional, Any
-from datetime import datetime
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Any, Tuple
+from datetime import datetime, timezone
+
+from .fs_watcher import fs_watcher
+from .message_log import LOG_FILE, MessageLog
+from .session_archive import ARCHIVE_DIR, PACKED_MESSAGES, SessionArchive, archive_path_for
+from .session_catalog import SessionCatalog, message_text
 
 # Set up logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+# Number of parsed message records kept in memory
+MESSAGE_CACHE_SIZE = int(os.getenv("TRADEARENA_MESSAGE_CACHE_SIZE", "4096"))
+
+# Sessions idle for this many seconds are packed into an archive (0 disables archiving)
+ARCHIVE_AFTER = float(os.getenv("TRADEARENA_ARCHIVE_AFTER", str(24 * 3600)))
+ARCHIVE_INTERVAL = float(os.getenv("TRADEARENA_ARCHIVE_INTERVAL", "3600"))
+
+class MessageCache:
+    """LRU of projected message records, invalidated when the stored message changes"""
+    
+    MISS = object()
+    
+    def __init__(self, max_size: int = MESSAGE_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str, version: tuple) -> Any:
+        """Cached record for key, or MISS when absent or stored under another version"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                return self.MISS
+            self._entries.move_to_end(key)
+            return entry[1]
+    
+    def put(self, key: str, version: tuple, record: Optional[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._entries[key] = (version, record)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self, prefix: str = "") -> None:
+        """Forget cached records whose key (a file path) starts with prefix (all when empty)"""
+        with self._lock:
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                del self._entries[key]
+
 class SessionManager:
     """Manages agent sessions with persistent storage"""
     
     def __init__(self, sessions_dir: str = "sessions"):
         self.sessions_dir = sessions_dir
         os.makedirs(sessions_dir, exist_ok=True)
+        self.message_cache = MessageCache()
+        self._archiver = None
+        self._archiver_stop = threading.Event()
+        self._search_backfill = None
+        
+        # Session metadata lives in a SQLite catalog kept current by the write path
+        self.catalog = SessionCatalog(os.path.join(sessions_dir, "catalog.db"))
+        # Sessions written or removed outside the session writers (other tools, manual cleanup)
+        # When polling, only stat the session directories themselves: walking every message
+        # file each interval is too costly on large trees
+        fs_watcher.subscribe(sessions_dir, self._on_sessions_change, poll_depth=1)
+        
+        if glob.glob(os.path.join(sessions_dir, "session_*")):
+            if self.catalog.is_empty():
+                self.reindex()
+            elif not self.catalog.has_agent_configs():
+                # Catalogs created before the agent config map existed
+                self.catalog.replace_agent_configs(self._scan_agent_configs())
+            if not self.catalog.search_indexed():
+                # Sessions written before message search existed; new messages are indexed as they are written
+                self._search_backfill = threading.Thread(target=self.reindex_search, name="session-search-backfill",
+                                                         daemon=True)
+                self._search_backfill.start()
+        else:
+            self.catalog.mark_search_indexed()
     
     def list_sessions(self) -> List[Dict]:
         """List all available sessions with metadata"""
-        sessions = []
+        # Sorted by last activity (most recent first) by the catalog index
+        return [self._format_session(row) for row in self.catalog.list_sessions()]
+    
+    def list_sessions_page(self, limit: int = 50, cursor: str = None, agent_id: str = None,
+                           trading_chain: str = None, provider: str = None) -> Dict[str, Any]:
+        """List one page of sessions; pass next_cursor back to get the following page"""
+        after = self.decode_cursor(cursor) if cursor else None
+        # Fetch one extra row to know whether another page exists
+        rows = self.catalog.query_sessions(limit + 1, after=after, agent_id=agent_id,
+                                           chain=trading_chain, provider=provider)
+        page = rows[:limit]
+        next_cursor = self.encode_cursor(page[-1]) if len(rows) > limit else None
+        return {
+            "sessions": [self._format_session(row) for row in page],
+            "next_cursor": next_cursor
+        }
+    
+    def iter_sessions(self, agent_id: str = None, trading_chain: str = None, provider: str = None,
+                      batch_size: int = 200) -> Iterator[Dict]:
+        """Yield every matching session page by page, so exports never hold the full list"""
+        after = None
+        while True:
+            rows = self.catalog.query_sessions(batch_size, after=after, agent_id=agent_id,
+                                               chain=trading_chain, provider=provider)
+            for row in rows:
+                yield self._format_session(row)
+            if len(rows) < batch_size:
+                return
+            after = (rows[-1]["updated_at"], rows[-1]["session_id"])
+    
+    @staticmethod
+    def encode_cursor(row: Dict) -> str:
+        """Opaque page cursor for the position after a catalog row"""
+        payload = json.dumps([row.get("updated_at") or "", row.get("session_id")])
+        return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+    
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[str, str]:
+        """Decode a page cursor into (updated_at, session_id); raises ValueError if malformed"""
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            updated_at, session_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+            return str(updated_at), str(session_id)
+        except Exception:
+            raise ValueError(f"Invalid cursor: {cursor}")
+    
+    def reindex(self) -> int:
+        """Rebuild the session catalog from the session directories (one-shot full scan)"""
+        rows = []
+        
+        # Rebuild the agent_id -> agent_config map first so session scans can look agents up by key
+        self.catalog.replace_agent_configs(self._scan_agent_configs())
+        
+        for session_dir in glob.glob(os.path.join(self.sessions_dir, "session_*")):
+            row = self._scan_session(session_dir)
+            if row:
+                rows.append(row)
         
-        # Find all session directories
-        session_dirs = glob.glob(os.path.join(self.sessions_dir, "session_*"))
+        indexed = {row["session_id"] for row in rows}
+        for archive_file in glob.glob(os.path.join(self.sessions_dir, ARCHIVE_DIR, "session_*.zip")):
+            row = self._scan_archive(SessionArchive(archive_file))
+            if row and row["session_id"] not in indexed:
+                rows.append(row)
         
-        for session_dir in session_dirs:
-            session_file = os.path.join(session_dir, "session.json")
-            if os.path.exists(session_file):
+        self.catalog.replace_all(rows)
+        logger.info(f"Reindexed {len(rows)} sessions into the session catalog")
+        return len(rows)
+    
+    def reindex_search(self) -> int:
+        """Rebuild the message search index from every stored session; returns messages indexed"""
+        session_ids = [os.path.basename(d)[len("session_"):]
+                       for d in glob.glob(os.path.join(self.sessions_dir, "session_*")) if os.path.isdir(d)]
+        session_ids += [os.path.basename(a)[len("session_"):-len(".zip")]
+                        for a in glob.glob(os.path.join(self.sessions_dir, ARCHIVE_DIR, "session_*.zip"))]
+        
+        total = 0
+        for session_id in dict.fromkeys(session_ids):
+            try:
+                messages = [
+                    (record.get("message_id"), (record.get("message") or {}).get("role"),
+                     message_text(record), record.get("created_at"))
+                    for record in self._stored_messages(session_id)
+                ]
+                self.catalog.replace_session_messages(session_id, messages)
+                total += len(messages)
+            except Exception as e:
+                logger.error(f"Error indexing messages of session {session_id}: {e}")
+        
+        self.catalog.mark_search_indexed()
+        logger.info(f"Indexed {total} messages for search")
+        return total
+    
+    def search_messages(self, query: str, limit: int = 20, offset: int = 0, agent_id: str = None,
+                        trading_chain: str = None, role: str = None) -> Dict[str, Any]:
+        """Ranked full-text search over all session messages; pass next_offset back for the next page"""
+        # Fetch one extra hit to know whether another page exists
+        rows = self.catalog.search_messages(query, limit=limit + 1, offset=offset, agent_id=agent_id,
+                                            chain=trading_chain, role=role)
+        hits = [{
+            "session_id": row["session_id"],
+            "message_id": row["message_id"],
+            "role": row["role"],
+            "agent_name": row["agent_name"],
+            "trading_chain": row["chain"],
+            "created_at": row["created_at"],
+            "snippet": row["snippet"],
+            "score": row["score"]
+        } for row in rows[:limit]]
+        return {
+            "query": query,
+            "results": hits,
+            "next_offset": offset + limit if len(rows) > limit else None,
+            "ranked": self.catalog.fts_enabled
+        }
+    
+    def _stored_messages(self, session_id: str) -> Iterator[Dict[str, Any]]:
+        """Yield every stored message of a session's first agent, unprojected, from its directory or archive"""
+        session_dir = os.path.join(self.sessions_dir, f"session_{session_id}")
+        if os.path.isdir(session_dir):
+            agent_dirs = glob.glob(os.path.join(session_dir, "agents", "agent_*"))
+            if not agent_dirs:
+                return
+            log = MessageLog(agent_dirs[0])
+            if log.exists():
+                yield from log.read_range()
+                return
+            messages_dir = os.path.join(agent_dirs[0], "messages")
+            for message_id in self._message_ids(session_id, messages_dir):
                 try:
-                    with open(session_file, 'r') as f:
-                        session_data = json.load(f)
-                    
-                    # Extract agent information
-                    agent_info = self._extract_agent_info(session_dir)
-                    
-                    # Calculate session size
-                    session_size = self._calculate_session_size(session_dir)
-                    
-                    # Format session info
-                    session_info = {
-                        "session_id": session_data.get("session_id"),
-                        "session_type": session_data.get("session_type", "UNKNOWN"),
-                        "created_at": session_data.get("created_at"),
-                        "updated_at": session_data.get("updated_at"),
-                        "agent_info": agent_info,
-                        "message_count": agent_info.get("message_count", 0),
-                        "file_size": session_size,
-                        "last_activity": self._get_last_activity(session_dir)
-                    }
-                    
-                    sessions.append(session_info)
+                    with open(os.path.join(messages_dir, f"message_{message_id}.json"), 'r') as f:
+                        yield json.load(f)
                 except Exception as e:
-                    logger.error(f"Error loading session {session_dir}: {e}")
-                    continue
+                    logger.error(f"Error loading message {message_id} of session {session_id}: {e}")
+            return
         
-        # Sort by last activity (most recent first)
-        sessions.sort(key=lambda x: x.get("updated_at", ""), reverse=True)
-        return sessions
+        archive = self._archive(session_id)
+        if archive.exists():
+            with archive.open() as zf:
+                names = zf.namelist()
+                prefix = self._archived_agent_prefix(names)
+                if prefix:
+                    message_ids, read = self._archived_message_reader(zf, names, prefix)
+                    for message_id in message_ids:
+                        yield read(message_id)
     
-    def get_session_messages(self, session_id: str) -> List[Dict[str, Any]]:
-        """Load all messages from a specific session"""
+    def index_session(self, session_id: str) -> Optional[Dict]:
+        """Re-scan a single session directory (or its archive) into the catalog"""
         session_dir = os.path.join(self.sessions_dir, f"session_{session_id}")
+        archive = self._archive(session_id)
+        if os.path.isdir(session_dir):
+            row = self._scan_session(session_dir)
+        elif archive.exists():
+            row = self._scan_archive(archive)
+        else:
+            row = None
         
-        if not os.path.exists(session_dir):
-            return []
+        if row:
+            self.catalog.upsert_session(row)
+        else:
+            self.catalog.delete_session(session_id)
+        return row
+    
+    def _on_sessions_change(self, changes: List[tuple]) -> None:
+        """Keep the catalog coherent with session directories changed by other writers"""
+        root = os.path.abspath(self.sessions_dir)
+        rescan, agent_files = set(), set()
         
-        # Find agent directory
-        agent_dirs = glob.glob(os.path.join(session_dir, "agents", "agent_*"))
-        if not agent_dirs:
-            return []
+        for kind, path in changes:
+            relative_path = os.path.relpath(path, root)
+            parts = relative_path.split(os.sep)
+            if not parts[0].startswith("session_"):
+                continue
+            session_id = parts[0][len("session_"):]
+            
+            if kind == "deleted" and len(parts) <= 2:
+                # Session directory or session.json removed
+                rescan.add(session_id)
+            elif (parts[-1] == "session.json" or len(parts) == 1) and self.catalog.get_session(session_id) is None:
+                # Session created by a writer that does not maintain the catalog (polling only sees its directory)
+                rescan.add(session_id)
+            elif parts[-1] == "agent.json" and kind != "deleted":
+                agent_files.add(path)
+            if kind != "added":
+                # Message cache keys use the sessions_dir-relative form of the path
+                self.message_cache.invalidate(os.path.join(self.sessions_dir, relative_path))
         
-        agent_dir = agent_dirs[0]
-        message_files = glob.glob(os.path.join(agent_dir, "messages", "message_*.json"))
+        for session_id in rescan:
+            self.index_session(session_id)
+            if not os.path.isdir(os.path.join(self.sessions_dir, f"session_{session_id}")):
+                self.message_cache.invalidate(os.path.join(self.sessions_dir, f"session_{session_id}") + os.sep)
         
-        # Sort messages by ID
-        message_files.sort(key=lambda x: int(os.path.basename(x).split("_")[1].split(".")[0]))
+        for agent_file in agent_files:
+            try:
+                with open(agent_file, 'r') as f:
+                    agent_data = json.load(f)
+            except Exception:
+                continue  # Mid-write; the completed write raises another event
+            agent_config = agent_data.get("state", {}).get("agent_config", {})
+            if agent_data.get("agent_id") and agent_config:
+                self.catalog.record_agent_config(agent_data["agent_id"], agent_config,
+                                                 agent_data.get("updated_at") or "")
+    
+    def _scan_agent_configs(self) -> Dict[str, tuple]:
+        """Read every agent.json once into {agent_id: (agent_config, updated_at)}, newest write wins"""
+        agent_configs = {}
         
-        messages = []
-        for message_file in message_files:
+        for agent_file in glob.glob(os.path.join(self.sessions_dir, "session_*", "agents", "agent_*", "agent.json")):
             try:
-                with open(message_file, 'r') as f:
-                    message_data = json.load(f)
-                    
-                # Extract text content
-                message = message_data.get("message", {})
-                content = message.get("content", [])
-                
-                text_content = ""
-                if content and len(content) > 0:
-                    # Handle new message structure with reasoningContent and text
-                    for content_item in content:
-                        if isinstance(content_item, dict):
-                            # Look for direct text content (not reasoningContent)
-                            if "text" in content_item and content_item["text"].strip():
-                                text_content = content_item["text"]
-                                logger.debug(f"Found text content: {text_content[:100]}...")
-                                break
-                            # Handle old structure as fallback
-                            elif "text" in content_item:
-                                text_content = content_item["text"]
-                
-                formatted_message = {
-                    "role": message.get("role", "unknown"),
-                    "content": text_content,
-                    "message_id": message_data.get("message_id"),
-                    "created_at": message_data.get("created_at"),
-                    "updated_at": message_data.get("updated_at")
-                }
-                
-                # Only add messages with actual content (filter out blank/empty messages)
-                if text_content and text_content.strip():
-                    messages.append(formatted_message)
-                else:
-                    logger.debug(f"Skipping blank message: {message_data.get('message_id')}")
+                with open(agent_file, 'r') as f:
+                    agent_data = json.load(f)
             except Exception as e:
-                logger.error(f"Error loading message {message_file}: {e}")
+                logger.error(f"Error reading agent file {agent_file}: {e}")
                 continue
+            
+            agent_id = agent_data.get("agent_id")
+            agent_config = agent_data.get("state", {}).get("agent_config", {})
+            updated_at = agent_data.get("updated_at") or ""
+            if agent_id and agent_config:
+                if agent_id not in agent_configs or updated_at >= agent_configs[agent_id][1]:
+                    agent_configs[agent_id] = (agent_config, updated_at)
+        
+        return agent_configs
+    
+    def _scan_session(self, session_dir: str) -> Optional[Dict]:
+        """Read a session directory into a catalog row"""
+        session_file = os.path.join(session_dir, "session.json")
+        if not os.path.exists(session_file):
+            return None
+        
+        try:
+            with open(session_file, 'r') as f:
+                session_data = json.load(f)
+            
+            # Extract agent information
+            agent_info = self._extract_agent_info(session_dir)
+            
+            # Last activity is the later of session.json and the newest message write
+            updated_at = session_data.get("updated_at") or ""
+            messages_dirs = glob.glob(os.path.join(session_dir, "agents", "agent_*", "messages"))
+            messages_dirs += glob.glob(os.path.join(session_dir, "agents", "agent_*", LOG_FILE))
+            if messages_dirs:
+                latest_write = max(os.path.getmtime(d) for d in messages_dirs)
+                updated_at = max(updated_at, datetime.fromtimestamp(latest_write, timezone.utc).isoformat())
+            
+            return self._session_row(session_data, agent_info, updated_at, self._session_bytes(session_dir))
+        except Exception as e:
+            logger.error(f"Error loading session {session_dir}: {e}")
+            return None
+    
+    def _scan_archive(self, archive: SessionArchive) -> Optional[Dict]:
+        """Read an archived session into a catalog row without unpacking it"""
+        try:
+            with archive.open() as zf:
+                names = zf.namelist()
+                if "session.json" not in names:
+                    return None
+                session_data = json.loads(zf.read("session.json"))
+                
+                agent_info = {"agent_id": None, "message_count": 0}
+                agent_config = None
+                updated_at = session_data.get("updated_at") or ""
+                prefix = self._archived_agent_prefix(names)
+                if prefix:
+                    if prefix + "agent.json" in names:
+                        agent_data = json.loads(zf.read(prefix + "agent.json"))
+                        agent_info["agent_id"] = agent_data.get("agent_id")
+                        agent_config = agent_data.get("state", {}).get("agent_config")
+                    message_ids, read = self._archived_message_reader(zf, names, prefix)
+                    agent_info["message_count"] = len(message_ids)
+                    if message_ids:
+                        # Last activity is the newest message's timestamp
+                        last_message = read(message_ids[-1])
+                        updated_at = max(updated_at, last_message.get("updated_at") or last_message.get("created_at") or "")
+                
+                agent_info = self._enhance_agent_info(agent_info, agent_config)
+            
+            row = self._session_row(session_data, agent_info, updated_at, archive.size())
+            row["archived"] = 1
+            return row
+        except Exception as e:
+            logger.error(f"Error loading archived session {archive.path}: {e}")
+            return None
+    
+    @staticmethod
+    def _session_row(session_data: Dict, agent_info: Dict, updated_at: str, byte_size: int) -> Dict:
+        """Assemble a catalog row from session.json and the extracted agent info"""
+        return {
+            "session_id": session_data.get("session_id"),
+            "session_type": session_data.get("session_type", "UNKNOWN"),
+            "agent_id": agent_info.get("agent_id"),
+            "config_agent_id": agent_info.get("config_agent_id"),
+            "agent_name": agent_info.get("name"),
+            "provider": agent_info.get("ai_provider") if agent_info.get("ai_provider") != "unknown" else None,
+            "chain": agent_info.get("trading_chain") if agent_info.get("trading_chain") != "unknown" else None,
+            "created_at": session_data.get("created_at"),
+            "updated_at": updated_at,
+            "message_count": agent_info.get("message_count", 0),
+            "byte_size": byte_size
+        }
+    
+    def _format_session(self, row: Dict) -> Dict:
+        """Shape a catalog row like the session info returned by the API"""
+        agent_info = {
+            "agent_id": row.get("agent_id"),
+            "message_count": row.get("message_count", 0)
+        }
+        
+        provider = row.get("provider")
+        chain = row.get("chain")
+        if provider and row.get("agent_name"):
+            agent_info["name"] = row["agent_name"]
+            agent_info["config_agent_id"] = row.get("config_agent_id")
+        elif row.get("agent_id") and not provider:
+            # Sessions whose state has no agent config: fall back to agent manager
+            agent_config_from_manager = self._get_agent_config_from_manager(row["agent_id"])
+            if agent_config_from_manager:
+                provider = agent_config_from_manager.get("ai_provider")
+                chain = agent_config_from_manager.get("trading_chain")
+        
+        agent_info["ai_provider"] = provider or "unknown"
+        agent_info["ai_provider_display"] = self._get_provider_display_name(provider) if provider else "Unknown"
+        agent_info["trading_chain"] = chain or "unknown"
+        
+        return {
+            "session_id": row.get("session_id"),
+            "session_type": row.get("session_type") or "UNKNOWN",
+            "created_at": row.get("created_at"),
+            "updated_at": row.get("updated_at"),
+            "agent_info": agent_info,
+            "message_count": row.get("message_count", 0),
+            "file_size": self._format_size(row.get("byte_size", 0)),
+            "last_activity": row.get("updated_at") or "",
+            "archived": bool(row.get("archived"))
+        }
+    
+    def get_session_messages(self, session_id: str, limit: int = None, before: int = None,
+                             after: int = None) -> List[Dict[str, Any]]:
+        """
+        Load messages from a specific session, oldest first
+        
+        Without a window all messages are returned. limit alone returns the last N,
+        before/after return up to limit messages preceding/following a message_id.
+        Only the message files inside the window are read.
+        """
+        session_dir = os.path.join(self.sessions_dir, f"session_{session_id}")
+        
+        if os.path.exists(session_dir):
+            # Find agent directory
+            agent_dirs = glob.glob(os.path.join(session_dir, "agents", "agent_*"))
+            if not agent_dirs:
+                return []
+            opened = self._open_messages(session_id, agent_dirs[0])
+        else:
+            # Cold sessions are read straight from their archive
+            archive = self._archive(session_id)
+            if not archive.exists():
+                return []
+            opened = self._open_archived_messages(archive)
+        
+        with opened as (message_ids, load):
+            if after is not None:
+                message_ids = [i for i in message_ids if i > after]
+            if before is not None:
+                message_ids = [i for i in message_ids if i < before]
+            
+            messages = []
+            if after is not None:
+                # Walk forward from the anchor
+                for message_id in message_ids:
+                    if limit is not None and len(messages) >= limit:
+                        break
+                    record = load(message_id)
+                    if record:
+                        messages.append(record)
+            else:
+                # Walk backward from the newest message (or the anchor) until the window is full
+                for message_id in reversed(message_ids):
+                    if limit is not None and len(messages) >= limit:
+                        break
+                    record = load(message_id)
+                    if record:
+                        messages.append(record)
+                messages.reverse()
         
         return messages
     
+    @contextmanager
+    def _open_messages(self, session_id: str, agent_dir: str):
+        """Yield (message_ids, load) for an agent stored either as a JSONL log or as message files"""
+        log = MessageLog(agent_dir)
+        if log.exists():
+            with log.snapshot() as (entries, read):
+                def load(message_id: int) -> Optional[Dict[str, Any]]:
+                    return self._load_logged_message(log, message_id, entries[message_id], read)
+                yield [i for i, (_, length) in enumerate(entries) if length], load
+        else:
+            messages_dir = os.path.join(agent_dir, "messages")
+            def load(message_id: int) -> Optional[Dict[str, Any]]:
+                return self._load_message(os.path.join(messages_dir, f"message_{message_id}.json"))
+            yield self._message_ids(session_id, messages_dir), load
+    
+    @contextmanager
+    def _open_archived_messages(self, archive: SessionArchive):
+        """Yield (message_ids, load) for a session packed into an archive"""
+        version = (os.stat(archive.path).st_mtime_ns,)
+        with archive.open() as zf:
+            names = zf.namelist()
+            prefix = self._archived_agent_prefix(names)
+            if not prefix:
+                yield [], lambda message_id: None
+                return
+            message_ids, read = self._archived_message_reader(zf, names, prefix)
+            
+            def load(message_id: int) -> Optional[Dict[str, Any]]:
+                key = f"{archive.path}!{prefix}{message_id}"
+                cached = self.message_cache.get(key, version)
+                if cached is not MessageCache.MISS:
+                    return cached
+                try:
+                    record = self._project_message(read(message_id))
+                except Exception as e:
+                    logger.error(f"Error loading message {message_id} from {archive.path}: {e}")
+                    return None
+                self.message_cache.put(key, version, record)
+                return record
+            
+            yield message_ids, load
+    
+    @staticmethod
+    def _archived_agent_prefix(names: List[str]) -> Optional[str]:
+        """Member prefix of the first agent in an archive, e.g. agents/agent_x/"""
+        prefixes = sorted({"/".join(name.split("/")[:2]) + "/" for name in names
+                           if name.startswith("agents/agent_") and name.count("/") >= 2})
+        return prefixes[0] if prefixes else None
+    
+    @staticmethod
+    def _archived_message_reader(zf, names: List[str], prefix: str):
+        """(sorted message IDs, read(message_id) -> stored message) for an archived agent in either format"""
+        log_member = prefix + LOG_FILE if prefix + LOG_FILE in names else prefix + PACKED_MESSAGES
+        if log_member in names:
+            records = {}
+            for line in zf.read(log_member).splitlines():
+                if line.strip():
+                    record = json.loads(line)
+                    records[int(record["message_id"])] = record  # Later versions win
+            return sorted(records), records.__getitem__
+        
+        message_prefix = prefix + "messages/message_"
+        members = {}
+        for name in names:
+            if name.startswith(message_prefix) and name.endswith(".json"):
+                try:
+                    members[int(name[len(message_prefix):-len(".json")])] = name
+                except ValueError:
+                    continue
+        return sorted(members), lambda message_id: json.loads(zf.read(members[message_id]))
+    
+    def _message_ids(self, session_id: str, messages_dir: str) -> List[int]:
+        """Sorted message IDs of a session without opening any message file"""
+        # Strands numbers messages 0..n-1; trust the catalog count when the files agree
+        row = self.catalog.get_session(session_id)
+        count = row.get("message_count", 0) if row else 0
+        if count and os.path.exists(os.path.join(messages_dir, f"message_{count - 1}.json")) \
+                and not os.path.exists(os.path.join(messages_dir, f"message_{count}.json")):
+            return list(range(count))
+        
+        if not os.path.isdir(messages_dir):
+            return []
+        message_ids = []
+        for name in os.listdir(messages_dir):
+            if name.startswith("message_") and name.endswith(".json"):
+                try:
+                    message_ids.append(int(name[len("message_"):-len(".json")]))
+                except ValueError:
+                    continue
+        message_ids.sort()
+        return message_ids
+    
+    def _load_message(self, message_file: str) -> Optional[Dict[str, Any]]:
+        """Projected record of one message file (None when blank), cached by mtime"""
+        try:
+            stat = os.stat(message_file)
+        except OSError:
+            return None
+        
+        version = (stat.st_mtime_ns, stat.st_size)
+        cached = self.message_cache.get(message_file, version)
+        if cached is not MessageCache.MISS:
+            return cached
+        
+        try:
+            with open(message_file, 'r') as f:
+                message_data = json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading message {message_file}: {e}")
+            return None
+        
+        record = self._project_message(message_data)
+        self.message_cache.put(message_file, version, record)
+        return record
+    
+    def _load_logged_message(self, log: MessageLog, message_id: int, entry: tuple, read) -> Optional[Dict[str, Any]]:
+        """Projected record of one logged message, cached by its position in the log"""
+        # Lines are immutable; a new version or a compaction moves the message to a new (offset, length)
+        key = f"{log.log_path}#{message_id}"
+        cached = self.message_cache.get(key, entry)
+        if cached is not MessageCache.MISS:
+            return cached
+        
+        try:
+            message_data = read(*entry)
+        except Exception as e:
+            logger.error(f"Error loading message {message_id} from {log.log_path}: {e}")
+            return None
+        if message_data is None:
+            return None
+        if message_data.get("message_id", message_id) != message_id:
+            # Index and log out of step (e.g. compacted by another process); never cache it
+            logger.warning(f"Message {message_id} of {log.log_path} points at message {message_data.get('message_id')}")
+            return None
+        
+        record = self._project_message(message_data)
+        self.message_cache.put(key, entry, record)
+        return record
+    
+    @staticmethod
+    def _project_message(message_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Reduce a stored Strands message to {role, content, message_id, timestamps}"""
+        # Extract text content
+        message = message_data.get("message", {})
+        content = message.get("content", [])
+        
+        text_content = ""
+        if content and len(content) > 0:
+            # Handle new message structure with reasoningContent and text
+            for content_item in content:
+                if isinstance(content_item, dict):
+                    # Look for direct text content (not reasoningContent)
+                    if "text" in content_item and content_item["text"].strip():
+                        text_content = content_item["text"]
+                        break
+                    # Handle old structure as fallback
+                    elif "text" in content_item:
+                        text_content = content_item["text"]
+        
+        # Only keep messages with actual content (filter out blank/empty messages)
+        if not text_content or not text_content.strip():
+            logger.debug(f"Skipping blank message: {message_data.get('message_id')}")
+            return None
+        
+        return {
+            "role": message.get("role", "unknown"),
+            "content": text_content,
+            "message_id": message_data.get("message_id"),
+            "created_at": message_data.get("created_at"),
+            "updated_at": message_data.get("updated_at")
+        }
+    
+    def get_session_info(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Get one session's metadata by primary key, indexing only that session if it is not catalogued yet"""
+        row = self.catalog.get_session(session_id)
+        if row is None:
+            row = self.index_session(session_id)
+        return self._format_session(row) if row else None
+    
     def get_latest_session(self) -> Optional[Dict[str, Any]]:
         """Get the most recent session"""
-        sessions = self.list_sessions()
-        return sessions[0] if sessions else None
+        rows = self.catalog.query_sessions(1)
+        return self._format_session(rows[0]) if rows else None
     
     def _extract_agent_info(self, session_dir: str) -> Dict:
         """Extract agent information from session directory"""
@@ -141,25 +680,31 @@ class SessionManager:
         # Get agent info from agent.json
         agent_file = os.path.join(agent_dir, "agent.json")
         agent_info = {"agent_id": None, "message_count": 0}
+        agent_config = None
         
         if os.path.exists(agent_file):
             try:
                 with open(agent_file, 'r') as f:
                     agent_data = json.load(f)
                     agent_info["agent_id"] = agent_data.get("agent_id")
+                    agent_config = agent_data.get("state", {}).get("agent_config")
             except Exception as e:
                 logger.error(f"Error reading agent file: {e}")
         
         # Count messages
-        message_files = glob.glob(os.path.join(agent_dir, "messages", "message_*.json"))
-        agent_info["message_count"] = len(message_files)
+        log = MessageLog(agent_dir)
+        if log.exists():
+            agent_info["message_count"] = log.count()
+        else:
+            message_files = glob.glob(os.path.join(agent_dir, "messages", "message_*.json"))
+            agent_info["message_count"] = len(message_files)
         
-        # Enhance with agent configuration details
-        agent_info = self._enhance_agent_info(agent_info)
+        # Enhance with agent configuration details (this session's own state when it has one)
+        agent_info = self._enhance_agent_info(agent_info, agent_config)
         
         return agent_info
     
-    def _enhance_agent_info(self, agent_info: Dict) -> Dict:
+    def _enhance_agent_info(self, agent_info: Dict, agent_config: Optional[Dict] = None) -> Dict:
         """Enhance agent info with configuration details from agent state or agent manager"""
         try:
             # Import here to avoid circular imports
@@ -174,7 +719,7 @@ class SessionManager:
                 return agent_info
             
             # First try to get agent config from agent state (preferred method)
-            agent_config_from_state = self._get_agent_config_from_state(agent_id)
+            agent_config_from_state = agent_config or self._get_agent_config_from_state(agent_id)
             
             if agent_config_from_state:
                 agent_info["ai_provider"] = agent_config_from_state.get("ai_provider", "unknown")
@@ -213,35 +758,12 @@ class SessionManager:
     def _get_agent_config_from_state(self, agent_id: str) -> Dict:
         """Extract agent configuration from agent's saved state"""
         try:
-            # Find the agent directory for this session
-            session_dirs = glob.glob(os.path.join(self.sessions_dir, "session_*"))
+            # Keyed lookup in the agent_id -> agent_config map the session writers keep current
+            agent_config = self.catalog.get_agent_config(agent_id)
             
-            for session_dir in session_dirs:
-                # Look for agent directories that might contain this agent
-                # Try multiple patterns to handle different directory naming conventions
-                agent_patterns = [
-                    f"agent_{agent_id}*",
-                    f"agent_trading_agent_{agent_id}*",
-                    f"trading_agent_{agent_id}*"
-                ]
-                
-                for pattern in agent_patterns:
-                    agent_dirs = glob.glob(os.path.join(session_dir, "agents", pattern))
-                    
-                    for agent_dir in agent_dirs:
-                        # Check agent.json file
-                        agent_file = os.path.join(agent_dir, "agent.json")
-                        if os.path.exists(agent_file):
-                            with open(agent_file, 'r') as f:
-                                agent_data = json.load(f)
-                            
-                            # Extract config from agent state
-                            state = agent_data.get("state", {})
-                            agent_config = state.get("agent_config", {})
-                            
-                            if agent_config:
-                                logger.debug(f"Found agent config in state: {agent_config}")
-                                return agent_config
+            if agent_config:
+                logger.debug(f"Found agent config in state: {agent_config}")
+                return agent_config
             
             logger.debug(f"No agent config found in state for agent_id: {agent_id}")
             return None
@@ -310,21 +832,25 @@ class SessionManager:
         
         return provider_display
     
-    def _calculate_session_size(self, session_dir: str) -> str:
-        """Calculate total size of session files in human-readable format"""
+    def _session_bytes(self, session_dir: str) -> int:
+        """Total size in bytes of the JSON files in a session directory (reindex only; writes keep it current)"""
         total_size = 0
         
         # Calculate size of all JSON files in the session
         for root, dirs, files in os.walk(session_dir):
             for file in files:
-                if file.endswith('.json'):
+                if file.endswith('.json') or file == LOG_FILE:
                     file_path = os.path.join(root, file)
                     try:
                         total_size += os.path.getsize(file_path)
                     except OSError:
                         continue
         
-        # Convert to human-readable format
+        return total_size
+    
+    @staticmethod
+    def _format_size(total_size: int) -> str:
+        """Convert a byte count to human-readable format"""
         if total_size < 1024:
             return f"{total_size}B"
         elif total_size < 1024 * 1024:
@@ -332,41 +858,41 @@ class SessionManager:
         else:
             return f"{total_size // (1024 * 1024)}MB"
     
-    def _get_last_activity(self, session_dir: str) -> str:
-        """Get the last activity timestamp from the session"""
-        try:
-            # Check session.json first
-            session_file = os.path.join(session_dir, "session.json")
-            if os.path.exists(session_file):
-                with open(session_file, 'r') as f:
-                    session_data = json.load(f)
-                    return session_data.get("updated_at", "")
-        except Exception:
-            pass
-        
-        return ""
+    def get_storage_stats(self) -> Dict[str, Any]:
+        """Disk usage of the sessions directory from the catalog, without touching session files"""
+        stats = self.catalog.storage_totals()
+        catalog_bytes = 0
+        for suffix in ("", "-wal", "-shm"):
+            path = self.catalog.db_path + suffix
+            if os.path.exists(path):
+                catalog_bytes += os.path.getsize(path)
+        stats["catalog_bytes"] = catalog_bytes
+        stats["total_bytes"] = stats["bytes"] + catalog_bytes
+        stats["total_size"] = self._format_size(stats["total_bytes"])
+        return stats
     
     def find_session_by_agent(self, agent_id: str) -> Optional[Dict]:
         """Find the most recent session for a specific agent"""
-        sessions = self.list_sessions()
-        
-        for session in sessions:
-            if session["agent_info"]["agent_id"] == agent_id:
-                return session
-        
-        return None
+        rows = self.catalog.query_sessions(1, agent_id=agent_id)
+        return self._format_session(rows[0]) if rows else None
     
     def delete_session(self, session_id: str) -> bool:
         """Delete an entire session directory and all its contents"""
         session_dir = os.path.join(self.sessions_dir, f"session_{session_id}")
+        archive = self._archive(session_id)
         
-        if not os.path.exists(session_dir):
+        if not os.path.exists(session_dir) and not archive.exists():
             logger.warning(f"Session directory does not exist: {session_dir}")
             return False
         
         try:
-            # Remove the entire session directory and all its contents
-            shutil.rmtree(session_dir)
+            # Remove the entire session directory and all its contents, and any archive of it
+            if os.path.exists(session_dir):
+                shutil.rmtree(session_dir)
+            if archive.exists():
+                os.remove(archive.path)
+            self.catalog.delete_session(session_id)
+            self.message_cache.invalidate(session_dir + os.sep)
             logger.info(f"Successfully deleted session: {session_id}")
             return True
         except Exception as e:
@@ -378,7 +904,7 @@ class SessionManager:
         session_dir = os.path.join(self.sessions_dir, f"session_{session_id}")
         
         if not os.path.exists(session_dir):
-            return None
+            return self._get_archived_agent_config(session_id)
         
         # Find agent directory
         agent_dirs = glob.glob(os.path.join(session_dir, "agents", "agent_*"))
@@ -406,5 +932,119 @@ class SessionManager:
         
         return None
 
+    def _get_archived_agent_config(self, session_id: str) -> Optional[Dict]:
+        """Agent configuration stored in an archived session's agent.json"""
+        archive = self._archive(session_id)
+        if not archive.exists():
+            return None
+        try:
+            with archive.open() as zf:
+                names = zf.namelist()
+                prefix = self._archived_agent_prefix(names)
+                if not prefix or prefix + "agent.json" not in names:
+                    return None
+                agent_data = json.loads(zf.read(prefix + "agent.json"))
+            return agent_data.get("state", {}).get("agent_config") or None
+        except Exception as e:
+            logger.error(f"Error getting archived agent config for resume: {e}")
+            return None
+    
+    def _archive(self, session_id: str) -> SessionArchive:
+        return SessionArchive(archive_path_for(self.sessions_dir, session_id))
+    
+    def archive_session(self, session_id: str) -> bool:
+        """Pack a session directory into its compressed archive"""
+        session_dir = os.path.join(self.sessions_dir, f"session_{session_id}")
+        if not os.path.isdir(session_dir):
+            return False
+        try:
+            byte_size = self._archive(session_id).pack(session_dir)
+        except Exception as e:
+            logger.error(f"Error archiving session {session_id}: {e}")
+            return False
+        self.catalog.set_archived(session_id, True, byte_size)
+        self.message_cache.invalidate(session_dir + os.sep)
+        return True
+    
+    def compact_logs(self, updated_since: str) -> int:
+        """Compact the message logs of sessions written since a timestamp when garbage dominates; returns bytes reclaimed"""
+        reclaimed = 0
+        for session_id in self.catalog.updated_sessions(updated_since):
+            for agent_dir in glob.glob(os.path.join(self.sessions_dir, f"session_{session_id}", "agents", "agent_*")):
+                try:
+                    reclaimed += MessageLog(agent_dir).maybe_compact()
+                except Exception as e:
+                    logger.error(f"Error compacting message log in {agent_dir}: {e}")
+        return reclaimed
+    
+    def archive_idle_sessions(self, idle_seconds: float = ARCHIVE_AFTER, busy: set = None) -> int:
+        """Archive every session idle for longer than idle_seconds, skipping busy session IDs"""
+        cutoff = datetime.fromtimestamp(time.time() - idle_seconds, timezone.utc).isoformat()
+        archived = 0
+        for session_id in self.catalog.archive_candidates(cutoff):
+            if busy and session_id in busy:
+                continue
+            if self.archive_session(session_id):
+                archived += 1
+        if archived:
+            logger.info(f"Archived {archived} idle sessions")
+        return archived
+    
+    def start_archiver(self, busy_sessions=None) -> None:
+        """Start the background thread that compacts message logs and archives idle sessions every ARCHIVE_INTERVAL seconds"""
+        if self._archiver is not None and self._archiver.is_alive():
+            return
+        self._archiver_stop.clear()
+        self._archiver = threading.Thread(target=self._run_archiver, args=(busy_sessions,),
+                                          name="session-archiver", daemon=True)
+        self._archiver.start()
+    
+    def stop_archiver(self) -> None:
+        """Stop the background archiver"""
+        self._archiver_stop.set()
+        if self._archiver is not None:
+            self._archiver.join(timeout=5)
+        self._archiver = None
+    
+    def _run_archiver(self, busy_sessions) -> None:
+        last_pass = datetime.now(timezone.utc).isoformat()
+        while not self._archiver_stop.wait(ARCHIVE_INTERVAL):
+            # Logs only written by appends are otherwise never compacted after their last update
+            this_pass = datetime.now(timezone.utc).isoformat()
+            try:
+                self.compact_logs(last_pass)
+                last_pass = this_pass
+            except Exception as e:
+                logger.error(f"Message log compaction failed: {e}")
+            if ARCHIVE_AFTER <= 0:
+                continue
+            try:
+                self.archive_idle_sessions(busy=busy_sessions() if busy_sessions else None)
+            except Exception as e:
+                logger.error(f"Session archiver failed: {e}")
+
 # Global session manager instance
 session_manager = SessionManager()
+
+if __name__ == "__main__":
+    # Maintenance commands: python -m server.sessions reindex|migrate|compact
+    import sys
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+    if command == "reindex":
+        print(f"Reindexed {session_manager.reindex()} sessions")
+        print(f"Indexed {session_manager.reindex_search()} messages for search")
+    elif command in ("migrate", "compact"):
+        total = 0
+        for agent_dir in glob.glob(os.path.join(session_manager.sessions_dir, "session_*", "agents", "agent_*")):
+            log = MessageLog(agent_dir)
+            if command == "migrate":
+                total += log.migrate_from_files()
+            elif log.exists():
+                total += log.compact()
+        if command == "migrate":
+            session_manager.reindex()
+            print(f"Migrated {total} messages to JSONL logs")
+        else:
+            print(f"Compacted message logs, reclaimed {total} bytes")
+    else:
+        print("Usage: python -m server.sessions reindex|migrate|compact")
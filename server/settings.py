@@ -3,10 +3,15 @@ Settings manager for TradeArena Web Terminal
 Handles configuration persistence for Walrus and other settings
 """
 
+import copy
 import json
 import os
 import logging
-from typing import Dict, Any, Optional
+import tempfile
+import threading
+from typing import Callable, Dict, Any, List, Optional
+
+from .fs_watcher import fs_watcher
 
 logger = logging.getLogger(__name__)
 
@@ -27,11 +32,63 @@ class SettingsManager:
             },
             "web_search": {
                 "enabled": False
+            },
+            "prompt_caching": {
+                "enabled": False
             }
         }
+        
+        # Settings live in memory; version goes up every time their content changes
+        self.version = 0
+        self._lock = threading.Lock()
+        self._subscribers: List[Callable[[int, Dict[str, Any]], None]] = []
+        self._settings = None
+        self._settings = self._read_settings()
+        self._settings_signature = self._file_signature()
+        fs_watcher.subscribe(os.path.dirname(self.settings_file), self._on_config_change)
     
     def load_settings(self) -> Dict[str, Any]:
-        """Load settings from file or return defaults"""
+        """Get a copy of the current settings"""
+        return copy.deepcopy(self._current())
+    
+    def subscribe(self, callback: Callable[[int, Dict[str, Any]], None]) -> None:
+        """Call callback(version, settings) whenever the settings change"""
+        self._subscribers.append(callback)
+    
+    def current_version(self) -> int:
+        """Version of the current settings, picking up file edits first when the watcher is off"""
+        self._current()
+        return self.version
+    
+    def _current(self) -> Dict[str, Any]:
+        """The in-memory settings (not a copy)"""
+        # Without the watcher, a stat of the file stands in for change events
+        if not fs_watcher.running and self._file_signature() != self._settings_signature:
+            self._refresh()
+        return self._settings
+    
+    def _refresh(self) -> None:
+        """Re-read the settings file, bumping the version if its content changed"""
+        signature = self._file_signature()
+        self._apply(self._read_settings(), signature)
+    
+    def _apply(self, settings: Dict[str, Any], signature: Optional[tuple]) -> None:
+        with self._lock:
+            self._settings_signature = signature
+            if settings == self._settings:
+                return
+            self._settings = settings
+            self.version += 1
+            version = self.version
+        logger.info(f"Settings changed (version {version})")
+        for callback in list(self._subscribers):
+            try:
+                callback(version, copy.deepcopy(settings))
+            except Exception as e:
+                logger.error(f"Settings subscriber failed: {e}")
+    
+    def _read_settings(self) -> Dict[str, Any]:
+        """Read settings from file or return defaults"""
         try:
             if os.path.exists(self.settings_file):
                 with open(self.settings_file, 'r', encoding='utf-8') as f:
@@ -41,10 +98,22 @@ class SettingsManager:
                     return self._clean_settings(settings)
             else:
                 logger.info(f"Settings file not found, using defaults: {self.settings_file}")
-                return self._default_settings.copy()
+                return copy.deepcopy(self._default_settings)
         except Exception as e:
             logger.error(f"Error loading settings: {e}")
-            return self._default_settings.copy()
+            # Keep what we have rather than flapping to defaults on a half-written file
+            return self._settings if self._settings is not None else copy.deepcopy(self._default_settings)
+    
+    def _file_signature(self) -> Optional[tuple]:
+        try:
+            stat = os.stat(self.settings_file)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+    
+    def _on_config_change(self, changes: List[tuple]) -> None:
+        if any(path == os.path.abspath(self.settings_file) for _, path in changes):
+            self._refresh()
     
     def save_settings(self, settings: Dict[str, Any]) -> bool:
         """Save settings to file"""
@@ -55,9 +124,21 @@ class SettingsManager:
             # Clean settings to only include enabled flag for walrus and web_search
             clean_settings = self._clean_settings(settings)
             
-            with open(self.settings_file, 'w', encoding='utf-8') as f:
-                json.dump(clean_settings, f, indent=2, ensure_ascii=False)
+            # Temp file, fsync, rename: readers never see a half-written file
+            settings_dir = os.path.dirname(self.settings_file)
+            fd, tmp_path = tempfile.mkstemp(dir=settings_dir, prefix=".tradearena_settings.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(clean_settings, f, indent=2, ensure_ascii=False)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.settings_file)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
             
+            self._apply(copy.deepcopy(clean_settings), self._file_signature())
             logger.info(f"Settings saved to {self.settings_file}")
             return True
         except Exception as e:
@@ -66,23 +147,28 @@ class SettingsManager:
     
     def is_walrus_enabled(self) -> bool:
         """Check if Walrus storage is enabled"""
-        settings = self.load_settings()
+        settings = self._current()
         return settings.get("walrus", {}).get("enabled", False)
     
     def is_web_search_enabled(self) -> bool:
         """Check if web search is enabled"""
-        settings = self.load_settings()
+        settings = self._current()
         return settings.get("web_search", {}).get("enabled", False)
     
+    def is_prompt_caching_enabled(self) -> bool:
+        """Check if provider-side prompt caching is enabled"""
+        settings = self._current()
+        return settings.get("prompt_caching", {}).get("enabled", False)
+    
     def get_walrus_settings(self) -> Dict[str, Any]:
         """Get Walrus-specific settings"""
-        settings = self.load_settings()
-        return settings.get("walrus", self._default_settings["walrus"])
+        settings = self._current()
+        return copy.deepcopy(settings.get("walrus", self._default_settings["walrus"]))
     
     def get_web_search_settings(self) -> Dict[str, Any]:
         """Get web search-specific settings"""
-        settings = self.load_settings()
-        return settings.get("web_search", self._default_settings["web_search"])
+        settings = self._current()
+        return copy.deepcopy(settings.get("web_search", self._default_settings["web_search"]))
     
     def save_walrus_settings(self, walrus_config: Dict[str, Any]) -> bool:
         """Save Walrus-specific settings"""
@@ -101,11 +187,11 @@ class SettingsManager:
         return self.save_settings(settings)
     
     def _clean_settings(self, settings: Dict[str, Any]) -> Dict[str, Any]:
-        """Clean settings to only include enabled flag for walrus and web_search"""
+        """Clean settings to only include enabled flag for walrus, web_search and prompt_caching"""
         clean_settings = self._default_settings.copy()
         
         for key, value in settings.items():
-            if key in ["walrus", "web_search"]:
+            if key in ["walrus", "web_search", "prompt_caching"]:
                 # Only keep the enabled flag for these settings
                 if isinstance(value, dict):
                     clean_settings[key] = {"enabled": value.get("enabled", False)}
@@ -2,7 +2,7 @@
 Agent management templates for TradeArena Web Terminal
 """
 
-from ..static import SUBMENU_JS
+from ..assets import SUBMENU_JS_URL
 from .base import base_template
 
 def manage_agents_template(agents: list = None) -> str:
@@ -80,8 +80,6 @@ def manage_agents_template(agents: list = None) -> str:
             """
     
     additional_js = f"""
-{SUBMENU_JS}
-
 class ManageAgentsMenu extends SubMenu {{
     select() {{
         const selectedItem = this.menuItems[this.selectedIndex];
@@ -107,7 +105,8 @@ document.addEventListener('DOMContentLoaded', () => {{
 }});
     """
     
-    return base_template("TradeArena Web Terminal - Manage Agents", content, additional_css, additional_js)
+    return base_template("TradeArena Web Terminal - Manage Agents", content, additional_css, additional_js,
+                         scripts=[SUBMENU_JS_URL])
 
 def manage_agent_template(agent_id: str, agent_data: dict = None) -> str:
     """Manage individual agent page template"""
@@ -179,8 +178,6 @@ def manage_agent_template(agent_id: str, agent_data: dict = None) -> str:
     """
     
     additional_js = f"""
-{SUBMENU_JS}
-
 class ManageAgentMenu extends SubMenu {{
     select() {{
         const selectedItem = this.menuItems[this.selectedIndex];
@@ -204,7 +201,8 @@ document.addEventListener('DOMContentLoaded', () => {{
 }});
     """
     
-    return base_template("TradeArena Web Terminal - Manage Agent", content, additional_css, additional_js)
+    return base_template("TradeArena Web Terminal - Manage Agent", content, additional_css, additional_js,
+                         scripts=[SUBMENU_JS_URL])
 
 def create_agent_template() -> str:
     """Create new agent page template"""
@@ -245,8 +243,6 @@ def create_agent_template() -> str:
     """
     
     additional_js = f"""
-{SUBMENU_JS}
-
 class CreateAgentMenu extends SubMenu {{
     select() {{
         const selectedItem = this.menuItems[this.selectedIndex];
@@ -271,7 +267,8 @@ document.addEventListener('DOMContentLoaded', () => {{
 }});
     """
     
-    return base_template("TradeArena Web Terminal - Create Agent", content, additional_css, additional_js)
+    return base_template("TradeArena Web Terminal - Create Agent", content, additional_css, additional_js,
+                         scripts=[SUBMENU_JS_URL])
 
 def create_agent_config_template(provider: str) -> str:
     """Create agent configuration page template"""
@@ -447,8 +444,6 @@ def create_agent_config_template(provider: str) -> str:
     """
     
     additional_js = f"""
-{SUBMENU_JS}
-
 class CreateAgentConfigMenu extends SubMenu {{
     select() {{
         const selectedItem = this.menuItems[this.selectedIndex];
@@ -486,7 +481,8 @@ document.addEventListener('DOMContentLoaded', () => {{
 }});
     """
     
-    return base_template(f"TradeArena Web Terminal - Configure {display_name}", content, additional_css, additional_js)
+    return base_template(f"TradeArena Web Terminal - Configure {display_name}", content, additional_css, additional_js,
+                         scripts=[SUBMENU_JS_URL])
 
 def create_agent_step2_template(ai_provider: str, config_params: dict = None) -> str:
     """Create agent step 2 - select trading chain"""
@@ -578,8 +574,6 @@ def create_agent_step2_template(ai_provider: str, config_params: dict = None) ->
         config_params_str = "&" + urlencode(config_params)
     
     additional_js = f"""
-{SUBMENU_JS}
-
 class CreateAgentStep2Menu extends SubMenu {{
     select() {{
         const selectedItem = this.menuItems[this.selectedIndex];
@@ -603,7 +597,8 @@ document.addEventListener('DOMContentLoaded', () => {{
 }});
     """
     
-    return base_template("TradeArena Web Terminal - Create Agent Step 3", content, additional_css, additional_js)
+    return base_template("TradeArena Web Terminal - Create Agent Step 3", content, additional_css, additional_js,
+                         scripts=[SUBMENU_JS_URL])
 
 def create_agent_confirm_template(ai_provider: str, trading_chain: str, config_params: dict = None) -> str:
     """Create agent confirmation page"""
@@ -721,8 +716,6 @@ def create_agent_confirm_template(ai_provider: str, trading_chain: str, config_p
         config_params_str = "&" + urlencode(config_params)
     
     additional_js = f"""
-{SUBMENU_JS}
-
 class CreateAgentConfirmMenu extends SubMenu {{
     select() {{
         const selectedItem = this.menuItems[this.selectedIndex];
@@ -744,4 +737,5 @@ document.addEventListener('DOMContentLoaded', () => {{
 }});
     """
     
-    return base_template("TradeArena Web Terminal - Create Agent Confirm", content, additional_css, additional_js)
+    return base_template("TradeArena Web Terminal - Create Agent Confirm", content, additional_css, additional_js,
+                         scripts=[SUBMENU_JS_URL])
@@ -2,7 +2,7 @@
 Base templates and shared components for TradeArena Web Terminal
 """
 
-from ..static import BASE_CSS
+from ..assets import BASE_CSS_URL
 
 # ASCII art for TRADE ARENA
 TRADE_ARENA_ASCII = r"""
@@ -19,16 +19,18 @@ TRADE_ARENA_ASCII = r"""
  '----------------'  '----------------'  '----------------'  '----------------'  '----------------'   '----------------'  '----------------'  '----------------'  '----------------'  '----------------' 
 """
 
-def base_template(title: str, content: str, additional_css: str = "", additional_js: str = "") -> str:
-    """Base template wrapper for all pages"""
+def base_template(title: str, content: str, additional_css: str = "", additional_js: str = "",
+                  scripts: list = None) -> str:
+    """Base template wrapper for all pages; scripts are shared asset URLs loaded before additional_js"""
+    script_tags = "".join(f'\n    <script src="{url}"></script>' for url in scripts or [])
     return f"""<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>{title}</title>
+    <link rel="stylesheet" href="{BASE_CSS_URL}">
     <style>
-{BASE_CSS}
 {additional_css}
     </style>
 </head>
@@ -36,7 +38,7 @@ def base_template(title: str, content: str, additional_css: str = "", additional
     <div class="crt"></div>
     <div class="terminal">
         {content}
-    </div>
+    </div>{script_tags}
     <script>
 {additional_js}
     </script>
@@ -2,7 +2,7 @@
 Interactive mode and chat session templates for TradeArena Web Terminal
 """
 
-from ..static import SUBMENU_JS
+from ..assets import SUBMENU_JS_URL
 from .base import base_template
 
 def interactive_mode_template() -> str:
@@ -62,24 +62,29 @@ def interactive_mode_template() -> str:
     """
     
     additional_js = f"""
-{SUBMENU_JS}
-
 class InteractiveMenu extends SubMenu {{
     constructor() {{
         super();
+        this.pageSize = 20;
+        this.nextCursor = null;
         this.loadSessions();
     }}
     
-    async loadSessions() {{
+    async loadSessions(cursor = null) {{
         try {{
-            const response = await fetch('/api/sessions');
+            const params = new URLSearchParams({{limit: this.pageSize}});
+            if (cursor) {{
+                params.set('cursor', cursor);
+            }}
+            const response = await fetch(`/api/sessions?${{params}}`);
             const data = await response.json();
             const sessions = data.sessions || [];
+            this.nextCursor = data.next_cursor || null;
             
             const loadingItem = document.getElementById('loadingSessions');
             const sessionsList = document.getElementById('sessionsList');
             
-            if (sessions.length === 0) {{
+            if (sessions.length === 0 && !cursor) {{
                 loadingItem.innerHTML = '<span class="empty-state" style="color: #888888 !important; font-style: italic !important;">No previous sessions found</span>';
                 loadingItem.classList.remove('loading');
                 loadingItem.classList.add('empty-state');
@@ -89,8 +94,11 @@ class InteractiveMenu extends SubMenu {{
             // Hide loading item
             loadingItem.style.display = 'none';
             
-            // Create session items
-            sessionsList.innerHTML = '';
+            // Append session items after the ones already shown
+            const moreItem = document.getElementById('loadMoreSessions');
+            if (moreItem) {{
+                moreItem.remove();
+            }}
             sessions.forEach(session => {{
                 const sessionDate = new Date(session.updated_at).toLocaleDateString();
                 const sessionTime = new Date(session.updated_at).toLocaleTimeString([], {{hour: '2-digit', minute:'2-digit'}});
@@ -109,10 +117,21 @@ class InteractiveMenu extends SubMenu {{
                 sessionsList.appendChild(sessionItem);
             }});
             
+            if (this.nextCursor) {{
+                const loadMore = document.createElement('div');
+                loadMore.className = 'menu-item';
+                loadMore.id = 'loadMoreSessions';
+                loadMore.setAttribute('data-action', 'more');
+                loadMore.innerHTML = '<span class="session-info">Load more sessions...</span>';
+                sessionsList.appendChild(loadMore);
+            }}
+            
             sessionsList.style.display = 'block';
             
             // Reinitialize menu items
             this.menuItems = document.querySelectorAll('#menuItems .menu-item:not([style*="display: none"])');
+            this.selectedIndex = Math.min(this.selectedIndex, this.menuItems.length - 1);
+            this.updateSelection();
             
         }} catch (error) {{
             console.error('Error loading sessions:', error);
@@ -126,6 +145,13 @@ class InteractiveMenu extends SubMenu {{
         const selectedItem = this.menuItems[this.selectedIndex];
         const action = selectedItem.getAttribute('data-action');
         
+        if (action === 'more') {{
+            if (this.nextCursor) {{
+                this.loadSessions(this.nextCursor);
+            }}
+            return;
+        }}
+        
         if (action.startsWith('session-')) {{
             const sessionId = action.replace('session-', '');
             window.location.href = `/resume-session/${{sessionId}}`;
@@ -148,7 +174,8 @@ document.addEventListener('DOMContentLoaded', () => {{
 }});
     """
     
-    return base_template("TradeArena Web Terminal - Interactive Mode", content, additional_css, additional_js)
+    return base_template("TradeArena Web Terminal - Interactive Mode", content, additional_css, additional_js,
+                         scripts=[SUBMENU_JS_URL])
 
 def select_agent_for_session_template(agents: list = None) -> str:
     """Select agent for session template"""
@@ -212,8 +239,6 @@ def select_agent_for_session_template(agents: list = None) -> str:
             """
     
     additional_js = f"""
-{SUBMENU_JS}
-
 class SelectAgentForSessionMenu extends SubMenu {{
     select() {{
         const selectedItem = this.menuItems[this.selectedIndex];
@@ -236,7 +261,8 @@ document.addEventListener('DOMContentLoaded', () => {{
 }});
     """
     
-    return base_template("TradeArena Web Terminal - Select Agent for Session", content, additional_js=additional_js)
+    return base_template("TradeArena Web Terminal - Select Agent for Session", content, additional_js=additional_js,
+                         scripts=[SUBMENU_JS_URL])
 
 def chat_session_template(agent_id: str, agent_data: dict, session_id: str = None, messages: list = None) -> str:
     """Chat session template for interacting with AI agent"""
@@ -261,12 +287,19 @@ def chat_session_template(agent_id: str, agent_data: dict, session_id: str = Non
             msg_class = msg.get('role', 'user')
             
             preloaded_messages_html += f"""
-                <div class="message {msg_class}">
+                <div class="message {msg_class}" data-message-id="{msg.get('message_id', '')}">
                     <span class="message-time">{time_str}:</span>
                     <span class="message-content">{content}</span>
                 </div>
             """
     
+    # Older messages are fetched on demand when the replay window does not start at the first one
+    load_earlier_html = ""
+    if session_id and messages and (messages[0].get('message_id') or 0) > 0:
+        load_earlier_html = """
+                <div class="load-earlier" id="loadEarlier" onclick="loadEarlierMessages()">[ Load earlier messages ]</div>
+        """
+    
     # Generate session_id JavaScript for URL building
     session_id_js = ""
     if session_id:
@@ -326,6 +359,18 @@ def chat_session_template(agent_id: str, agent_data: dict, session_id: str = Non
     color: #ff0000;
 }
 
+.load-earlier {
+    color: #00cc00;
+    text-align: center;
+    font-size: 12px;
+    cursor: pointer;
+    padding: 5px 0;
+}
+
+.load-earlier:hover {
+    color: #ffffff;
+}
+
 .message-time {
     color: #888888;
     font-size: 11px;
@@ -416,6 +461,7 @@ def chat_session_template(agent_id: str, agent_data: dict, session_id: str = Non
             </div>
             
             <div class="chat-messages" id="chatMessages">
+                {load_earlier_html}
                 {preloaded_messages_html}
                 <div class="message assistant">
                     <span class="message-time">System:</span>
@@ -494,6 +540,46 @@ function addPreloadedMessage(type, content, time = null) {{
     return messageDiv;
 }}
 
+async function loadEarlierMessages() {{
+    const loadEarlier = document.getElementById('loadEarlier');
+    const firstMessage = document.querySelector('#chatMessages .message[data-message-id]');
+    if (!loadEarlier || !firstMessage || !currentSessionId) return;
+    
+    loadEarlier.textContent = 'Loading...';
+    try {{
+        const before = firstMessage.getAttribute('data-message-id');
+        const response = await fetch(`/api/sessions/${{currentSessionId}}/messages?limit=50&before=${{before}}`);
+        const data = await response.json();
+        const messages = data.messages || [];
+        
+        // Keep the viewport on the message that was at the top
+        const chatMessages = document.getElementById('chatMessages');
+        const previousHeight = chatMessages.scrollHeight;
+        
+        messages.forEach(msg => {{
+            const messageDiv = document.createElement('div');
+            messageDiv.className = `message ${{msg.role}}`;
+            messageDiv.setAttribute('data-message-id', msg.message_id);
+            const timeStr = msg.created_at ? new Date(msg.created_at).toLocaleTimeString([], {{hour: '2-digit', minute:'2-digit', hour12: false}}) : '';
+            messageDiv.innerHTML = `
+                <span class="message-time">${{timeStr}}:</span>
+                <span class="message-content">${{(msg.content || '').replace(/\\n/g, '<br>')}}</span>
+            `;
+            chatMessages.insertBefore(messageDiv, firstMessage);
+        }});
+        chatMessages.scrollTop += chatMessages.scrollHeight - previousHeight;
+        
+        if (messages.length === 0 || messages[0].message_id === 0) {{
+            loadEarlier.remove();
+        }} else {{
+            loadEarlier.textContent = '[ Load earlier messages ]';
+        }}
+    }} catch (error) {{
+        console.error('Error loading earlier messages:', error);
+        loadEarlier.textContent = '[ Failed to load - click to retry ]';
+    }}
+}}
+
 function updateStreamingMessage(content) {{
     if (currentMessageElement) {{
         currentMessageElement.querySelector('.message-content').textContent = content;
@@ -2,7 +2,7 @@
 Main menu templates for TradeArena Web Terminal
 """
 
-from ..static import MENU_JS
+from ..assets import MENU_JS_URL
 from .base import base_template, TRADE_ARENA_ASCII
 
 def main_page_template(agents: list = None) -> str:
@@ -51,4 +51,4 @@ def main_page_template(agents: list = None) -> str:
         </div>
     """
     
-    return base_template("TradeArena Terminal", content, additional_js=MENU_JS)
+    return base_template("TradeArena Terminal", content, scripts=[MENU_JS_URL])
@@ -2,11 +2,11 @@
 Settings page templates for TradeArena Web Terminal
 """
 
-from ..static import SUBMENU_JS
+from ..assets import SUBMENU_JS_URL
 from .base import base_template
 
 def settings_template(config: dict = None) -> str:
-    """Settings page template with Walrus and Web Search configuration"""
+    """Settings page template with Walrus, Web Search and Prompt Caching configuration"""
     if config is None:
         config = {
             "walrus": {
@@ -14,11 +14,15 @@ def settings_template(config: dict = None) -> str:
             },
             "web_search": {
                 "enabled": False
+            },
+            "prompt_caching": {
+                "enabled": False
             }
         }
     
     walrus_config = config.get("walrus", {})
     web_search_config = config.get("web_search", {})
+    prompt_caching_config = config.get("prompt_caching", {})
     
     additional_css = """
 .settings-container {
@@ -200,6 +204,27 @@ def settings_template(config: dict = None) -> str:
                 </div>
             </div>
             
+            <!-- Prompt Caching Section -->
+            <div class="settings-section">
+                <div class="section-header">Prompt Caching Configuration</div>
+                
+                <div class="section-description">
+                    Enable <span class="highlight-text">prompt caching</span> so Anthropic and Amazon Bedrock models
+                    reuse the system prompt and tool definitions between turns, cutting input latency and cost.
+                </div>
+                
+                <div class="setting-buttons">
+                    <button id="promptcaching_enable" class="setting-button {'active' if prompt_caching_config.get('enabled') else 'inactive'}" 
+                            data-action="enable" data-setting="prompt_caching">
+                        ENABLE
+                    </button>
+                    <button id="promptcaching_disable" class="setting-button {'active' if not prompt_caching_config.get('enabled') else 'inactive'}" 
+                            data-action="disable" data-setting="prompt_caching">
+                        DISABLED
+                    </button>
+                </div>
+            </div>
+            
             <!-- Navigation Menu -->
             <div class="menu">
                 <div class="menu-header">Settings Options</div>
@@ -217,14 +242,13 @@ def settings_template(config: dict = None) -> str:
     """
     
     additional_js = f"""
-{SUBMENU_JS}
-
 class SettingsMenu extends SubMenu {{
     constructor() {{
         super();
         this.setupEventListeners();
         this.walrusEnabled = {walrus_config.get('enabled', False)};
         this.webSearchEnabled = {web_search_config.get('enabled', False)};
+        this.promptCachingEnabled = {'true' if prompt_caching_config.get('enabled') else 'false'};
     }}
     
     setupEventListeners() {{
@@ -252,10 +276,23 @@ class SettingsMenu extends SubMenu {{
             this.setWebSearchEnabled(false);
         }});
         
+        // Prompt Caching buttons
+        const promptCachingEnableButton = document.getElementById('promptcaching_enable');
+        const promptCachingDisableButton = document.getElementById('promptcaching_disable');
+        
+        promptCachingEnableButton.addEventListener('click', () => {{
+            this.setPromptCachingEnabled(true);
+        }});
+        
+        promptCachingDisableButton.addEventListener('click', () => {{
+            this.setPromptCachingEnabled(false);
+        }});
+        
         // Allow Space/Enter keys when buttons are focused
         [
             walrusEnableButton, walrusDisableButton, 
-            webSearchEnableButton, webSearchDisableButton
+            webSearchEnableButton, webSearchDisableButton,
+            promptCachingEnableButton, promptCachingDisableButton
         ].forEach(button => {{
             button.addEventListener('keydown', (e) => {{
                 if (e.code === 'Space' || e.code === 'Enter') {{
@@ -276,6 +313,11 @@ class SettingsMenu extends SubMenu {{
         this.updateWebSearchButtons();
     }}
     
+    setPromptCachingEnabled(enabled) {{
+        this.promptCachingEnabled = enabled;
+        this.updatePromptCachingButtons();
+    }}
+    
     updateWalrusButtons() {{
         const enableButton = document.getElementById('walrus_enable');
         const disableButton = document.getElementById('walrus_disable');
@@ -302,6 +344,19 @@ class SettingsMenu extends SubMenu {{
         }}
     }}
     
+    updatePromptCachingButtons() {{
+        const enableButton = document.getElementById('promptcaching_enable');
+        const disableButton = document.getElementById('promptcaching_disable');
+        
+        if (this.promptCachingEnabled) {{
+            enableButton.className = 'setting-button active';
+            disableButton.className = 'setting-button inactive';
+        }} else {{
+            enableButton.className = 'setting-button inactive';
+            disableButton.className = 'setting-button active';
+        }}
+    }}
+    
     select() {{
         const selectedItem = this.menuItems[this.selectedIndex];
         const action = selectedItem.getAttribute('data-action');
@@ -327,6 +382,9 @@ class SettingsMenu extends SubMenu {{
             }},
             web_search: {{
                 enabled: this.webSearchEnabled
+            }},
+            prompt_caching: {{
+                enabled: this.promptCachingEnabled
             }}
         }};
         
@@ -356,6 +414,10 @@ class SettingsMenu extends SubMenu {{
                     message += '• Web search is disabled. Your agent will use only provided data sources.\\\\n';
                 }}
                 
+                if (settings.prompt_caching.enabled) {{
+                    message += '• Prompt caching is now enabled for supported models.\\\\n';
+                }}
+                
                 alert(message);
             }} else {{
                 alert('Failed to save settings: ' + (result.error || 'Unknown error'));
@@ -376,6 +438,7 @@ class SettingsMenu extends SubMenu {{
                     const defaults = result.settings;
                     this.setWalrusEnabled(defaults.walrus.enabled);
                     this.setWebSearchEnabled(defaults.web_search.enabled);
+                    this.setPromptCachingEnabled((defaults.prompt_caching || {{}}).enabled || false);
                     
                     alert('Settings reset to defaults. Click "Save Settings" to apply.');
                 }} else {{
@@ -393,4 +456,5 @@ document.addEventListener('DOMContentLoaded', () => {{
 }});
     """
     
-    return base_template("TradeArena Web Terminal - Settings", content, additional_css, additional_js)
+    return base_template("TradeArena Web Terminal - Settings", content, additional_css, additional_js,
+                         scripts=[SUBMENU_JS_URL])
@@ -2,7 +2,7 @@
 Views management templates for TradeArena Web Terminal
 """
 
-from ..static import SUBMENU_JS
+from ..assets import SUBMENU_JS_URL
 from .base import base_template
 
 def views_page_template() -> str:
@@ -28,27 +28,42 @@ def views_page_template() -> str:
     """
     
     additional_js = f"""
-{SUBMENU_JS}
-
 class ViewsMenu extends SubMenu {{
     constructor() {{
         super();
+        this.pageSize = 20;
+        this.nextCursor = null;
+        this.viewCount = 0;
         this.loadViews();
     }}
     
-    async loadViews() {{
+    async loadViews(cursor = null) {{
         try {{
-            const response = await fetch('/api/views');
+            const params = new URLSearchParams({{limit: this.pageSize}});
+            if (cursor) {{
+                params.set('cursor', cursor);
+            }}
+            const response = await fetch(`/api/views?${{params}}`);
             const data = await response.json();
+            const views = data.views || [];
+            this.nextCursor = data.next_cursor || null;
             const menuItems = document.getElementById('menuItems');
             
-            // Clear existing items except the back button
+            // A first page replaces the list; later pages are appended before the back button
             const backButton = menuItems.querySelector('[data-action="back"]');
-            menuItems.innerHTML = '';
+            if (!cursor) {{
+                menuItems.innerHTML = '';
+                this.viewCount = 0;
+            }}
+            const moreItem = menuItems.querySelector('[data-action="more"]');
+            if (moreItem) {{
+                moreItem.remove();
+            }}
             
-            if (data.views && data.views.length > 0) {{
+            if (views.length > 0) {{
                 // Add views to menu
-                data.views.forEach((view, index) => {{
+                views.forEach(view => {{
+                    const index = this.viewCount++;
                     const createdDate = new Date(view.created_at).toLocaleDateString();
                     const menuItem = document.createElement('div');
                     menuItem.className = 'menu-item';
@@ -65,9 +80,9 @@ class ViewsMenu extends SubMenu {{
                             <button class="view-button delete-btn" onclick="viewsMenu.deleteView('${{view.filename}}', '${{view.title}}')">Delete</button>
                         </div>
                     `;
-                    menuItems.appendChild(menuItem);
+                    menuItems.insertBefore(menuItem, cursor ? backButton : null);
                 }});
-            }} else {{
+            }} else if (!cursor) {{
                 const noViewsItem = document.createElement('div');
                 noViewsItem.className = 'menu-item';
                 noViewsItem.setAttribute('data-action', 'no-views');
@@ -75,12 +90,20 @@ class ViewsMenu extends SubMenu {{
                 menuItems.appendChild(noViewsItem);
             }}
             
+            if (this.nextCursor) {{
+                const loadMore = document.createElement('div');
+                loadMore.className = 'menu-item';
+                loadMore.setAttribute('data-action', 'more');
+                loadMore.textContent = 'Load more views...';
+                menuItems.insertBefore(loadMore, cursor ? backButton : null);
+            }}
+            
             // Add back button
             menuItems.appendChild(backButton);
             
             // Reinitialize menu items
             this.menuItems = menuItems.querySelectorAll('.menu-item');
-            this.selectedIndex = 0;
+            this.selectedIndex = cursor ? Math.min(this.selectedIndex, this.menuItems.length - 1) : 0;
             this.updateSelection();
             
         }} catch (error) {{
@@ -127,6 +150,11 @@ class ViewsMenu extends SubMenu {{
         // View actions are handled by button clicks
         if (!action.startsWith('view-')) {{
             switch(action) {{
+                case 'more':
+                    if (this.nextCursor) {{
+                        this.loadViews(this.nextCursor);
+                    }}
+                    break;
                 case 'no-views':
                     // Do nothing - just a placeholder
                     break;
@@ -215,4 +243,4 @@ document.addEventListener('DOMContentLoaded', () => {{
     """
     
     return base_template("TradeArena Web Terminal - Manage Views", content, 
-                        additional_js=additional_js, additional_css=additional_css)
+                        additional_js=additional_js, additional_css=additional_css, scripts=[SUBMENU_JS_URL])
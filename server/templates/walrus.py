@@ -2,7 +2,7 @@
 Walrus settings templates for TradeArena Web Terminal
 """
 
-from ..static import SUBMENU_JS
+from ..assets import SUBMENU_JS_URL
 from .base import base_template
 
 def walrus_settings_template(config: dict = None) -> str:
@@ -115,8 +115,6 @@ def walrus_settings_template(config: dict = None) -> str:
     """
     
     additional_js = f"""
-{SUBMENU_JS}
-
 class WalrusSettingsMenu extends SubMenu {{
     select() {{
         const selectedItem = this.menuItems[this.selectedIndex];
@@ -209,4 +207,5 @@ document.addEventListener('DOMContentLoaded', () => {{
 }});
     """
     
-    return base_template("TradeArena Web Terminal - Walrus Settings", content, additional_css, additional_js)
+    return base_template("TradeArena Web Terminal - Walrus Settings", content, additional_css, additional_js,
+                         scripts=[SUBMENU_JS_URL])
@@ -0,0 +1,120 @@
+"""
+Tool schema cache for TradeArena
+Persists MCP tool listings on disk so agents can be built without a list_tools round trip
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from mcp.types import Tool as MCPTool
+from strands.tools.mcp import MCPClient
+from strands.tools.mcp.mcp_agent_tool import MCPAgentTool
+
+logger = logging.getLogger(__name__)
+
+class ToolSchemaCache:
+    """On-disk cache of MCP tool schemas keyed by server config and dist bundle"""
+
+    def __init__(self, cache_dir: str = None):
+        if cache_dir is None:
+            cache_dir = os.path.join(os.getcwd(), ".cache", "mcp_tools")
+        self.cache_dir = cache_dir
+        self._memory: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def cache_key(self, mcp_name: str, server_config: Dict[str, Any]) -> str:
+        """Key = raw config entry + mtime/size of every bundle file the server runs"""
+        bundles = []
+        for arg in server_config.get("args", []):
+            path = arg if os.path.isabs(arg) else os.path.join(os.getcwd(), arg)
+            if os.path.isfile(path):
+                stat = os.stat(path)
+                bundles.append([arg, stat.st_mtime_ns, stat.st_size])
+        payload = json.dumps([mcp_name, server_config, bundles], sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get_schemas(self, mcp_name: str, server_config: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        """Get cached raw tool schemas, or None when missing or out of date"""
+        key = self.cache_key(mcp_name, server_config)
+
+        with self._lock:
+            entry = self._memory.get(mcp_name)
+        if entry is None:
+            entry = self._read(mcp_name)
+            if entry is not None:
+                with self._lock:
+                    self._memory[mcp_name] = entry
+
+        if entry is None or entry.get("key") != key:
+            return None
+        return entry.get("tools")
+
+    def get_tools(self, mcp_name: str, server_config: Dict[str, Any], client: MCPClient) -> Optional[List[MCPAgentTool]]:
+        """Get ready-to-register tools bound to client, or None on a cache miss"""
+        schemas = self.get_schemas(mcp_name, server_config)
+        if schemas is None:
+            return None
+        try:
+            tools = [MCPAgentTool(MCPTool.model_validate(schema), client) for schema in schemas]
+            logger.info(f"Loaded {len(tools)} cached tool schemas for {mcp_name}")
+            return tools
+        except Exception as e:
+            logger.warning(f"Discarding unreadable tool schema cache for {mcp_name}: {e}")
+            self.invalidate(mcp_name)
+            return None
+
+    def store(self, mcp_name: str, server_config: Dict[str, Any], tools: List[MCPAgentTool]) -> None:
+        """Store the schemas of freshly listed tools"""
+        entry = {
+            "key": self.cache_key(mcp_name, server_config),
+            "created_at": datetime.now().isoformat(),
+            "tools": [tool.mcp_tool.model_dump(mode="json", exclude_none=True) for tool in tools]
+        }
+        with self._lock:
+            self._memory[mcp_name] = entry
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=f".{mcp_name}.", suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, self._path(mcp_name))
+            logger.info(f"Cached {len(tools)} tool schemas for {mcp_name}")
+        except Exception as e:
+            logger.error(f"Failed to write tool schema cache for {mcp_name}: {e}")
+
+    def invalidate(self, mcp_name: str = None) -> None:
+        """Forget cached schemas for one server or for all servers"""
+        with self._lock:
+            names = [mcp_name] if mcp_name else list(self._memory.keys())
+            for name in names:
+                self._memory.pop(name, None)
+        if mcp_name is None and os.path.isdir(self.cache_dir):
+            names = [f[:-5] for f in os.listdir(self.cache_dir) if f.endswith(".json")]
+        for name in names:
+            try:
+                os.remove(self._path(name))
+            except OSError:
+                pass
+
+    def _path(self, mcp_name: str) -> str:
+        return os.path.join(self.cache_dir, f"{mcp_name}.json")
+
+    def _read(self, mcp_name: str) -> Optional[Dict[str, Any]]:
+        path = self._path(mcp_name)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"Failed to read tool schema cache {path}: {e}")
+            return None
+
+# Global tool schema cache instance
+tool_schema_cache = ToolSchemaCache()
@@ -4,7 +4,7 @@ Custom views generation tools for TradeArena agents
 
 import asyncio
 from datetime import datetime
-from strands import tool
+from strands import tool, ToolContext
 
 # Import views manager - we'll handle import error gracefully
 try:
@@ -12,6 +12,9 @@ try:
 except ImportError:
     views_manager = None
 
+# Most recent views listed by list_available_views
+LIST_VIEWS_LIMIT = 50
+
 @tool(
     name="create_custom_view",
     description="Create and save a custom HTML dashboard/view",
@@ -34,9 +37,11 @@ except ImportError:
             },
             "required": ["title", "html_content"]
         }
-    }
+    },
+    context=True
 )
-async def create_custom_view(title: str, html_content: str, description: str = "") -> str:
+async def create_custom_view(title: str, html_content: str, description: str = "",
+                             tool_context: ToolContext = None) -> str:
     """Create and save a custom HTML view.
     
     This tool allows agents to generate and save custom HTML dashboards or views.
@@ -46,6 +51,7 @@ async def create_custom_view(title: str, html_content: str, description: str = "
         title: The title for the view
         html_content: HTML content (can include inline CSS and JavaScript)
         description: Optional description of the view purpose
+        tool_context: Injected by Strands; identifies the calling agent
     
     Returns:
         Success message with direct URL to access the view
@@ -57,11 +63,16 @@ async def create_custom_view(title: str, html_content: str, description: str = "
         return "❌ Error: Views manager not available. Please check server configuration."
     
     try:
-        # Create the view (without agent attribution)
+        # Attribute the view to the calling agent, so views can be listed per agent
+        agent_config = {}
+        if tool_context is not None:
+            agent_config = tool_context.agent.state.get("agent_config") or {}
         view_url = views_manager.create_view(
             title=title,
             html_content=html_content,
-            description=description
+            description=description,
+            agent_id=agent_config.get("id"),
+            agent_name=agent_config.get("name")
         )
         
         # Return success message with clickable link
@@ -78,7 +89,7 @@ Click the link above to view your custom dashboard. The view will also appear in
 
 @tool(
     name="list_available_views",
-    description="List all available custom views with their metadata",
+    description="List the most recent custom views with their metadata",
     inputSchema={
         "json": {
             "type": "object",
@@ -90,11 +101,11 @@ Click the link above to view your custom dashboard. The view will also appear in
 async def list_available_views() -> str:
     """List all available custom views.
     
-    Returns a list of all saved custom views with their metadata including
+    Returns the most recent saved custom views with their metadata including
     creator agent, creation time, and access URLs.
     
     Returns:
-        Formatted list of all available views
+        Formatted list of the latest views
     """
     # Simulate async processing
     await asyncio.sleep(0.1)
@@ -103,7 +114,8 @@ async def list_available_views() -> str:
         return "❌ Error: Views manager not available. Please check server configuration."
     
     try:
-        all_views = views_manager.get_all_views()
+        page = views_manager.list_views(limit=LIST_VIEWS_LIMIT)
+        all_views = page["views"]
         
         if not all_views:
             return "📋 No custom views available yet. Use the create_custom_view tool to create one!"
@@ -115,13 +127,17 @@ async def list_available_views() -> str:
             view_url = f"http://127.0.0.1:8000/views/{view['filename']}"
             
             result_lines.append(f"{i}. **{view['title']}**")
-            result_lines.append(f"   👤 Created by: {view['agent_name']}")
+            if view.get('agent_name'):
+                result_lines.append(f"   👤 Created by: {view['agent_name']}")
             result_lines.append(f"   🕒 Created: {created_time}")
             result_lines.append(f"   🔗 URL: {view_url}")
             if view.get('description'):
                 result_lines.append(f"   📝 Description: {view['description']}")
             result_lines.append("")
         
+        if page["next_cursor"]:
+            result_lines.append(f"Showing the {LIST_VIEWS_LIMIT} most recent views.")
+        
         return "\n".join(result_lines)
         
     except Exception as e:
@@ -0,0 +1,168 @@
+"""
+View cache for TradeArena custom views
+Serves views with ETag/Last-Modified and precompressed variants, keeping hot small views in memory
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import FileResponse, Response
+
+from .assets import accepted_encodings
+from .render_cache import PAGE_CACHE_CONTROL, http_date, not_modified
+from .views_manager import ViewsManager, views_manager
+
+logger = logging.getLogger(__name__)
+
+# Number of views whose metadata (and, if small, bytes) are kept in memory
+VIEW_CACHE_SIZE = int(os.getenv("TRADEARENA_VIEW_CACHE_SIZE", "64"))
+
+# Views up to this size are held in memory; larger ones are sent from disk
+VIEW_CACHE_MAX_BYTES = int(os.getenv("TRADEARENA_VIEW_CACHE_MAX_BYTES", str(256 * 1024)))
+
+VIEW_MEDIA_TYPE = "text/html; charset=utf-8"
+
+class CachedView:
+    """One view: its validators, its variants on disk and/or in memory, and their sizes"""
+
+    def __init__(self, signature: tuple, etag: str, last_modified: Optional[float]):
+        self.signature = signature
+        self.etag = etag
+        self.last_modified = last_modified
+        self.files: Dict[Optional[str], Tuple[Path, os.stat_result]] = {}
+        self.bodies: Dict[Optional[str], bytes] = {}
+        self.sizes: Dict[Optional[str], int] = {}
+
+    @classmethod
+    def from_file(cls, path: Path, stat: os.stat_result, variants: Dict[str, Path],
+                  keep_bodies: bool) -> "CachedView":
+        """A view page on disk (full HTML file or rendered page), with its precompressed variants next to it"""
+        cached = cls(("file", stat.st_mtime_ns, stat.st_size), f'W/"{stat.st_mtime_ns:x}-{stat.st_size:x}"',
+                     stat.st_mtime)
+        cached.files[None] = (path, stat)
+        for coding, variant_path in variants.items():
+            try:
+                cached.files[coding] = (variant_path, variant_path.stat())
+            except OSError:
+                pass
+        cached.sizes = {coding: file_stat.st_size for coding, (_, file_stat) in cached.files.items()}
+        if keep_bodies:
+            for coding, (file_path, _) in cached.files.items():
+                cached.bodies[coding] = file_path.read_bytes()
+        return cached
+
+    def size(self) -> int:
+        return self.sizes.get(None, 0)
+
+    def select(self, request: Request) -> Optional[str]:
+        """Content coding of the smallest variant the client accepts (None for identity)"""
+        accepted = accepted_encodings(request)
+        best_coding, best_size = None, self.sizes[None]
+        for coding, size in self.sizes.items():
+            if coding and accepted.get(coding, accepted.get("*", 0)) > 0 and size < best_size:
+                best_coding, best_size = coding, size
+        return best_coding
+
+class ViewCache:
+    """
+    LRU of served views, revalidated on every request
+
+    Content-addressed views are served from the page rendered when they were
+    created (pages/<filename>), legacy views from their full HTML file; either
+    is revalidated against the file's mtime and size, off the event loop. Small
+    views are sent from memory, larger ones with FileResponse, each from the
+    precompressed variant the client accepts.
+    """
+
+    def __init__(self, views: ViewsManager, max_size: int = VIEW_CACHE_SIZE,
+                 max_view_bytes: int = VIEW_CACHE_MAX_BYTES):
+        self.views = views
+        self.max_size = max_size
+        self.max_view_bytes = max_view_bytes
+        self._views: "OrderedDict[str, CachedView]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, filename: str) -> Optional[CachedView]:
+        """The current view for filename, or None if it does not exist (blocking; call from a thread)"""
+        view = self.views.get_view(filename)
+        if view and view.get("content_hash"):
+            return self._lookup_file(filename, self.views.get_page_path(view))
+        return self._lookup_file(filename, self.views.get_view_path(filename))
+
+    def _lookup_file(self, filename: str, path: Optional[Path]) -> Optional[CachedView]:
+        try:
+            stat = path.stat() if path is not None else None
+        except OSError:
+            stat = None
+        if stat is None:
+            self._drop(filename)
+            return None
+
+        cached = self._get(filename, ("file", stat.st_mtime_ns, stat.st_size))
+        if cached is not None:
+            return cached
+        variants = self.views.get_variants(path)
+        try:
+            cached = CachedView.from_file(path, stat, variants, keep_bodies=stat.st_size <= self.max_view_bytes)
+        except OSError:
+            return None
+        self._put(filename, cached)
+        return cached
+
+    def _get(self, filename: str, signature: tuple) -> Optional[CachedView]:
+        with self._lock:
+            cached = self._views.get(filename)
+            if cached is not None and cached.signature == signature:
+                self._views.move_to_end(filename)
+                self.hits += 1
+                return cached
+            self.misses += 1
+            return None
+
+    def _put(self, filename: str, cached: CachedView) -> None:
+        with self._lock:
+            self._views[filename] = cached
+            self._views.move_to_end(filename)
+            while len(self._views) > self.max_size:
+                self._views.popitem(last=False)
+
+    def _drop(self, filename: str) -> None:
+        with self._lock:
+            self._views.pop(filename, None)
+
+    async def response(self, request: Request, filename: str) -> Response:
+        """Serve a view, or 304 Not Modified when the client already has it"""
+        view = await asyncio.to_thread(self.lookup, filename)
+        if view is None:
+            return Response("View not found", status_code=404, media_type="text/html")
+
+        headers = {"ETag": view.etag, "Cache-Control": PAGE_CACHE_CONTROL, "Vary": "Accept-Encoding"}
+        if view.last_modified is not None:
+            headers["Last-Modified"] = http_date(view.last_modified)
+        if not_modified(request, view.etag, view.last_modified):
+            return Response(status_code=304, headers=headers)
+
+        coding = view.select(request)
+        if coding:
+            headers["Content-Encoding"] = coding
+        body = view.bodies.get(coding)
+        if body is not None:
+            return Response(body, media_type=VIEW_MEDIA_TYPE, headers=headers)
+        file_path, stat = view.files[coding]
+        return FileResponse(file_path, media_type=VIEW_MEDIA_TYPE, headers=headers, stat_result=stat)
+
+    def clear(self) -> None:
+        """Drop every cached view"""
+        with self._lock:
+            self._views.clear()
+
+# Global view cache instance
+view_cache = ViewCache(views_manager)
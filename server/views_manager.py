@@ -1,80 +1,79 @@
 """
 Views Manager for TradeArena
-Handles file-based storage and retrieval of custom HTML views
+Handles file-based storage and retrieval of custom HTML views, indexed in SQLite
 """
 
 import os
+import base64
+import gzip
+import hashlib
+import html
 import json
+import logging
 import re
+import sqlite3
+import tempfile
+import threading
+import time
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from pathlib import Path
 
-class ViewsManager:
-    """Manages custom HTML views with flat file structure"""
-    
-    def __init__(self, views_dir: str = "views"):
-        self.views_dir = Path(views_dir)
-        self.views_dir.mkdir(exist_ok=True)
-        self.index_file = self.views_dir / "index.json"
-        
-    def _sanitize_filename(self, title: str) -> str:
-        """Sanitize title for safe filename"""
-        # Remove special characters, replace spaces with underscores
-        sanitized = re.sub(r'[^\w\s-]', '', title)
-        sanitized = re.sub(r'[-\s]+', '_', sanitized)
-        return sanitized.strip('_')
-    
-    def _get_timestamp(self) -> str:
-        """Get current timestamp for filename"""
-        return datetime.now().strftime("%Y%m%d_%H%M%S")
-    
-    def _load_index(self) -> Dict[str, Any]:
-        """Load views index from JSON file"""
-        if not self.index_file.exists():
-            return {"views": []}
-        
-        try:
-            with open(self.index_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
-            return {"views": []}
-    
-    def _save_index(self, index_data: Dict[str, Any]) -> None:
-        """Save views index to JSON file"""
-        try:
-            with open(self.index_file, 'w', encoding='utf-8') as f:
-                json.dump(index_data, f, indent=2, ensure_ascii=False)
-        except IOError as e:
-            raise Exception(f"Failed to save views index: {e}")
-    
-    def create_view(self, title: str, html_content: str, description: str = "") -> str:
-        """
-        Create a new HTML view
-        
-        Args:
-            title: View title
-            html_content: HTML content for view
-            description: Optional description
-        
-        Returns:
-            URL path to access the view
-        """
-        # Generate filename
-        sanitized_title = self._sanitize_filename(title)
-        timestamp = self._get_timestamp()
-        filename = f"{sanitized_title}_{timestamp}.html"
-        filepath = self.views_dir / filename
-        
-        # Create HTML content with metadata header
-        html_with_metadata = f"""<!DOCTYPE html>
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+# Precompressed copies written next to each view: <view>.html.gz and <view>.html.br
+PRECOMPRESSED_SUFFIXES = {"gzip": ".gz", "br": ".br"}
+
+# View bodies, stored once per distinct content as objects/<sha256>.html
+OBJECTS_DIR = "objects"
+
+# Content-addressed views rendered into VIEW_TEMPLATE (plus precompressed copies), as pages/<filename>
+PAGES_DIR = "pages"
+
+# Columns stored per view, in table order; content_hash is NULL for views saved as full HTML files
+VIEW_COLUMNS = [
+    "filename",
+    "title",
+    "description",
+    "agent_id",
+    "agent_name",
+    "created_at",
+    "content_hash"
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS views (
+    filename TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    description TEXT,
+    agent_id TEXT,
+    agent_name TEXT,
+    created_at TEXT NOT NULL,
+    content_hash TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_views_created ON views (created_at DESC, filename DESC);
+CREATE INDEX IF NOT EXISTS idx_views_agent ON views (agent_id, created_at DESC, filename DESC);
+CREATE TABLE IF NOT EXISTS views_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Page wrapped around every stored view body when it is served
+VIEW_TEMPLATE = """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>{title}</title>
     <meta name="generator" content="TradeArena Custom View">
-    <meta name="created-at" content="{datetime.now().isoformat()}">
+    <meta name="created-at" content="{created_at}">
     <meta name="description" content="{description}">
     <style>
         body {{
@@ -113,44 +112,234 @@ class ViewsManager:
     <div class="header">
         <div class="title">{title}</div>
         <div class="meta">
-            Created on {datetime.now().strftime("%Y-%m-%d %H:%M")}
+            Created on {created_on}
         </div>
     </div>
     <div class="content">
-        {html_content}
+        {content}
     </div>
 </body>
 </html>"""
+
+def compress_variants(body: bytes) -> Dict[str, bytes]:
+    """gzip (and, when available, brotli) encodings of a view page, by content coding"""
+    variants = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+    if BROTLI_AVAILABLE:
+        variants["br"] = brotli.compress(body, quality=11, mode=brotli.MODE_TEXT)
+    return variants
+
+def _like_pattern(term: str) -> str:
+    """LIKE pattern matching term anywhere, with wildcards in the term escaped"""
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+class ViewsManager:
+    """Manages custom HTML views: flat files on disk, metadata in views/views.db"""
+    
+    def __init__(self, views_dir: str = "views"):
+        self.views_dir = Path(views_dir)
+        self.views_dir.mkdir(exist_ok=True)
+        # Legacy JSON index, imported into the database once
+        self.index_file = self.views_dir / "index.json"
+        self.db_path = self.views_dir / "views.db"
+        self.objects_dir = self.views_dir / OBJECTS_DIR
+        self.objects_dir.mkdir(exist_ok=True)
+        self.pages_dir = self.views_dir / PAGES_DIR
+        self.pages_dir.mkdir(exist_ok=True)
         
-        # Save HTML file
-        try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(html_with_metadata)
-        except IOError as e:
-            raise Exception(f"Failed to save view file: {e}")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+            # Indexes created before view bodies were content-addressed
+            columns = [row[1] for row in self._conn.execute("PRAGMA table_info(views)").fetchall()]
+            if "content_hash" not in columns:
+                self._conn.execute("ALTER TABLE views ADD COLUMN content_hash TEXT")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_views_content ON views (content_hash)")
+        self._migrate_index()
         
-        # Update index
-        index_data = self._load_index()
-        view_entry = {
-            "filename": filename,
+    def _sanitize_filename(self, title: str) -> str:
+        """Sanitize title for safe filename"""
+        # Remove special characters, replace spaces with underscores
+        sanitized = re.sub(r'[^\w\s-]', '', title)
+        sanitized = re.sub(r'[-\s]+', '_', sanitized)
+        return sanitized.strip('_')
+    
+    def _get_timestamp(self) -> str:
+        """Get current timestamp for filename"""
+        return datetime.now().strftime("%Y%m%d_%H%M%S")
+    
+    def _migrate_index(self) -> None:
+        """Import views/index.json into the database the first time it is opened"""
+        with self._lock, self._conn:
+            if self._conn.execute("SELECT 1 FROM views_meta WHERE key = 'index_migrated'").fetchone():
+                return
+            views = []
+            if self.index_file.exists():
+                try:
+                    with open(self.index_file, 'r', encoding='utf-8') as f:
+                        views = json.load(f).get("views", [])
+                except (json.JSONDecodeError, IOError, AttributeError) as e:
+                    logger.warning(f"Could not read legacy views index, skipping it: {e}")
+            for view in views:
+                if not isinstance(view, dict) or not view.get("filename"):
+                    continue
+                self._conn.execute(
+                    f"INSERT OR IGNORE INTO views ({', '.join(VIEW_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?, NULL)",
+                    (view["filename"], view.get("title") or view["filename"], view.get("description") or "",
+                     view.get("agent_id"), view.get("agent_name"), view.get("created_at") or "")
+                )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO views_meta (key, value) VALUES ('index_migrated', ?)",
+                (datetime.now().isoformat(),)
+            )
+            self._touch()
+        if views:
+            logger.info(f"Imported {len(views)} views from {self.index_file}")
+    
+    def _touch(self) -> None:
+        """Record that the set of views changed (caller holds the lock and transaction)"""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO views_meta (key, value) VALUES ('modified_at', ?)", (repr(time.time()),)
+        )
+    
+    def _insert_view(self, base_name: str, entry: Dict[str, Any]) -> str:
+        """Atomically claim a free filename for a view and insert its row; returns the filename"""
+        with self._lock, self._conn:
+            for attempt in range(1, 1000):
+                filename = f"{base_name}.html" if attempt == 1 else f"{base_name}_{attempt}.html"
+                if (self.views_dir / filename).exists():
+                    continue
+                cursor = self._conn.execute(
+                    f"INSERT OR IGNORE INTO views ({', '.join(VIEW_COLUMNS)}) VALUES ({', '.join('?' for _ in VIEW_COLUMNS)})",
+                    [filename] + [entry.get(column) for column in VIEW_COLUMNS[1:]]
+                )
+                if cursor.rowcount:
+                    self._touch()
+                    return filename
+        raise Exception(f"No free filename for view {base_name}")
+    
+    def _delete_row(self, filename: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM views WHERE filename = ?", (filename,))
+            self._touch()
+    
+    def create_view(self, title: str, html_content: str, description: str = "", agent_id: str = None,
+                    agent_name: str = None) -> str:
+        """
+        Create a new HTML view
+        
+        Args:
+            title: View title
+            html_content: HTML content for view
+            description: Optional description
+            agent_id: ID of the agent that created the view, if any
+            agent_name: Name of that agent
+        
+        Returns:
+            URL path to access the view
+        """
+        body = html_content.encode('utf-8')
+        content_hash = hashlib.sha256(body).hexdigest()
+        
+        # Generate filename; the index insert claims it, so concurrent views never share one
+        sanitized_title = self._sanitize_filename(title)
+        timestamp = self._get_timestamp()
+        entry = {
             "title": title,
+            "description": description,
+            "agent_id": agent_id,
+            "agent_name": agent_name,
             "created_at": datetime.now().isoformat(),
-            "description": description
+            "content_hash": content_hash
         }
-        index_data["views"].append(view_entry)
-        self._save_index(index_data)
+        filename = self._insert_view(f"{sanitized_title}_{timestamp}", entry)
+        
+        # Store the body once per distinct content
+        try:
+            self._write_object(content_hash, body)
+        except IOError as e:
+            self._delete_row(filename)
+            raise Exception(f"Failed to save view file: {e}")
+        
+        # Render the served page and its compressed copies now, so GETs only send files
+        try:
+            self.write_page({**entry, "filename": filename})
+        except IOError as e:
+            logger.warning(f"Failed to write page for view {filename}, it is rendered when first served: {e}")
         
         # Return URL path
         return f"/views/{filename}"
     
+    def list_views(self, limit: int = 50, cursor: str = None, query: str = None,
+                   agent_id: str = None) -> Dict[str, Any]:
+        """
+        List one page of views, newest first; pass next_cursor back to get the following page
+        
+        query matches every whitespace-separated term against the title or description;
+        raises ValueError for a malformed cursor.
+        """
+        clauses, params = [], []
+        if cursor:
+            created_at, filename = self.decode_cursor(cursor)
+            clauses.append("(created_at < ? OR (created_at = ? AND filename < ?))")
+            params.extend([created_at, created_at, filename])
+        if agent_id:
+            clauses.append("agent_id = ?")
+            params.append(agent_id)
+        for term in (query or "").split():
+            clauses.append("(title LIKE ? ESCAPE '\\' OR description LIKE ? ESCAPE '\\')")
+            params.extend([_like_pattern(term), _like_pattern(term)])
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        
+        # Fetch one extra row to know whether another page exists
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM views {where} ORDER BY created_at DESC, filename DESC LIMIT ?",
+                params + [limit + 1]
+            ).fetchall()
+        views = [dict(row) for row in rows[:limit]]
+        next_cursor = self.encode_cursor(views[-1]) if len(rows) > limit else None
+        return {"views": views, "next_cursor": next_cursor}
+    
+    @staticmethod
+    def encode_cursor(view: Dict[str, Any]) -> str:
+        """Opaque page cursor for the position after a view"""
+        payload = json.dumps([view.get("created_at") or "", view.get("filename")])
+        return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+    
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[str, str]:
+        """Decode a page cursor into (created_at, filename); raises ValueError if malformed"""
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            created_at, filename = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+            return str(created_at), str(filename)
+        except Exception:
+            raise ValueError("Invalid cursor")
+    
     def get_all_views(self) -> List[Dict[str, Any]]:
-        """Get list of all views with metadata"""
-        index_data = self._load_index()
-        # Sort by creation time (newest first)
-        return sorted(index_data["views"], key=lambda x: x["created_at"], reverse=True)
+        """Get list of all views with metadata, newest first"""
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM views ORDER BY created_at DESC, filename DESC").fetchall()
+        return [dict(row) for row in rows]
+    
+    def get_view(self, filename: str) -> Optional[Dict[str, Any]]:
+        """Get one view's index row by filename"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM views WHERE filename = ?", (filename,)).fetchone()
+        return dict(row) if row else None
     
     def get_view_content(self, filename: str) -> Optional[str]:
         """Get HTML content of a specific view"""
+        view = self.get_view(filename)
+        if view and view.get("content_hash"):
+            page = self.render_view(view)
+            return page.decode('utf-8') if page is not None else None
+        
         filepath = self.views_dir / filename
         if not filepath.exists() or not filename.endswith('.html'):
             return None
@@ -161,24 +350,173 @@ class ViewsManager:
         except IOError:
             return None
     
+    def render_view(self, view: Dict[str, Any]) -> Optional[bytes]:
+        """Full HTML page of a content-addressed view: its stored body inside VIEW_TEMPLATE"""
+        try:
+            content = self.object_path(view["content_hash"]).read_text(encoding='utf-8')
+        except (IOError, KeyError, TypeError):
+            return None
+        created_at = view.get("created_at") or ""
+        try:
+            created_on = datetime.fromisoformat(created_at).strftime("%Y-%m-%d %H:%M")
+        except ValueError:
+            created_on = created_at
+        return VIEW_TEMPLATE.format(
+            title=html.escape(view.get("title") or ""),
+            description=html.escape(view.get("description") or ""),
+            created_at=html.escape(created_at),
+            created_on=html.escape(created_on),
+            content=content
+        ).encode('utf-8')
+    
+    def object_path(self, content_hash: str) -> Path:
+        """Where the body with this SHA-256 is stored"""
+        return self.objects_dir / f"{content_hash}.html"
+    
+    def _write_object(self, content_hash: str, body: bytes) -> None:
+        """Store a view body unless an identical one is already stored"""
+        path = self.object_path(content_hash)
+        if not path.exists():
+            self._write_atomic(path, body)
+    
+    def page_path(self, filename: str) -> Optional[Path]:
+        """Where the rendered page of a content-addressed view is kept, or None for unsafe names"""
+        if not filename.endswith('.html') or os.path.basename(filename) != filename:
+            return None
+        return self.pages_dir / filename
+    
+    def write_page(self, view: Dict[str, Any]) -> Optional[Path]:
+        """Render a content-addressed view and write the page with its precompressed variants"""
+        path = self.page_path(view["filename"])
+        page = self.render_view(view)
+        if path is None or page is None:
+            return None
+        self._write_atomic(path, page)
+        self.write_variants(path, page)
+        return path
+    
+    def get_page_path(self, view: Dict[str, Any]) -> Optional[Path]:
+        """Rendered page of a content-addressed view, written first for views stored before pages were"""
+        path = self.page_path(view["filename"])
+        if path is not None and path.exists():
+            return path
+        try:
+            return self.write_page(view)
+        except IOError as e:
+            logger.error(f"Failed to write page for view {view['filename']}: {e}")
+            return None
+    
+    def get_view_path(self, filename: str) -> Optional[Path]:
+        """Path of a view file, or None for names outside the views directory"""
+        if not filename.endswith('.html') or os.path.basename(filename) != filename:
+            return None
+        return self.views_dir / filename
+    
+    def get_view_variants(self, filename: str) -> Dict[str, Path]:
+        """Precompressed variants of a view saved as a full HTML file, by content coding"""
+        filepath = self.get_view_path(filename)
+        return self.get_variants(filepath) if filepath is not None else {}
+    
+    def get_variants(self, filepath: Path) -> Dict[str, Path]:
+        """
+        Precompressed variants of a view file or rendered page, by content coding
+        
+        Variants older than the file (or missing, for files written before
+        precompression) are written first, so they never go stale.
+        """
+        try:
+            view_mtime = filepath.stat().st_mtime_ns
+        except OSError:
+            return {}
+        
+        variants = {}
+        missing = False
+        for coding, path in self._variant_paths(filepath).items():
+            try:
+                if path.stat().st_mtime_ns >= view_mtime:
+                    variants[coding] = path
+                    continue
+            except OSError:
+                pass
+            missing = True
+        if missing:
+            try:
+                return self.write_variants(filepath, filepath.read_bytes())
+            except IOError:
+                pass
+        return variants
+    
+    def write_variants(self, filepath: Path, body: bytes) -> Dict[str, Path]:
+        """Write the gzip (and brotli) variants of a view file; failures only cost compression"""
+        variants = {}
+        compressed_variants = compress_variants(body)
+        for coding, path in self._variant_paths(filepath).items():
+            compressed = compressed_variants[coding]
+            try:
+                self._write_atomic(path, compressed)
+                variants[coding] = path
+            except IOError as e:
+                logger.warning(f"Failed to write {coding} variant of {filepath.name}: {e}")
+        return variants
+    
+    @staticmethod
+    def _variant_paths(filepath: Path) -> Dict[str, Path]:
+        return {
+            coding: filepath.with_name(filepath.name + suffix)
+            for coding, suffix in PRECOMPRESSED_SUFFIXES.items()
+            if coding != "br" or BROTLI_AVAILABLE
+        }
+    
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes) -> None:
+        """Write via a temp file and rename, so readers (and sendfile) never see a partial file"""
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".view_")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    
+    def last_modified(self) -> Optional[float]:
+        """When a view was last created or deleted (in any process), as a Unix timestamp"""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM views_meta WHERE key = 'modified_at'").fetchone()
+        return float(row[0]) if row else None
+    
     def delete_view(self, filename: str) -> bool:
         """Delete a specific view"""
         filepath = self.views_dir / filename
-        index_data = self._load_index()
         
-        # Remove file
-        if filepath.exists():
-            try:
-                filepath.unlink()
-            except IOError:
-                return False
-        
-        # Remove from index
-        index_data["views"] = [
-            view for view in index_data["views"] 
-            if view["filename"] != filename
-        ]
-        self._save_index(index_data)
+        # Remove the file (legacy views) or rendered page, and their compressed copies
+        page_path = self.page_path(filename)
+        for path in [filepath, page_path] if page_path is not None else [filepath]:
+            if path.exists():
+                try:
+                    path.unlink()
+                except IOError:
+                    return False
+            for variant_path in self._variant_paths(path).values():
+                try:
+                    variant_path.unlink()
+                except OSError:
+                    pass
+        
+        # Remove from index, and the stored body once no other view shares it
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT content_hash FROM views WHERE filename = ?", (filename,)).fetchone()
+            self._conn.execute("DELETE FROM views WHERE filename = ?", (filename,))
+            self._touch()
+            content_hash = row[0] if row else None
+            # Still inside the write transaction, so a concurrent create_view cannot claim the body meanwhile
+            if content_hash and not self._conn.execute(
+                    "SELECT 1 FROM views WHERE content_hash = ? LIMIT 1", (content_hash,)).fetchone():
+                try:
+                    self.object_path(content_hash).unlink()
+                except OSError:
+                    pass
         
         return True
 
@@ -0,0 +1,131 @@
+"""
+Startup warm-up for TradeArena
+Starts the MCP servers and model clients configured agents need before the first request
+"""
+
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Tuple
+
+from .agents import agent_manager
+from .mcp_manager import MCPManager
+from .mcp_supervisor import mcp_supervisor
+from .models import model_registry
+from .settings import settings_manager
+
+logger = logging.getLogger(__name__)
+
+# Warm-up controls (overridable through the environment)
+WARMUP_ENABLED = os.getenv("TRADEARENA_WARMUP", "1") not in ("0", "false", "False")
+WARMUP_BUDGET = float(os.getenv("TRADEARENA_WARMUP_BUDGET", "45"))
+
+# Components the instance cannot serve its agents without; a failed model client only affects its own agent
+REQUIRED_PREFIXES = ("mcp:",)
+
+class WarmupState:
+    """Runs warm-up tasks concurrently within a time budget and records what is warm"""
+
+    def __init__(self):
+        self.started_at = None
+        self.finished_at = None
+        self.finished = False
+        self.components: Dict[str, Dict[str, Any]] = {}
+
+    def plan(self, mcp_manager: MCPManager) -> List[Tuple[str, Callable[[], Any]]]:
+        """Build the list of (component, task) pairs from chain_mappings and configured agents"""
+        agents = agent_manager.get_agents()
+        tasks = []
+
+        # MCP servers needed by the chains agents trade on
+        mcp_names = []
+        for agent in agents:
+            for mcp_name in mcp_manager.get_required_mcps_for_chain(agent.get("trading_chain", "unknown")):
+                if mcp_name not in mcp_names:
+                    mcp_names.append(mcp_name)
+        for mcp_name in mcp_names:
+            tasks.append((f"mcp:{mcp_name}", lambda name=mcp_name: mcp_manager.warm_server(name)))
+
+        # Model clients for each configured agent
+        for agent in agents:
+            tasks.append((
+                f"model:{agent['id']}",
+                lambda agent=agent: model_registry.get_model(agent.get("ai_provider", "anthropic"), agent.get("config", {}),
+                                                             prompt_caching=settings_manager.is_prompt_caching_enabled(),
+                                                             agent_id=agent['id'])
+            ))
+
+        return tasks
+
+    async def run(self, budget: float = WARMUP_BUDGET) -> None:
+        """Run all warm-up tasks concurrently, waiting at most budget seconds"""
+        self.started_at = datetime.now().isoformat()
+        started = time.monotonic()
+
+        try:
+            # Loads credentials into the environment before anything else is created
+            mcp_manager = await asyncio.to_thread(MCPManager)
+            tasks = self.plan(mcp_manager)
+        except Exception as e:
+            logger.error(f"Warm-up planning failed: {e}")
+            tasks = []
+
+        async def run_task(component: str, task: Callable[[], Any]) -> None:
+            task_started = time.monotonic()
+            try:
+                result = await asyncio.to_thread(task)
+                self.components[component] = {"state": "warm", "seconds": round(time.monotonic() - task_started, 2)}
+                if isinstance(result, int):
+                    self.components[component]["tools"] = result
+            except Exception as e:
+                self.components[component] = {"state": "failed", "error": str(e), "seconds": round(time.monotonic() - task_started, 2)}
+                logger.warning(f"Warm-up of {component} failed: {e}")
+
+        for component, _ in tasks:
+            self.components[component] = {"state": "pending"}
+
+        if tasks:
+            logger.info(f"Warming up {len(tasks)} components (budget {budget:.0f}s)")
+            # Tasks still running past the budget keep going in their threads
+            pending = [asyncio.create_task(run_task(c, t)) for c, t in tasks]
+            try:
+                await asyncio.wait(pending, timeout=budget)
+            except asyncio.CancelledError:
+                # Shutdown before warm-up finished
+                for task in pending:
+                    task.cancel()
+                raise
+
+        self.finished = True
+        self.finished_at = datetime.now().isoformat()
+        warm = sum(1 for c in self.components.values() if c["state"] == "warm")
+        logger.info(f"Warm-up finished in {time.monotonic() - started:.2f}s: {warm}/{len(tasks)} components warm")
+
+    def unready_components(self) -> List[str]:
+        """Required components that are not warm (MCP servers the supervisor has since started count as warm)"""
+        running = {f"mcp:{name}" for name, server in mcp_supervisor.status().items() if server["running"]}
+        return [
+            component for component, state in self.components.items()
+            if component.startswith(REQUIRED_PREFIXES) and state["state"] != "warm" and component not in running
+        ]
+
+    def status(self) -> Dict[str, Any]:
+        """Readiness report: ready once warm-up has finished (or been skipped) with every required component warm"""
+        unready = self.unready_components() if self.finished else []
+        return {
+            "ready": self.finished and not unready,
+            "unready": unready,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "components": self.components
+        }
+
+    def skip(self) -> None:
+        """Mark warm-up as done without running it"""
+        self.finished = True
+        self.finished_at = datetime.now().isoformat()
+
+# Global warm-up state instance
+warmup_state = WarmupState()